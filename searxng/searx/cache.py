@@ -1,33 +1,50 @@
 """Implementation of caching solutions.
 
 - :py:obj:`searx.cache.ExpireCache` and its :py:obj:`searx.cache.ExpireCacheCfg`
+- :py:obj:`searx.cache.ExpireCacheSQLite` and :py:obj:`searx.cache.ExpireCacheValkey`,
+  the implementations of the :py:obj:`searx.cache.ExpireCache`
+- :py:obj:`searx.cache.ExpireCacheLRU`, an in-process LRU tier in front of a
+  :py:obj:`searx.cache.ExpireCache`
 
 ----
 """
 
 from __future__ import annotations
 
-__all__ = ["ExpireCacheCfg", "ExpireCacheStats", "ExpireCache", "ExpireCacheSQLite"]
+__all__ = [
+    "ExpireCacheCfg",
+    "ExpireCacheStats",
+    "ExpireCache",
+    "ExpireCacheSQLite",
+    "ExpireCacheValkey",
+    "ExpireCacheLRU",
+]
 
 import abc
-from collections.abc import Iterator
+import collections
+from collections.abc import Iterable, Iterator
 import dataclasses
 import datetime
 import hashlib
 import hmac
+import json
 import os
 import pickle
 import sqlite3
 import string
 import tempfile
+import threading
 import time
 import typing
+import uuid
 
 import msgspec
+import valkey
 
 from searx import sqlitedb
 from searx import logger
 from searx import get_setting
+from searx import valkeydb
 
 log = logger.getChild("cache")
 
@@ -38,6 +55,11 @@ class ExpireCacheCfg(msgspec.Struct):  # pylint: disable=too-few-public-methods
     name: str
     """Name of the cache."""
 
+    db_type: typing.Literal["sqlite", "valkey"] = "sqlite"
+    """Type of the DB, ``sqlite`` (:py:obj:`ExpireCacheSQLite`) or ``valkey``
+    (:py:obj:`ExpireCacheValkey`).  The ``valkey`` cache requires a
+    :ref:`settings valkey` DB and can be shared by several nodes."""
+
     db_url: str = ""
     """URL of the SQLite DB, the path to the database file.  If unset a default
     DB will be created in `/tmp/sxng_cache_{self.name}.db`"""
@@ -57,13 +79,26 @@ class ExpireCacheCfg(msgspec.Struct):  # pylint: disable=too-few-public-methods
 
     ``auto``:
       Maintenance is carried out automatically as part of the maintenance
-      intervals (:py:obj:`MAINTENANCE_PERIOD`); no external process is required.
+      intervals (:py:obj:`MAINTENANCE_PERIOD`) by a background thread
+      (:py:obj:`searx.sqlitedb.MAINTENANCE`); no external process is required.
 
     ``off``:
       Maintenance is switched off and must be carried out by an external process
       if required.
     """
 
+    LRU_SIZE: int = 0
+    """Maximum number of values in the in-process LRU tier
+    (:py:obj:`ExpireCacheLRU`), ``0`` disables the LRU tier."""
+
+    LRU_MAX_BYTES: int = 1024 * 1024 * 4
+    """Maximum size of the values in the LRU tier (length of the *serialized*
+    values)."""
+
+    LRU_TTL: int = 60
+    """Maximum time (in sec.) a value is served from the LRU tier without
+    reading it from the cache DB again."""
+
     password: bytes = get_setting("server.secret_key").encode()  # type: ignore
     """Password used by :py:obj:`ExpireCache.secret_hash`.
 
@@ -98,6 +133,34 @@ class ExpireCacheStats:
        }
     """
 
+    hits: int = 0
+    """Number of ``get`` calls that found the key in the cache DB."""
+
+    misses: int = 0
+    """Number of ``get`` calls that did not find the key in the cache DB."""
+
+    lru_hits: int = 0
+    """Number of ``get`` calls served by the LRU tier (:py:obj:`ExpireCacheLRU`)."""
+
+    lru_misses: int = 0
+    """Number of ``get`` calls not served by the LRU tier."""
+
+    @staticmethod
+    def ratio(hits: int, misses: int) -> float | None:
+        if not hits + misses:
+            return None
+        return hits / (hits + misses)
+
+    @property
+    def hit_ratio(self) -> float | None:
+        """Hit ratio of the cache DB (``None`` if there was no ``get``)."""
+        return self.ratio(self.hits, self.misses)
+
+    @property
+    def lru_hit_ratio(self) -> float | None:
+        """Hit ratio of the LRU tier (``None`` if there was no ``get``)."""
+        return self.ratio(self.lru_hits, self.lru_misses)
+
     def report(self):
         c_ctx = 0
         c_kv = 0
@@ -116,6 +179,10 @@ class ExpireCacheStats:
 
         lines.append(f"Number of contexts: {c_ctx}")
         lines.append(f"number of key/value pairs: {c_kv}")
+        for name, hits, misses in (("DB", self.hits, self.misses), ("LRU", self.lru_hits, self.lru_misses)):
+            ratio = self.ratio(hits, misses)
+            if ratio is not None:
+                lines.append(f"{name} hit ratio: {ratio:.1%} (hits: {hits}, misses: {misses})")
         return "\n".join(lines)
 
 
@@ -169,17 +236,86 @@ class ExpireCache(abc.ABC):
         """Returns a :py:obj:`ExpireCacheStats`, which provides information
         about the status of the cache."""
 
+    def set_many(self, items: Iterable[tuple[str, typing.Any]], expire: int | None, ctx: str | None = None) -> int:
+        """Set the key/value pairs of ``items`` (see :py:obj:`set`), returns the
+        number of pairs that have been stored.  The default implementation
+        calls :py:obj:`set` for each pair."""
+        return sum(1 for key, value in items if self.set(key, value, expire, ctx=ctx))
+
+    def bulk_load(self, items: Iterable[tuple[str, typing.Any]], expire: int | None, ctx: str | None = None) -> int:
+        """Replace the key/value pairs of the context ``ctx`` by the pairs of
+        ``items`` (e.g. when a data set is loaded or refreshed), returns the
+        number of pairs that have been stored.  The default implementation
+        calls :py:obj:`set_many`, keys not in ``items`` are not removed."""
+        return self.set_many(items, expire, ctx=ctx)
+
+    def get_many(self, keys: Iterable[str], ctx: str | None = None) -> dict[str, typing.Any]:
+        """Returns the values of the ``keys`` (see :py:obj:`get`), keys that
+        are unset are missing in the returned dictionary.  The default
+        implementation calls :py:obj:`get` for each key."""
+        missing = object()
+        result = {}
+        for key in keys:
+            value = self.get(key, default=missing, ctx=ctx)
+            if value is not missing:
+                result[key] = value
+        return result
+
+    def get_raw(self, key: str, ctx: str | None = None) -> tuple[bytes, int] | None:
+        """Returns the *serialized* value of *key* and its expire time (unix
+        epoch) or ``None`` if the key is unset or expired.
+
+        The default implementation does not know the expire time of the value
+        and returns the maximum hold time (:py:obj:`ExpireCacheCfg.MAXHOLD_TIME`).
+        """
+        missing = object()
+        value = self.get(key, default=missing, ctx=ctx)
+        if value is missing:
+            return None
+        return self.serialize(value), int(time.time()) + self.cfg.MAXHOLD_TIME
+
+    def add_invalidation_hint(self, key: str | None, ctx: str | None, origin: str):
+        """Records that *key* has been changed by ``origin`` (``None``: all keys
+        of the context), the LRU tiers
+        (:py:obj:`ExpireCacheLRU`) of other processes drop the key.  The default
+        implementation does not record hints, the LRU tiers rely on
+        :py:obj:`ExpireCacheCfg.LRU_TTL`."""
+
+    def add_invalidation_hints(self, keys: Iterable[str], ctx: str | None, origin: str):
+        """Records the hints of several keys (see :py:obj:`add_invalidation_hint`)."""
+        for key in keys:
+            self.add_invalidation_hint(key, ctx, origin)
+
+    def invalidation_hints(
+        self, since: int | None, origin: str
+    ) -> tuple[int | None, list[tuple[str | None, str | None]]]:
+        """Returns the ``(ctx, key)`` pairs changed by other origins since the
+        hint ``since`` and the ID of the last hint (a ``key`` of ``None`` stands
+        for all keys of the context).  If ``since`` is ``None``, only the ID of
+        the last hint is returned."""
+        return since, []
+
     @staticmethod
     def build_cache(cfg: ExpireCacheCfg) -> ExpireCache:
-        """Factory to build a caching instance.
+        """Factory to build a caching instance.  If
+        :py:obj:`ExpireCacheCfg.LRU_SIZE` is set, the cache is wrapped in a
+        :py:obj:`ExpireCacheLRU`.
 
-        .. note::
-
-           Currently, only the SQLite adapter is available, but other database
-           types could be implemented in the future, e.g. a Valkey (Redis)
-           adapter.
+        The type of the cache is given by :py:obj:`ExpireCacheCfg.db_type`.  If
+        the Valkey DB is not configured, a :py:obj:`ExpireCacheSQLite` is used.
         """
-        return ExpireCacheSQLite(cfg)
+        db_type = cfg.db_type
+        if db_type == "valkey" and not (get_setting("valkey.url") or get_setting("redis.url")):
+            log.error("[%s] Valkey DB is not configured, use a SQLite DB instead", cfg.name)
+            db_type = "sqlite"
+
+        if db_type == "valkey":
+            cache: ExpireCache = ExpireCacheValkey(cfg)
+        else:
+            cache = ExpireCacheSQLite(cfg)
+        if cfg.LRU_SIZE:
+            return ExpireCacheLRU(cache)
+        return cache
 
     @staticmethod
     def normalize_name(name: str) -> str:
@@ -229,20 +365,55 @@ class ExpireCacheSQLite(sqlitedb.SQLiteAppl, ExpireCache):
 
     CACHE_TABLE_PREFIX = "CACHE-TABLE"
 
+    DDL_INVALIDATION_HINTS = """\
+CREATE TABLE IF NOT EXISTS invalidation_hints (
+  id         INTEGER PRIMARY KEY AUTOINCREMENT,
+  ctx        TEXT,
+  key        TEXT,
+  origin     TEXT,
+  c_time     INTEGER DEFAULT (strftime('%s', 'now')))"""
+    """Keys changed by the LRU tiers (:py:obj:`ExpireCacheLRU`) of the
+    processes sharing the DB."""
+
+    HINTS_HOLD_TIME = 60 * 60
+    """Hold time (in sec.) of the invalidation hints."""
+
+    SQLITE_PRAGMAS = {
+        **sqlitedb.SQLiteAppl.SQLITE_PRAGMAS,
+        "cache_size": -4000,
+        "mmap_size": 32 * 1024 * 1024,
+    }
+
+    SQLITE_CACHED_STATEMENTS = 256
+    """The statements of the key/value tables are built per table (``ctx``),
+    the engines cache has a table per engine."""
+
+    MAX_SQL_VARIABLES = 500
+    """Maximum number of keys in one ``SELECT .. WHERE key IN (..)``."""
+
     def __init__(self, cfg: ExpireCacheCfg):
         """An instance of the SQLite expire cache is build up from a
         :py:obj:`config <ExpireCacheCfg>`."""
 
         self.cfg = cfg
+        self.hits = 0
+        self.misses = 0
+        self._tables: set[str] = set()
         if cfg.db_url == ":memory:":
             log.critical("don't use SQLite DB in :memory: in production!!")
         super().__init__(cfg.db_url)
+        if cfg.MAINTENANCE_MODE == "auto":
+            sqlitedb.MAINTENANCE.register(self)
 
     def init(self, conn: sqlite3.Connection) -> bool:
         ret_val = super().init(conn)
         if not ret_val:
             return False
 
+        # the table has been added after DB_SCHEMA 1, it is created on demand
+        with conn:
+            conn.execute(self.DDL_INVALIDATION_HINTS)
+
         new = hashlib.sha256(self.cfg.password).hexdigest()
         old = self.properties(self.hash_token)
         if old != new:
@@ -270,15 +441,17 @@ class ExpireCacheSQLite(sqlitedb.SQLiteAppl, ExpireCache):
         # drop items by expire time stamp ..
         expire = int(time.time())
 
-        with self.connect() as conn:
-            for table in self.table_names:
-                res = conn.execute(f"DELETE FROM {table} WHERE expire < ?", (expire,))
-                log.debug("deleted %s keys from table %s (expire date reached)", res.rowcount, table)
-
-        # Vacuuming the WALs
-        # https://www.theunterminatedstring.com/sqlite-vacuuming/
-
-        conn.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+        conn = self.connect()
+        for table in self.table_names:
+            count = self.delete_batched(conn, table, f"SELECT rowid FROM {table} WHERE expire < ?", (expire,))
+            log.debug("deleted %s keys from table %s (expire date reached)", count, table)
+        self.delete_batched(
+            conn,
+            "invalidation_hints",
+            "SELECT rowid FROM invalidation_hints WHERE c_time < ?",
+            (expire - self.HINTS_HOLD_TIME,),
+        )
+        self.vacuum(conn)
         conn.close()
 
         return True
@@ -287,12 +460,21 @@ class ExpireCacheSQLite(sqlitedb.SQLiteAppl, ExpireCache):
         """Create DB ``table`` if it has not yet been created, no recreates are
         initiated if the table already exists.
         """
-        if table in self.table_names:
+        if self.table_exists(table):
             # log.debug("key/value table %s exists in DB (no need to recreate)", table)
             return False
 
         log.info("key/value table '%s' NOT exists in DB -> create DB table ..", table)
-        sql_table = "\n".join(
+        with self.connect() as conn:
+            conn.execute(self.sql_create_table(table))
+            conn.execute(self.sql_create_index(table))
+        conn.close()
+
+        self.properties.set(f"{self.CACHE_TABLE_PREFIX}-{table}", table)
+        return True
+
+    def sql_create_table(self, table: str) -> str:
+        return "\n".join(
             [
                 f"CREATE TABLE IF NOT EXISTS {table} (",
                 "  key        TEXT,",
@@ -301,14 +483,17 @@ class ExpireCacheSQLite(sqlitedb.SQLiteAppl, ExpireCache):
                 "PRIMARY KEY (key))",
             ]
         )
-        sql_index = f"CREATE INDEX IF NOT EXISTS index_expire_{table} ON {table}(expire);"
-        with self.connect() as conn:
-            conn.execute(sql_table)
-            conn.execute(sql_index)
-        conn.close()
 
-        self.properties.set(f"{self.CACHE_TABLE_PREFIX}-{table}", table)
-        return True
+    def sql_create_index(self, table: str) -> str:
+        return f"CREATE INDEX IF NOT EXISTS index_expire_{table} ON {table}(expire);"
+
+    def table_exists(self, table: str) -> bool:
+        """``True`` if the key/value ``table`` has been created in the DB.  A
+        table is never dropped (:py:obj:`bulk_load` replaces a table in one
+        transaction), the existing tables are remembered and not queried again."""
+        if table not in self._tables and table in self.table_names:
+            self._tables.add(table)
+        return table in self._tables
 
     @property
     def table_names(self) -> list[str]:
@@ -342,7 +527,6 @@ class ExpireCacheSQLite(sqlitedb.SQLiteAppl, ExpireCache):
         <ExpireCacheSQLite.create_table>`.
         """
         table = ctx
-        self.maintenance()
 
         value = self.serialize(value=value)
         if len(value) > self.cfg.MAX_VALUE_LEN:
@@ -364,16 +548,91 @@ class ExpireCacheSQLite(sqlitedb.SQLiteAppl, ExpireCache):
             f"UPDATE SET value=?, expire=?"
         )
 
-        if table:
-            with self.DB:
-                self.DB.execute(sql, (key, value, expire, value, expire))
-        else:
-            with self.connect() as conn:
-                conn.execute(sql, (key, value, expire, value, expire))
-            conn.close()
+        self.DB.execute(sql, (key, value, expire, value, expire))
 
         return True
 
+    def _rows(self, items: Iterable[tuple[str, typing.Any]], expire: int | None, table: str):
+        # serialized (key, value, expire) rows of the items, too big values are
+        # dropped
+        if not expire:
+            expire = self.cfg.MAXHOLD_TIME
+        expire = int(time.time()) + expire
+        for key, value in items:
+            value = self.serialize(value=value)
+            if len(value) > self.cfg.MAX_VALUE_LEN:
+                log.warning("ExpireCache.set(): %s.key='%s' - value too big to cache (len: %s)", table, key, len(value))
+                continue
+            yield key, value, expire
+
+    def set_many(self, items: Iterable[tuple[str, typing.Any]], expire: int | None, ctx: str | None = None) -> int:
+        """Set the key/value pairs of ``items`` in DB table given by argument
+        ``ctx``, all pairs are written in one transaction."""
+        table = ctx or self.normalize_name(self.cfg.name)
+        self.create_table(table)
+        rows = list(self._rows(items, expire, table))
+
+        sql = (
+            f"INSERT INTO {table} (key, value, expire) VALUES (?, ?, ?)"
+            "    ON CONFLICT DO UPDATE SET value=excluded.value, expire=excluded.expire"
+        )
+        with sqlitedb.transaction(self.DB):
+            self.DB.executemany(sql, rows)
+        return len(rows)
+
+    def bulk_load(self, items: Iterable[tuple[str, typing.Any]], expire: int | None, ctx: str | None = None) -> int:
+        """Replace the DB table given by argument ``ctx`` by a new table with
+        the pairs of ``items``.  The new table is filled in one transaction
+        and then replaces the old table in a second transaction, a reader
+        sees either the old or the new pairs."""
+
+        table = ctx or self.normalize_name(self.cfg.name)
+        tmp_table = f"{table}__bulk_load"
+        rows = self._rows(items, expire, table)
+        sql = (
+            f"INSERT INTO {tmp_table} (key, value, expire) VALUES (?, ?, ?)"
+            "    ON CONFLICT DO UPDATE SET value=excluded.value, expire=excluded.expire"
+        )
+
+        conn = self.connect()
+        try:
+            with sqlitedb.transaction(conn):
+                conn.execute(f"DROP TABLE IF EXISTS {tmp_table}")
+                conn.execute(self.sql_create_table(tmp_table))
+                count = conn.executemany(sql, rows).rowcount
+            with sqlitedb.transaction(conn):
+                conn.execute(f"DROP TABLE IF EXISTS {table}")
+                conn.execute(f"ALTER TABLE {tmp_table} RENAME TO {table}")
+                # the index is created after the rows have been inserted
+                conn.execute(self.sql_create_index(table))
+        finally:
+            conn.close()
+
+        self.properties.set(f"{self.CACHE_TABLE_PREFIX}-{table}", table)
+        log.debug("bulk load: %s pairs in table %s", count, table)
+        return count
+
+    def get_many(self, keys: Iterable[str], ctx: str | None = None) -> dict[str, typing.Any]:
+        """Get the values of the ``keys`` from table given by argument ``ctx``,
+        the keys are queried in chunks of :py:obj:`MAX_SQL_VARIABLES`."""
+        table = ctx
+
+        if not table:
+            table = self.normalize_name(self.cfg.name)
+
+        keys = list(keys)
+        result = {}
+        if self.table_exists(table):
+            now = int(time.time())
+            for i in range(0, len(keys), self.MAX_SQL_VARIABLES):
+                chunk = keys[i : i + self.MAX_SQL_VARIABLES]
+                sql = f"SELECT key, value FROM {table} WHERE key IN ({','.join('?' * len(chunk))}) AND expire >= ?"
+                for key, value in self.DB.execute(sql, (*chunk, now)):
+                    result[key] = self.deserialize(value)
+        self.hits += len(result)
+        self.misses += len(keys) - len(result)
+        return result
+
     def get(self, key: str, default=None, ctx: str | None = None) -> typing.Any:
         """Get value of ``key`` from table given by argument ``ctx``.  If
         ``ctx`` argument is ``None`` (the default), a table name is generated
@@ -382,33 +641,76 @@ class ExpireCacheSQLite(sqlitedb.SQLiteAppl, ExpireCache):
 
         """
         table = ctx
-        self.maintenance()
 
         if not table:
             table = self.normalize_name(self.cfg.name)
 
-        if table not in self.table_names:
+        if not self.table_exists(table):
             return default
 
-        sql = f"SELECT value FROM {table} WHERE key = ?"
-        row = self.DB.execute(sql, (key,)).fetchone()
+        # expired values are removed by the maintenance, until then they are
+        # still in the table
+        sql = f"SELECT value FROM {table} WHERE key = ? AND expire >= ?"
+        row = self.DB.execute(sql, (key, int(time.time()))).fetchone()
         if row is None:
+            self.misses += 1
             return default
 
+        self.hits += 1
         return self.deserialize(row[0])
 
+    def get_raw(self, key: str, ctx: str | None = None) -> tuple[bytes, int] | None:
+        table = ctx
+
+        if not table:
+            table = self.normalize_name(self.cfg.name)
+
+        row = None
+        if self.table_exists(table):
+            sql = f"SELECT value, expire FROM {table} WHERE key = ?"
+            row = self.DB.execute(sql, (key,)).fetchone()
+        if row is None or row[1] < int(time.time()):
+            self.misses += 1
+            return None
+
+        self.hits += 1
+        return row[0], row[1]
+
+    def add_invalidation_hint(self, key: str | None, ctx: str | None, origin: str):
+        with self.DB:
+            self.DB.execute("INSERT INTO invalidation_hints (ctx, key, origin) VALUES (?, ?, ?)", (ctx, key, origin))
+
+    def add_invalidation_hints(self, keys: Iterable[str], ctx: str | None, origin: str):
+        with sqlitedb.transaction(self.DB):
+            self.DB.executemany(
+                "INSERT INTO invalidation_hints (ctx, key, origin) VALUES (?, ?, ?)", ((ctx, k, origin) for k in keys)
+            )
+
+    def invalidation_hints(
+        self, since: int | None, origin: str
+    ) -> tuple[int | None, list[tuple[str | None, str | None]]]:
+        if since is None:
+            row = self.DB.execute("SELECT MAX(id) FROM invalidation_hints").fetchone()
+            return row[0] or 0, []
+
+        rows = self.DB.execute(
+            "SELECT id, ctx, key, origin FROM invalidation_hints WHERE id > ? ORDER BY id", (since,)
+        ).fetchall()
+        if not rows:
+            return since, []
+        return rows[-1][0], [(ctx, key) for _, ctx, key, o in rows if o != origin]
+
     def pairs(self, ctx: str) -> Iterator[tuple[str, typing.Any]]:
         """Iterate over key/value pairs from table given by argument ``ctx``.
         If ``ctx`` argument is ``None`` (the default), a table name is
         generated from the :py:obj:`ExpireCacheCfg.name`."""
         table = ctx
-        self.maintenance()
 
         if not table:
             table = self.normalize_name(self.cfg.name)
 
-        if table in self.table_names:
-            for row in self.DB.execute(f"SELECT key, value FROM {table}"):
+        if self.table_exists(table):
+            for row in self.DB.execute(f"SELECT key, value FROM {table} WHERE expire >= ?", (int(time.time()),)):
                 yield row[0], self.deserialize(row[1])
 
     def state(self) -> ExpireCacheStats:
@@ -417,4 +719,436 @@ class ExpireCacheSQLite(sqlitedb.SQLiteAppl, ExpireCache):
             cached_items[table] = []
             for row in self.DB.execute(f"SELECT key, value, expire FROM {table}"):
                 cached_items[table].append((row[0], self.deserialize(row[1]), row[2]))
-        return ExpireCacheStats(cached_items=cached_items)
+        return ExpireCacheStats(cached_items=cached_items, hits=self.hits, misses=self.misses)
+
+
+class ExpireCacheValkey(ExpireCache):
+    """Cache that manages key/value pairs in the :ref:`settings valkey` DB
+    (:py:obj:`searx.valkeydb`), the cache can be shared by several nodes.
+
+    - The context of a key is mapped to a key prefix:
+      ``SearXNG_cache_<name>:<ctx>:<key>``.
+    - The expire time is the TTL of the key in the Valkey DB, there is no need
+      for a maintenance of the expired keys.
+    - :py:obj:`set_many` and :py:obj:`get_many` send all commands in one
+      pipeline.
+
+    The following configurations are required / supported:
+
+    - :py:obj:`ExpireCacheCfg.MAXHOLD_TIME`
+    - :py:obj:`ExpireCacheCfg.MAX_VALUE_LEN`
+    """
+
+    KEY_PREFIX = "SearXNG_cache_"
+
+    HINTS_MAX = 10000
+    """Maximum number of invalidation hints stored in the Valkey DB."""
+
+    SCAN_COUNT = 1000
+    """Number of keys fetched by one ``SCAN`` (and one pipeline of ``GET``)."""
+
+    def __init__(self, cfg: ExpireCacheCfg):
+        self.cfg = cfg
+        self.prefix = f"{self.KEY_PREFIX}{self.normalize_name(cfg.name)}:"
+        self.hits = 0
+        self.misses = 0
+        self._init_done = False
+
+    @property
+    def client(self) -> valkey.Valkey:
+        """The Valkey client (:py:obj:`searx.valkeydb.client`), on first use
+        the hash token of the password is checked."""
+        client = valkeydb.client()
+        if client is None:
+            raise valkey.exceptions.ConnectionError("Valkey DB is not initialized")
+        if not self._init_done:
+            self._init_done = True
+            self.init(client)
+        return client
+
+    def init(self, client: valkey.Valkey):
+        new = hashlib.sha256(self.cfg.password).hexdigest()
+        old = client.get(self.prefix + self.hash_token)
+        if old is None or old.decode() != new:
+            if old is not None:
+                log.warning("[%s] hash token changed: truncate all cache keys", self.cfg.name)
+                self.maintenance(force=True, truncate=True)
+            client.set(self.prefix + self.hash_token, new)
+
+    def ctx_name(self, ctx: str | None) -> str:
+        return self.normalize_name(ctx or self.cfg.name)
+
+    def valkey_key(self, key: str, ctx: str | None) -> str:
+        return f"{self.prefix}{self.ctx_name(ctx)}:{key}"
+
+    def set(self, key: str, value: typing.Any, expire: int | None, ctx: str | None = None) -> bool:
+        return self.set_many([(key, value)], expire, ctx=ctx) == 1
+
+    def set_many(self, items: Iterable[tuple[str, typing.Any]], expire: int | None, ctx: str | None = None) -> int:
+        if not expire:
+            expire = self.cfg.MAXHOLD_TIME
+        count = 0
+        try:
+            pipe = self.client.pipeline(transaction=False)
+            pipe.sadd(self.prefix + "contexts", self.ctx_name(ctx))
+            for key, value in items:
+                value = self.serialize(value=value)
+                if len(value) > self.cfg.MAX_VALUE_LEN:
+                    log.warning(
+                        "ExpireCache.set(): %s.key='%s' - value too big to cache (len: %s)", ctx, key, len(value)
+                    )
+                    continue
+                pipe.set(self.valkey_key(key, ctx), value, ex=expire)
+                count += 1
+            pipe.execute()
+        except valkey.exceptions.ValkeyError as e:
+            log.error("[%s] can't store values: %s", self.cfg.name, e)
+            return 0
+        return count
+
+    def get(self, key: str, default=None, ctx: str | None = None) -> typing.Any:
+        try:
+            value = self.client.get(self.valkey_key(key, ctx))
+        except valkey.exceptions.ValkeyError as e:
+            log.error("[%s] can't read value: %s", self.cfg.name, e)
+            return default
+        if value is None:
+            self.misses += 1
+            return default
+        self.hits += 1
+        return self.deserialize(value)
+
+    def get_many(self, keys: Iterable[str], ctx: str | None = None) -> dict[str, typing.Any]:
+        keys = list(keys)
+        if not keys:
+            return {}
+        try:
+            values = self.client.mget([self.valkey_key(key, ctx) for key in keys])
+        except valkey.exceptions.ValkeyError as e:
+            log.error("[%s] can't read values: %s", self.cfg.name, e)
+            return {}
+        result = {key: self.deserialize(value) for key, value in zip(keys, values) if value is not None}
+        self.hits += len(result)
+        self.misses += len(keys) - len(result)
+        return result
+
+    def get_raw(self, key: str, ctx: str | None = None) -> tuple[bytes, int] | None:
+        try:
+            pipe = self.client.pipeline(transaction=False)
+            pipe.get(self.valkey_key(key, ctx))
+            pipe.ttl(self.valkey_key(key, ctx))
+            value, ttl = pipe.execute()
+        except valkey.exceptions.ValkeyError as e:
+            log.error("[%s] can't read value: %s", self.cfg.name, e)
+            return None
+        if value is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        if ttl < 0:
+            # key without TTL
+            ttl = self.cfg.MAXHOLD_TIME
+        return value, int(time.time()) + ttl
+
+    def add_invalidation_hint(self, key: str | None, ctx: str | None, origin: str):
+        self.add_invalidation_hints([key], ctx, origin)  # type: ignore
+
+    def add_invalidation_hints(self, keys: Iterable[str], ctx: str | None, origin: str):
+        keys = list(keys)
+        if not keys:
+            return
+        try:
+            # the IDs of the hints: last_id - len(keys) + 1 .. last_id
+            last_id = self.client.incrby(self.prefix + "hints_id", len(keys))
+            first_id = last_id - len(keys) + 1
+            hints = {json.dumps([first_id + i, ctx, key, origin]): first_id + i for i, key in enumerate(keys)}
+            pipe = self.client.pipeline(transaction=False)
+            pipe.zadd(self.prefix + "hints", hints)  # type: ignore
+            pipe.zremrangebyrank(self.prefix + "hints", 0, -self.HINTS_MAX - 1)
+            pipe.execute()
+        except valkey.exceptions.ValkeyError as e:
+            log.error("[%s] can't store invalidation hints: %s", self.cfg.name, e)
+
+    def invalidation_hints(
+        self, since: int | None, origin: str
+    ) -> tuple[int | None, list[tuple[str | None, str | None]]]:
+        try:
+            if since is None:
+                return int(self.client.get(self.prefix + "hints_id") or 0), []
+            rows = self.client.zrangebyscore(self.prefix + "hints", f"({since}", "+inf")
+        except valkey.exceptions.ValkeyError as e:
+            log.error("[%s] can't read invalidation hints: %s", self.cfg.name, e)
+            return since, []
+        hints = []
+        for row in rows:
+            hint_id, ctx, key, o = json.loads(row)
+            since = max(since, hint_id)  # type: ignore
+            if o != origin:
+                hints.append((ctx, key))
+        return since, hints
+
+    def scan(self, ctx: str | None) -> Iterator[list[bytes]]:
+        """Iterate over the Valkey keys of the context ``ctx``, in chunks of
+        :py:obj:`SCAN_COUNT` keys."""
+        chunk = []
+        for name in self.client.scan_iter(match=f"{self.prefix}{self.ctx_name(ctx)}:*", count=self.SCAN_COUNT):
+            chunk.append(name)
+            if len(chunk) >= self.SCAN_COUNT:
+                yield chunk
+                chunk = []
+        if chunk:
+            yield chunk
+
+    def pairs(self, ctx: str) -> Iterator[tuple[str, typing.Any]]:
+        """Iterate over key/value pairs of the context ``ctx``."""
+        start = len(f"{self.prefix}{self.ctx_name(ctx)}:")
+        for names in self.scan(ctx):
+            for name, value in zip(names, self.client.mget(names)):
+                if value is not None:
+                    yield name.decode()[start:], self.deserialize(value)
+
+    def maintenance(self, force: bool = False, truncate: bool = False) -> bool:
+        """The expired keys are removed by the Valkey DB, only ``truncate`` has
+        to be done."""
+        if not truncate:
+            return False
+        for ctx in self.client.smembers(self.prefix + "contexts"):
+            for names in self.scan(ctx.decode()):
+                self.client.unlink(*names)
+        return True
+
+    def state(self) -> ExpireCacheStats:
+        cached_items = {}
+        for ctx in sorted(c.decode() for c in self.client.smembers(self.prefix + "contexts")):
+            cached_items[ctx] = []
+            start = len(f"{self.prefix}{ctx}:")
+            for names in self.scan(ctx):
+                pipe = self.client.pipeline(transaction=False)
+                for name in names:
+                    pipe.get(name)
+                    pipe.ttl(name)
+                res = pipe.execute()
+                now = int(time.time())
+                for name, value, ttl in zip(names, res[0::2], res[1::2]):
+                    if value is not None:
+                        cached_items[ctx].append((name.decode()[start:], self.deserialize(value), now + max(ttl, 0)))
+        return ExpireCacheStats(cached_items=cached_items, hits=self.hits, misses=self.misses)
+
+
+class ExpireCacheLRU(ExpireCache):
+    """Bounded in-process LRU tier in front of an :py:obj:`ExpireCache` (the
+    *backend*).  Values read thousands of times (engine tokens, currencies, ..)
+    are served from the memory of the process, without a maintenance check, a
+    DB query and the deserialization of the value.
+
+    - The LRU tier is *write-through*: :py:obj:`set` writes to the backend and
+      to the LRU tier.
+    - A value is served from the LRU tier until it expires in the backend, but
+      at most :py:obj:`ExpireCacheCfg.LRU_TTL` seconds.
+    - The number of values is limited by :py:obj:`ExpireCacheCfg.LRU_SIZE`, the
+      size of the values by :py:obj:`ExpireCacheCfg.LRU_MAX_BYTES`.
+    - Keys changed by other processes are dropped from the LRU tier, the
+      backend records *invalidation hints*
+      (:py:obj:`ExpireCache.add_invalidation_hints`).  The hints of the keys
+      changed by this process are collected and written in one batch, the
+      hints are written and read every :py:obj:`HINTS_INTERVAL` seconds.
+    - Mutable values are stored serialized and deserialized on each hit, a
+      caller can't modify the value in the LRU tier.
+
+    Other methods and attributes (e.g. ``properties`` of a
+    :py:obj:`ExpireCacheSQLite`) are those of the backend.
+    """
+
+    HINTS_INTERVAL = 1.0
+    """Interval (in sec.) in which the invalidation hints are written and read."""
+
+    IMMUTABLE_TYPES = (str, bytes, int, float, bool, type(None))
+    """Values of these types are stored in the LRU tier as they are."""
+
+    def __init__(self, backend: ExpireCache):
+        self.backend = backend
+        self.cfg = backend.cfg
+        self.hits = 0
+        self.misses = 0
+        self._token = uuid.uuid4().hex
+        self._lock = threading.Lock()
+        # (ctx, key) --> (valid until, value, value is serialized, size)
+        self._items: collections.OrderedDict[tuple[str | None, str], tuple[float, typing.Any, bool, int]]
+        self._items = collections.OrderedDict()
+        self._bytes = 0
+        self._hint_id: int | None = None
+        self._hints_synced = 0.0
+        # keys changed by this process, written to the backend by a timer
+        self._pending_hints: set[tuple[str | None, str]] = set()
+        self._flush_timer: threading.Timer | None = None
+
+    def __getattr__(self, name: str):
+        if name == "backend":
+            raise AttributeError(name)
+        return getattr(self.backend, name)
+
+    @property
+    def origin(self) -> str:
+        """Name of this LRU tier in the invalidation hints (a forked process
+        has its own name)."""
+        return f"{os.getpid()}-{self._token}"
+
+    def set(self, key: str, value: typing.Any, expire: int | None, ctx: str | None = None) -> bool:
+        if not self.backend.set(key, value, expire, ctx=ctx):
+            with self._lock:
+                self._drop((ctx, key))
+            return False
+        expire = int(time.time()) + (expire or self.cfg.MAXHOLD_TIME)
+        self._store(ctx, key, value, self.serialize(value), expire)
+        self._add_hints(ctx, [key])
+        return True
+
+    def get(self, key: str, default=None, ctx: str | None = None) -> typing.Any:
+        missing = object()
+        value = self._get_item(key, ctx, missing)
+        if value is not missing:
+            return value
+
+        raw = self.backend.get_raw(key, ctx=ctx)
+        if raw is None:
+            return default
+        data, expire = raw
+        value = self.deserialize(data)
+        self._store(ctx, key, value, data, expire)
+        return value
+
+    def set_many(self, items: Iterable[tuple[str, typing.Any]], expire: int | None, ctx: str | None = None) -> int:
+        items = list(items)
+        count = self.backend.set_many(items, expire, ctx=ctx)
+        # the backend may not have stored all pairs (e.g. values too big)
+        with self._lock:
+            for key, _ in items:
+                self._drop((ctx, key))
+        self._add_hints(ctx, [key for key, _ in items])
+        return count
+
+    def bulk_load(self, items: Iterable[tuple[str, typing.Any]], expire: int | None, ctx: str | None = None) -> int:
+        count = self.backend.bulk_load(items, expire, ctx=ctx)
+        with self._lock:
+            self._drop_ctx(ctx)
+        self.backend.add_invalidation_hint(None, ctx, self.origin)
+        return count
+
+    def get_many(self, keys: Iterable[str], ctx: str | None = None) -> dict[str, typing.Any]:
+        missing = object()
+        result = {}
+        keys_missed = []
+        for key in keys:
+            value = self._get_item(key, ctx, missing)
+            if value is missing:
+                keys_missed.append(key)
+            else:
+                result[key] = value
+        if keys_missed:
+            # the expire time is not known, the values are not stored in the
+            # LRU tier
+            result.update(self.backend.get_many(keys_missed, ctx=ctx))
+        return result
+
+    def get_raw(self, key: str, ctx: str | None = None) -> tuple[bytes, int] | None:
+        return self.backend.get_raw(key, ctx=ctx)
+
+    def pairs(self, ctx: str) -> Iterator[tuple[str, typing.Any]]:
+        return self.backend.pairs(ctx)  # type: ignore
+
+    def maintenance(self, force: bool = False, truncate: bool = False) -> bool:
+        if truncate:
+            self.clear()
+        return self.backend.maintenance(force=force, truncate=truncate)
+
+    def state(self) -> ExpireCacheStats:
+        return dataclasses.replace(self.backend.state(), lru_hits=self.hits, lru_misses=self.misses)
+
+    def clear(self):
+        """Drop all values from the LRU tier."""
+        with self._lock:
+            self._items.clear()
+            self._bytes = 0
+
+    def _get_item(self, key: str, ctx: str | None, default: typing.Any) -> typing.Any:
+        # value from the LRU tier
+        self._sync_hints()
+        with self._lock:
+            item = self._items.get((ctx, key))
+            if item is not None:
+                if item[0] > time.time():
+                    self._items.move_to_end((ctx, key))
+                    self.hits += 1
+                else:
+                    self._drop((ctx, key))
+                    item = None
+        if item is None:
+            self.misses += 1
+            return default
+        if item[2]:
+            return self.deserialize(item[1])
+        return item[1]
+
+    def _store(self, ctx: str | None, key: str, value: typing.Any, data: bytes, expire: int):
+        size = len(data)
+        serialized = not isinstance(value, self.IMMUTABLE_TYPES)
+        valid_until = min(expire, time.time() + self.cfg.LRU_TTL)
+        with self._lock:
+            self._drop((ctx, key))
+            if size > self.cfg.LRU_MAX_BYTES:
+                return
+            self._items[(ctx, key)] = (valid_until, data if serialized else value, serialized, size)
+            self._bytes += size
+            while len(self._items) > self.cfg.LRU_SIZE or self._bytes > self.cfg.LRU_MAX_BYTES:
+                _, item = self._items.popitem(last=False)
+                self._bytes -= item[3]
+
+    def _drop(self, item_key: tuple[str | None, str]):
+        # the caller holds the lock
+        item = self._items.pop(item_key, None)
+        if item is not None:
+            self._bytes -= item[3]
+
+    def _drop_ctx(self, ctx: str | None):
+        # the caller holds the lock
+        for item_key in [k for k in self._items if k[0] == ctx]:
+            self._drop(item_key)
+
+    def _add_hints(self, ctx: str | None, keys: list[str]):
+        # the hints are written in one batch by a timer, at most
+        # HINTS_INTERVAL seconds after the first change
+        with self._lock:
+            self._pending_hints.update((ctx, key) for key in keys)
+            timer = self._flush_timer
+            if timer is not None and timer.is_alive():
+                return
+            # no timer or the timer of the parent process (fork)
+            self._flush_timer = threading.Timer(self.HINTS_INTERVAL, self.flush_hints)
+            self._flush_timer.daemon = True
+            self._flush_timer.start()
+
+    def flush_hints(self):
+        """Write the invalidation hints of the keys changed by this process to
+        the backend."""
+        with self._lock:
+            pending, self._pending_hints = self._pending_hints, set()
+            self._flush_timer = None
+        by_ctx: dict[str | None, list[str]] = {}
+        for ctx, key in pending:
+            by_ctx.setdefault(ctx, []).append(key)
+        for ctx, keys in by_ctx.items():
+            self.backend.add_invalidation_hints(keys, ctx, self.origin)
+
+    def _sync_hints(self):
+        now = time.time()
+        if now - self._hints_synced < self.HINTS_INTERVAL:
+            return
+        self._hints_synced = now
+        self._hint_id, hints = self.backend.invalidation_hints(self._hint_id, self.origin)
+        if hints:
+            with self._lock:
+                for ctx, key in hints:
+                    if key is None:
+                        self._drop_ctx(ctx)
+                    else:
+                        self._drop((ctx, key))
@@ -5,13 +5,13 @@ from __future__ import annotations
 import pathlib
 
 from searx import logger
-from searx.cache import ExpireCacheCfg, ExpireCacheSQLite
+from searx.cache import ExpireCache, ExpireCacheCfg
 
 log = logger.getChild("data")
 
 data_dir = pathlib.Path(__file__).parent
 
-_DATA_CACHE: ExpireCacheSQLite = None  # type: ignore
+_DATA_CACHE: ExpireCache = None  # type: ignore
 
 
 def get_cache():
@@ -19,9 +19,10 @@ def get_cache():
     global _DATA_CACHE  # pylint: disable=global-statement
 
     if _DATA_CACHE is None:
-        _DATA_CACHE = ExpireCacheSQLite.build_cache(
+        _DATA_CACHE = ExpireCache.build_cache(
             ExpireCacheCfg(
                 name="DATA_CACHE",
+                LRU_SIZE=4096,  # currencies looked up by the answerers
                 # MAX_VALUE_LEN=1024 * 200,  # max. 200kB length for a *serialized* value.
                 # MAXHOLD_TIME=60 * 60 * 24 * 7 * 4,  # 4 weeks
             )
@@ -35,10 +35,8 @@ class CurrenciesDB:
         log.debug("init searx.data.CURRENCIES")
         with open(self.json_file, encoding="utf-8") as f:
             data_dict = json.load(f)
-        for key, value in data_dict["names"].items():
-            self.cache.set(key=key, value=value, ctx=self.ctx_names, expire=None)
-        for key, value in data_dict["iso4217"].items():
-            self.cache.set(key=key, value=value, ctx=self.ctx_iso4217, expire=None)
+        self.cache.bulk_load(data_dict["names"].items(), ctx=self.ctx_names, expire=None)
+        self.cache.bulk_load(data_dict["iso4217"].items(), ctx=self.ctx_iso4217, expire=None)
 
     def name_to_iso4217(self, name):
         self.init()
@@ -50,8 +50,14 @@ class TrackerPatternsDB:
 
     def load(self):
         log.debug("init searx.data.TRACKER_PATTERNS")
-        for rule in self.iter_clear_list():
-            self.add(rule)
+        rules = [
+            (rule[self.Fields.url_regexp], (rule[self.Fields.url_ignore], rule[self.Fields.del_args]))
+            for rule in self.iter_clear_list()
+        ]
+        if not rules:
+            # keep the rules of the last load
+            return
+        self.cache.bulk_load(rules, ctx=self.ctx_name, expire=None)
 
     def add(self, rule: RuleType):
         self.cache.set(
@@ -41,11 +41,14 @@ ENGINES_CACHE = ExpireCache.build_cache(
         name="ENGINES_CACHE",
         MAXHOLD_TIME=60 * 60 * 24 * 7,  # 7 days
         MAINTENANCE_PERIOD=60 * 60,  # 2h
+        LRU_SIZE=1024,
     )
 )
 """Global :py:obj:`searx.cache.ExpireCacheSQLite` instance where the cached
 values from all engines are stored.  The `MAXHOLD_TIME` is 7 days and the
-`MAINTENANCE_PERIOD` is set to two hours."""
+`MAINTENANCE_PERIOD` is set to two hours.  The values (e.g. tokens of the
+engines) are also held in an in-process LRU tier
+(:py:obj:`searx.cache.ExpireCacheLRU`)."""
 
 app = typer.Typer()
 
@@ -297,3 +300,16 @@ class Engine:  # pylint: disable=too-few-public-methods
 
     weight: int
     """Weighting of the results of this engine (:ref:`weight <settings engines>`)."""
+
+    response_cache_ttl: int
+    """Time (in sec.) the parsed results of a request are cached.  Identical
+    requests (e.g. when paging back and forth) are answered from the cache
+    without sending the request and parsing the response again.  The default
+    ``0`` disables the cache for this engine.
+
+    .. code:: yaml
+
+      - name: wikipedia
+        engine: wikipedia
+        response_cache_ttl: 300
+    """
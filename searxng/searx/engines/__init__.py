@@ -47,6 +47,7 @@ ENGINE_DEFAULT_ARGS: dict[str, int | str | list[t.Any] | dict[str, t.Any] | bool
     "send_accept_language_header": False,
     "tokens": [],
     "max_page": 0,
+    "response_cache_ttl": 0,
 }
 # set automatically when an engine does not have any tab category
 DEFAULT_CATEGORY = 'other'
@@ -63,6 +64,14 @@ engine_shortcuts = {}
 :meta hide-value:
 """
 
+engine_weights: dict[str, float] = {}
+"""Map of the registered engines to the :ref:`weight <settings engines>` of the
+engine (default ``1.0``), computed once when the engine is registered and used to
+score the results (:py:obj:`searx.results.calculate_score`).
+
+:meta hide-value:
+"""
+
 
 def check_engine_module(module: types.ModuleType):
     # probe unintentional name collisions / for example name collisions caused
@@ -229,6 +238,7 @@ def register_engine(engine: Engine | types.ModuleType):
         logger.error('Engine config error: ambiguous name: {0}'.format(engine.name))
         sys.exit(1)
     engines[engine.name] = engine
+    engine_weights[engine.name] = float(getattr(engine, 'weight', 1.0))
 
     if engine.shortcut in engine_shortcuts:
         logger.error('Engine config error: ambiguous shortcut: {0}'.format(engine.shortcut))
@@ -243,6 +253,7 @@ def load_engines(engine_list):
     """usage: ``engine_list = settings['engines']``"""
     engines.clear()
     engine_shortcuts.clear()
+    engine_weights.clear()
     categories.clear()
     categories['general'] = []
     for engine_data in engine_list:
@@ -130,7 +130,8 @@ class FaviconCacheConfig(msgspec.Struct):  # pylint: disable=too-few-public-meth
 
     ``auto``:
       Maintenance is carried out automatically as part of the maintenance
-      intervals (:py:obj:`MAINTENANCE_PERIOD`); no external process is required.
+      intervals (:py:obj:`MAINTENANCE_PERIOD`) by a background thread
+      (:py:obj:`searx.sqlitedb.MAINTENANCE`); no external process is required.
 
     ``off``:
       Maintenance is switched off and must be carried out by an external process
@@ -279,15 +280,14 @@ CREATE TABLE IF NOT EXISTS blob_map (
         "blob_map": DDL_BLOB_MAP,
     }
 
-    SQL_DROP_LEFTOVER_BLOBS = (
-        "DELETE FROM blobs WHERE sha256 IN ("
-        " SELECT b.sha256"
-        "   FROM blobs b"
-        "   LEFT JOIN blob_map bm"
-        "     ON b.sha256 = bm.sha256"
-        "  WHERE bm.sha256 IS NULL)"
+    SQL_SELECT_LEFTOVER_BLOBS = (
+        "SELECT b.rowid"
+        "  FROM blobs b"
+        "  LEFT JOIN blob_map bm"
+        "    ON b.sha256 = bm.sha256"
+        " WHERE bm.sha256 IS NULL"
     )
-    """Delete blobs.sha256 (BLOBs) no longer in blob_map.sha256."""
+    """Select blobs.sha256 (BLOBs) no longer in blob_map.sha256."""
 
     SQL_ITER_BLOBS_SHA256_BYTES_C = (
         "SELECT b.sha256, b.bytes_c FROM blobs b"
@@ -314,6 +314,8 @@ CREATE TABLE IF NOT EXISTS blob_map (
             logger.critical("don't use SQLite DB in :memory: in production!!")
         super().__init__(cfg.db_url)
         self.cfg = cfg
+        if cfg.MAINTENANCE_MODE == "auto":
+            sqlitedb.MAINTENANCE.register(self)
 
     def __call__(self, resolver: str, authority: str) -> None | tuple[None | bytes, None | str]:
 
@@ -335,10 +337,6 @@ CREATE TABLE IF NOT EXISTS blob_map (
 
     def set(self, resolver: str, authority: str, mime: str | None, data: bytes | None) -> bool:
 
-        if self.cfg.MAINTENANCE_MODE == "auto" and int(time.time()) > self.next_maintenance_time:
-            # Should automatic maintenance be moved to a new thread?
-            self.maintenance()
-
         if data is not None and mime is None:
             logger.error(
                 "favicon resolver %s tries to cache mime-type None for authority %s",
@@ -359,14 +357,10 @@ CREATE TABLE IF NOT EXISTS blob_map (
         else:
             sha256 = hashlib.sha256(data).hexdigest()
 
-        with self.connect() as conn:
+        with sqlitedb.transaction(self.DB) as conn:
             if sha256 != FALLBACK_ICON:
                 conn.execute(self.SQL_INSERT_BLOBS, (sha256, bytes_c, mime, data))
             conn.execute(self.SQL_INSERT_BLOB_MAP, (sha256, resolver, authority))
-        # hint: the with context of the connection object closes the transaction
-        # but not the DB connection.  The connection has to be closed by the
-        # caller of self.connect()!
-        conn.close()
 
         return True
 
@@ -387,41 +381,43 @@ CREATE TABLE IF NOT EXISTS blob_map (
         self.properties.set("LAST_MAINTENANCE", "")  # hint: this (also) sets the m_time of the property!
 
         # Do maintenance tasks.  This can be take a little more time, to avoid
-        # DB locks, establish a new DB connection.
+        # DB locks, establish a new DB connection and delete in batches.
 
-        with self.connect() as conn:
+        conn = self.connect()
 
-            # drop items not in HOLD time
-            res = conn.execute(
-                f"DELETE FROM blob_map"
-                f" WHERE cast(m_time as integer) < cast(strftime('%s', 'now') as integer) - {self.cfg.HOLD_TIME}"
-            )
-            logger.debug("dropped %s obsolete blob_map items from db", res.rowcount)
-            res = conn.execute(self.SQL_DROP_LEFTOVER_BLOBS)
-            logger.debug("dropped %s obsolete BLOBS from db", res.rowcount)
-
-            # drop old items to be in LIMIT_TOTAL_BYTES
-            total_bytes = conn.execute("SELECT SUM(bytes_c) FROM blobs").fetchone()[0] or 0
-            if total_bytes > self.cfg.LIMIT_TOTAL_BYTES:
-
-                x = total_bytes - self.cfg.LIMIT_TOTAL_BYTES
-                c = 0
-                sha_list = []
-                for row in conn.execute(self.SQL_ITER_BLOBS_SHA256_BYTES_C):
-                    sha256, bytes_c = row
-                    sha_list.append(sha256)
-                    c += bytes_c
-                    if c > x:
-                        break
-                if sha_list:
-                    conn.execute("DELETE FROM blobs WHERE sha256 IN ('%s')" % "','".join(sha_list))
-                    conn.execute("DELETE FROM blob_map WHERE sha256 IN ('%s')" % "','".join(sha_list))
-                    logger.debug("dropped %s blobs with total size of %s bytes", len(sha_list), c)
-
-        # Vacuuming the WALs
-        # https://www.theunterminatedstring.com/sqlite-vacuuming/
-
-        conn.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+        # drop items not in HOLD time
+        count = self.delete_batched(
+            conn,
+            "blob_map",
+            "SELECT rowid FROM blob_map"
+            " WHERE cast(m_time as integer) < cast(strftime('%s', 'now') as integer) - ?",
+            (self.cfg.HOLD_TIME,),
+        )
+        logger.debug("dropped %s obsolete blob_map items from db", count)
+        count = self.delete_batched(conn, "blobs", self.SQL_SELECT_LEFTOVER_BLOBS)
+        logger.debug("dropped %s obsolete BLOBS from db", count)
+
+        # drop old items to be in LIMIT_TOTAL_BYTES
+        total_bytes = conn.execute("SELECT SUM(bytes_c) FROM blobs").fetchone()[0] or 0
+        if total_bytes > self.cfg.LIMIT_TOTAL_BYTES:
+
+            x = total_bytes - self.cfg.LIMIT_TOTAL_BYTES
+            c = 0
+            sha_list = []
+            for row in conn.execute(self.SQL_ITER_BLOBS_SHA256_BYTES_C):
+                sha256, bytes_c = row
+                sha_list.append(sha256)
+                c += bytes_c
+                if c > x:
+                    break
+            for i in range(0, len(sha_list), self.MAINTENANCE_BATCH_SIZE):
+                batch = sha_list[i : i + self.MAINTENANCE_BATCH_SIZE]
+                placeholders = ",".join("?" * len(batch))
+                conn.execute(f"DELETE FROM blobs WHERE sha256 IN ({placeholders})", batch)
+                conn.execute(f"DELETE FROM blob_map WHERE sha256 IN ({placeholders})", batch)
+            logger.debug("dropped %s blobs with total size of %s bytes", len(sha_list), c)
+
+        self.vacuum(conn)
         conn.close()
 
     def _query_val(self, sql, default=None):
@@ -0,0 +1,278 @@
+# SPDX-License-Identifier: AGPL-3.0-or-later
+"""Disk cache of the images served by the image proxy (see
+:py:obj:`searx.webapp.image_proxy`).
+
+The images are stored *content-addressed*: the file of an image is named by the
+sha256 hash of its content, an image that is referenced by several URLs is
+stored only once.  The index (a SQLite DB) maps the HMAC of the URL (the ``h``
+argument of the image proxy) to the sha256 hash of the image.
+
+- Images larger than :py:obj:`MAX_OBJECT_BYTES` are not cached (the same limit
+  the image proxy applies to the images it forwards).
+- The total size of the cache is limited by ``max_bytes``, when the limit is
+  exceeded, the least recently (``lru``) or least frequently (``lfu``) used
+  images are evicted.
+- Images not used for ``hold_time`` seconds are dropped, the maintenance runs in
+  a background thread (:py:obj:`searx.sqlitedb.MAINTENANCE`).
+- Hits and misses are recorded in the metrics (``image_proxy.cache.*``).
+
+.. code:: yaml
+
+   server:
+     image_proxy: true
+     image_proxy_cache:
+       enabled: true
+       path: /var/cache/searxng/images
+       max_bytes: 268435456
+       eviction: lru
+       hold_time: 604800
+       maintenance_period: 3600
+
+If ``path`` is not set, a folder in the temporary directory of the system is
+used.
+"""
+
+from __future__ import annotations
+
+__all__ = ["CACHE", "CachedImage", "ImageCache", "initialize"]
+
+import hashlib
+import os
+import pathlib
+import tempfile
+import time
+import typing
+
+from searx import logger
+from searx import sqlitedb
+from searx.metrics import counter_inc
+
+logger = logger.getChild('image_cache')
+
+MAX_OBJECT_BYTES = 5 * 1024 * 1024
+"""Maximum size (in bytes) of an image that is forwarded by the image proxy and
+stored in the cache."""
+
+CACHE: ImageCache | None = None
+"""The image cache, ``None`` if the cache is disabled."""
+
+
+class CachedImage(typing.NamedTuple):
+    """An image stored in the :py:obj:`ImageCache`."""
+
+    sha256: str
+    mime: str
+    bytes_c: int
+    c_time: int
+    """Time (unix epoch) the image was stored in the cache."""
+    path: pathlib.Path
+
+
+class ImageCache(sqlitedb.SQLiteAppl):
+    """Size-bounded, content-addressed disk cache of images.  The files are
+    stored in ``<path>/<sha256[:2]>/<sha256>``, the index is stored in the
+    SQLite DB ``<path>/index.db``."""
+
+    DB_SCHEMA = 1
+
+    DDL_IMAGES = """\
+CREATE TABLE IF NOT EXISTS images (
+  key        TEXT,
+  sha256     TEXT NOT NULL,
+  mime       TEXT NOT NULL,
+  bytes_c    INTEGER NOT NULL,
+  c_time     INTEGER DEFAULT (strftime('%s', 'now')),  -- created (unix epoch) time in sec.
+  a_time     INTEGER DEFAULT (strftime('%s', 'now')),  -- last access (unix epoch) time in sec.
+  hits       INTEGER DEFAULT 0,
+  PRIMARY KEY (key))"""
+
+    """Table to map from the key (HMAC of the URL) to the sha256 hash values."""
+
+    DDL_CREATE_TABLES = {
+        "images": DDL_IMAGES,
+    }
+
+    SQL_INSERT_IMAGE = (
+        "INSERT INTO images (key, sha256, mime, bytes_c) VALUES (?, ?, ?, ?)"
+        "    ON CONFLICT DO UPDATE"
+        "   SET sha256=excluded.sha256, mime=excluded.mime, bytes_c=excluded.bytes_c,"
+        "       c_time=strftime('%s', 'now'), a_time=strftime('%s', 'now')"
+    )
+
+    ACCESS_RESOLUTION = 60
+    """The access time of an image is updated at most once in this period (in
+    sec.), the hit counter is incremented on each hit."""
+
+    EVICTION_ORDER = {
+        "lru": "a_time ASC",
+        "lfu": "hits ASC, a_time ASC",
+    }
+
+    def __init__(
+        self,
+        path: str | pathlib.Path,
+        max_bytes: int,
+        eviction: str = "lru",
+        hold_time: int = 60 * 60 * 24 * 7,
+        maintenance_period: int = 60 * 60,
+    ):
+        self.path = pathlib.Path(path)
+        self.path.mkdir(parents=True, exist_ok=True)
+        self.max_bytes = max_bytes
+        self.eviction = eviction
+        self.hold_time = hold_time
+        self.maintenance_period = maintenance_period
+        super().__init__(str(self.path / "index.db"))
+        sqlitedb.MAINTENANCE.register(self)
+
+    def blob_path(self, sha256: str) -> pathlib.Path:
+        return self.path / sha256[:2] / sha256
+
+    def get(self, key: str) -> CachedImage | None:
+        """Returns the cached image of ``key`` or ``None``."""
+
+        sql = "SELECT sha256, mime, bytes_c, c_time, a_time FROM images WHERE key = ?"
+        res = self.DB.execute(sql, (key,)).fetchone()
+        if res is None:
+            counter_inc('image_proxy', 'cache', 'miss')
+            return None
+
+        sha256, mime, bytes_c, c_time, a_time = res
+        path = self.blob_path(sha256)
+        if not path.is_file():
+            # the file has been evicted (by another process) in the meantime
+            self.DB.execute("DELETE FROM images WHERE key = ? AND sha256 = ?", (key, sha256))
+            counter_inc('image_proxy', 'cache', 'miss')
+            return None
+
+        if int(a_time) < int(time.time()) - self.ACCESS_RESOLUTION:
+            sql = "UPDATE images SET hits = hits + 1, a_time = strftime('%s', 'now') WHERE key = ?"
+        else:
+            sql = "UPDATE images SET hits = hits + 1 WHERE key = ?"
+        self.DB.execute(sql, (key,))
+
+        counter_inc('image_proxy', 'cache', 'hit')
+        return CachedImage(sha256, mime, bytes_c, c_time, path)
+
+    def set(self, key: str, mime: str, data: bytes) -> bool:
+        """Store the image ``data`` by ``key``.  Returns ``False`` if the image
+        is too large to be cached."""
+
+        bytes_c = len(data)
+        if bytes_c > MAX_OBJECT_BYTES:
+            logger.debug("image to big to cache (bytes: %s)", bytes_c)
+            return False
+
+        sha256 = hashlib.sha256(data).hexdigest()
+        path = self.blob_path(sha256)
+        if not path.is_file():
+            path.parent.mkdir(exist_ok=True)
+            # write to a temporary file first, concurrent readers (and writers
+            # from other processes) never see a partial file
+            fd, tmp_name = tempfile.mkstemp(dir=path.parent, prefix=".tmp_")
+            try:
+                with os.fdopen(fd, "wb") as f:
+                    f.write(data)
+                os.replace(tmp_name, path)
+            except OSError:
+                logger.exception("can't write image to cache")
+                if os.path.exists(tmp_name):
+                    os.unlink(tmp_name)
+                return False
+
+        self.DB.execute(self.SQL_INSERT_IMAGE, (key, sha256, mime, bytes_c))
+        return True
+
+    @property
+    def next_maintenance_time(self) -> int:
+        """Returns (unix epoch) time of the next maintenance."""
+
+        return self.maintenance_period + self.properties.m_time("LAST_MAINTENANCE")
+
+    def maintenance(self, force=False):
+        """Drop the images not used in ``hold_time`` and evict images until the
+        total size of the cache is in ``max_bytes``.  Files no longer referenced
+        by the index are deleted."""
+
+        if not force and int(time.time()) < self.next_maintenance_time:
+            logger.debug("no maintenance required yet, next maintenance interval is in the future")
+            return
+        self.properties.set("LAST_MAINTENANCE", "")  # hint: this (also) sets the m_time of the property!
+
+        conn = self.connect()
+
+        # drop items not in HOLD time
+        count = self.delete_batched(
+            conn,
+            "images",
+            "SELECT rowid FROM images"
+            " WHERE cast(a_time as integer) < cast(strftime('%s', 'now') as integer) - ?",
+            (self.hold_time,),
+        )
+        logger.debug("dropped %s obsolete images from index", count)
+
+        # evict images to be in max_bytes, an image referenced by several keys
+        # is counted once
+        total_bytes = conn.execute("SELECT SUM(bytes_c) FROM (SELECT DISTINCT sha256, bytes_c FROM images)")
+        total_bytes = total_bytes.fetchone()[0] or 0
+        if total_bytes > self.max_bytes:
+            x = total_bytes - self.max_bytes
+            c = 0
+            keys = []
+            evicted = set()
+            sql = f"SELECT key, sha256, bytes_c FROM images ORDER BY {self.EVICTION_ORDER[self.eviction]}"
+            for key, sha256, bytes_c in conn.execute(sql):
+                keys.append(key)
+                if sha256 not in evicted:
+                    evicted.add(sha256)
+                    c += bytes_c
+                if c > x:
+                    break
+            for i in range(0, len(keys), self.MAINTENANCE_BATCH_SIZE):
+                batch = keys[i : i + self.MAINTENANCE_BATCH_SIZE]
+                conn.execute(f"DELETE FROM images WHERE key IN ({','.join('?' * len(batch))})", batch)
+            logger.debug("evicted %s images with total size of %s bytes", len(keys), c)
+
+        referenced = {row[0] for row in conn.execute("SELECT DISTINCT sha256 FROM images")}
+
+        self.vacuum(conn)
+        conn.close()
+
+        # delete files no longer referenced by the index
+        dropped = 0
+        for folder in self.path.iterdir():
+            if not folder.is_dir():
+                continue
+            for blob in folder.iterdir():
+                if blob.name in referenced:
+                    continue
+                if blob.name.startswith(".tmp_") and blob.stat().st_mtime > time.time() - 60:
+                    # temporary file of a write in progress
+                    continue
+                try:
+                    blob.unlink()
+                    dropped += 1
+                except OSError:
+                    pass
+        logger.debug("deleted %s image files", dropped)
+
+
+def initialize(cfg: dict[str, typing.Any]):
+    """Initialize the image cache from the settings
+    (``server.image_proxy_cache``)."""
+    global CACHE  # pylint: disable=global-statement
+
+    CACHE = None
+    if not cfg['enabled']:
+        return
+    path = cfg['path'] or pathlib.Path(tempfile.gettempdir()) / "sxng_image_cache"
+    CACHE = ImageCache(
+        path,
+        max_bytes=cfg['max_bytes'],
+        eviction=cfg['eviction'],
+        hold_time=cfg['hold_time'],
+        maintenance_period=cfg['maintenance_period'],
+    )
+    # set up the DB schema before the cache is used by concurrent threads
+    CACHE.connect().close()
+    logger.debug("image cache: %s (max. %s bytes)", path, cfg['max_bytes'])
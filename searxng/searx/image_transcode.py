@@ -0,0 +1,165 @@
+# SPDX-License-Identifier: AGPL-3.0-or-later
+"""Downscaling and re-encoding of the thumbnails served by the image proxy (see
+:py:obj:`searx.webapp.image_proxy`).
+
+Engines often return full-size images as thumbnails, the image proxy forwards
+them byte for byte.  If enabled, the thumbnails are downscaled to ``width``
+pixels and re-encoded (``webp``, ``avif`` or ``jpeg``) before they are sent to
+the client.
+
+- The width is a parameter of the image proxy URL (``w``) and is covered by
+  the HMAC of the URL, a client can't request arbitrary sizes.
+- Images are decoded and encoded in a pool of worker processes (``workers``),
+  the GIL of the web application is not held by the image codecs.
+- If the image proxy cache (:py:obj:`searx.image_cache`) is enabled, the
+  thumbnails are stored in the cache.
+- If an image can't be transcoded (unknown format, too many pixels, timeout,
+  ..) the original image is sent and it is not stored in the cache.
+- The size of an image is read from its header before the image is passed to
+  the pool, images with more than :py:obj:`MAX_PIXELS` pixels are not
+  transcoded (a worker can't be stopped once it has started to decode an
+  image).
+
+.. code:: yaml
+
+   server:
+     image_proxy: true
+     image_proxy_thumbnails:
+       enabled: true
+       width: 640
+       format: webp
+       quality: 75
+       workers: 2
+       timeout: 5.0
+
+The transcoding requires the Pillow_ library (``pip install pillow``), for the
+``avif`` format a Pillow with AVIF support is needed.  Without Pillow, the
+thumbnails are forwarded unchanged.
+
+.. _Pillow: https://pypi.org/project/pillow/
+"""
+
+from __future__ import annotations
+
+__all__ = ["initialize", "is_active", "thumbnail_width", "transcode"]
+
+import concurrent.futures
+import io
+import os
+import threading
+import typing
+
+from searx import logger
+
+try:
+    from PIL import Image
+except ImportError:
+    Image = None
+
+logger = logger.getChild('image_transcode')
+
+CFG: dict[str, typing.Any] = {'enabled': False}
+
+MIME_TYPES = {
+    'webp': 'image/webp',
+    'avif': 'image/avif',
+    'jpeg': 'image/jpeg',
+}
+
+MAX_PIXELS = 4096 * 4096
+"""Images with more pixels are not transcoded."""
+
+_POOL: concurrent.futures.ProcessPoolExecutor | None = None
+_POOL_PID: int | None = None
+_POOL_LOCK = threading.Lock()
+
+
+def initialize(cfg: dict[str, typing.Any]):
+    """Initialize the transcoding from the settings
+    (``server.image_proxy_thumbnails``)."""
+    CFG.clear()
+    CFG.update(cfg)
+    if CFG['enabled'] and Image is None:
+        logger.error("image_proxy_thumbnails: the Pillow library is not installed, thumbnails are not transcoded")
+
+
+def is_active() -> bool:
+    return bool(CFG['enabled'] and Image is not None)
+
+
+def thumbnail_width() -> int | None:
+    """Returns the width of the thumbnails or ``None`` if the thumbnails are
+    not transcoded."""
+    if not is_active():
+        return None
+    return CFG['width']
+
+
+def get_pool() -> concurrent.futures.ProcessPoolExecutor:
+    """Returns the process pool of this process.  The pool is started on
+    demand, so a process that has been forked from the master process (e.g.
+    uWSGI or granian workers) has its own pool."""
+    global _POOL, _POOL_PID  # pylint: disable=global-statement
+
+    with _POOL_LOCK:
+        if _POOL is None or _POOL_PID != os.getpid():
+            _POOL = concurrent.futures.ProcessPoolExecutor(max_workers=CFG['workers'])
+            _POOL_PID = os.getpid()
+        return _POOL
+
+
+def transcode(data: bytes, width: int, mime: str) -> tuple[bytes, str] | None:
+    """Downscale the image ``data`` (of type ``mime``) to ``width`` and
+    re-encode it.  Returns the new image and its MIME type, the original image
+    if it is smaller or ``None`` if the image can't be transcoded."""
+
+    try:
+        with Image.open(io.BytesIO(data)) as img:  # type: ignore
+            # reads the header only, the image is not decoded
+            pixels = img.width * img.height
+    except Exception:  # pylint: disable=broad-except
+        logger.debug("unknown image format (%s bytes)", len(data))
+        return None
+    if pixels > MAX_PIXELS:
+        logger.debug("image is too large to transcode (%s pixels)", pixels)
+        return None
+
+    fmt = CFG['format']
+    future = get_pool().submit(_transcode, data, width, fmt, CFG['quality'])
+    try:
+        result = future.result(timeout=CFG['timeout'])
+    except concurrent.futures.TimeoutError:
+        future.cancel()
+        logger.debug("timeout while transcoding image (%s bytes)", len(data))
+        return None
+    except Exception:  # pylint: disable=broad-except
+        # BrokenProcessPool or an exception in the worker
+        logger.exception("error while transcoding image")
+        return None
+
+    if result is None:
+        return None
+    if len(result) >= len(data):
+        return data, mime
+    return result, MIME_TYPES[fmt]
+
+
+def _transcode(data: bytes, width: int, fmt: str, quality: int) -> bytes | None:
+    # runs in a worker process of the pool
+
+    try:
+        with Image.open(io.BytesIO(data)) as img:  # type: ignore
+            # the JPEG decoder can scale down while decoding
+            img.draft('RGB', (width, width * img.height // max(img.width, 1)))
+            if img.width > width:
+                img.thumbnail((width, img.height), Image.Resampling.LANCZOS)  # type: ignore
+            if img.mode not in ('RGB', 'RGBA'):
+                img = img.convert('RGBA' if 'transparency' in img.info or img.mode in ('LA', 'PA') else 'RGB')
+            if fmt == 'jpeg' and img.mode == 'RGBA':
+                img = img.convert('RGB')
+            out = io.BytesIO()
+            img.save(out, format=fmt.upper(), quality=quality)
+            return out.getvalue()
+    except Exception:  # pylint: disable=broad-except
+        # unknown image format, decompression bomb, codec not available, ..
+        return None
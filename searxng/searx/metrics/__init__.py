@@ -4,16 +4,23 @@
 import typing
 import math
 import contextlib
+import contextvars
 from timeit import default_timer
 from operator import itemgetter
 
+import valkey
+
+from searx import logger, settings
 from searx.engines import engines
 from searx.openmetrics import OpenMetricsFamily
-from .models import HistogramStorage, CounterStorage, VoidHistogram, VoidCounterStorage
+from .models import Histogram, HistogramStorage, Counter, CounterStorage, VoidHistogram, VoidCounterStorage
 from .error_recorder import count_error, count_exception, errors_per_engines
+from . import aggregation
 
 __all__ = [
     "initialize",
+    "engine_metrics",
+    "EngineMetrics",
     "get_engines_stats",
     "get_engine_errors",
     "histogram",
@@ -24,8 +31,11 @@ __all__ = [
     "counter_add",
     "count_error",
     "count_exception",
+    "cluster_wide",
 ]
 
+logger = logger.getChild('searx.metrics')
+
 
 ENDPOINTS = {'search'}
 
@@ -34,6 +44,54 @@ histogram_storage: typing.Optional[HistogramStorage] = None
 counter_storage: typing.Optional[CounterStorage] = None
 
 
+class EngineMetrics(typing.NamedTuple):
+    """The metrics of an engine, resolved once by :py:obj:`initialize`.  On the
+    hot path, ``engine_metrics[name].time_total.observe(t)`` saves the lookup of
+    ``histogram_observe(t, 'engine', name, 'time', 'total')``."""
+
+    sent: Counter
+    successful: Counter
+    error: Counter
+    score: Counter
+    result_count: Histogram
+    time_http: Histogram
+    time_queue: Histogram
+    time_total: Histogram
+
+
+engine_metrics: dict[str, EngineMetrics] = {}
+"""The :py:obj:`EngineMetrics` by engine name."""
+
+# storages read by histogram(), counter() and get_engine_errors() in the
+# cluster_wide() context
+_cluster_storages: contextvars.ContextVar[typing.Optional[tuple]] = contextvars.ContextVar(
+    'cluster_storages', default=None
+)
+
+
+def _read_storages() -> tuple:
+    return _cluster_storages.get() or (histogram_storage, counter_storage, errors_per_engines)
+
+
+@contextlib.contextmanager
+def cluster_wide():
+    """In this context, :py:obj:`histogram`, :py:obj:`counter` and the
+    statistics functions report the totals of all workers (see
+    :py:obj:`searx.metrics.aggregation`).  Without aggregation (or if the Valkey
+    DB is not available), the metrics of this process are reported."""
+    storages = None
+    if aggregation.is_active():
+        try:
+            storages = aggregation.load()
+        except valkey.exceptions.ValkeyError as e:
+            logger.error("can't load the metrics of all workers: %s", e)
+    token = _cluster_storages.set(storages)
+    try:
+        yield
+    finally:
+        _cluster_storages.reset(token)
+
+
 @contextlib.contextmanager
 def histogram_observe_time(*args):
     h = histogram_storage.get(*args)
@@ -51,7 +109,7 @@ def histogram_observe(duration, *args):
 
 
 def histogram(*args, raise_on_not_found=True):
-    h = histogram_storage.get(*args)
+    h = _read_storages()[0].get(*args)
     if raise_on_not_found and h is None:
         raise ValueError("histogram " + repr((*args,)) + " doesn't not exist")
     return h
@@ -66,7 +124,7 @@ def counter_add(value, *args):
 
 
 def counter(*args):
-    return counter_storage.get(*args)
+    return _read_storages()[1].get(*args)
 
 
 def initialize(engine_names=None, enabled=True):
@@ -92,33 +150,83 @@ def initialize(engine_names=None, enabled=True):
     histogram_width = 0.1
     histogram_size = int(1.5 * max_timeout / histogram_width)
 
+    # engine worker pool (searx.search.workers)
+    counter_storage.configure('search', 'workers', 'rejected')
+    # number of requests waiting in the queue (when a request is submitted)
+    histogram_storage.configure(1, 512, 'search', 'workers', 'queue')
+    # time a request has been waiting in the queue
+    histogram_storage.configure(histogram_width, histogram_size, 'search', 'workers', 'wait')
+
+    # search result cache (searx.search.result_cache)
+    counter_storage.configure('search', 'cache', 'hit')
+    counter_storage.configure('search', 'cache', 'stale')
+    counter_storage.configure('search', 'cache', 'miss')
+
+    # hedged HTTP requests (searx.network.Network.hedged_request)
+    counter_storage.configure('network', 'hedge', 'sent')
+    counter_storage.configure('network', 'hedge', 'won')
+
+    # connections of the HTTP clients (searx.network.network.trace_connection)
+    counter_storage.configure('network', 'connection', 'requests')
+    counter_storage.configure('network', 'connection', 'new')
+
+    # DNS cache of the HTTP clients (searx.network.dns)
+    counter_storage.configure('network', 'dns', 'hit')
+    counter_storage.configure('network', 'dns', 'miss')
+
+    # image proxy cache (searx.image_cache)
+    counter_storage.configure('image_proxy', 'cache', 'hit')
+    counter_storage.configure('image_proxy', 'cache', 'miss')
+
+    # maintenance of the SQLite DBs (searx.sqlitedb.MaintenanceScheduler)
+    counter_storage.configure('sqlite', 'maintenance', 'count')
+    histogram_storage.configure(histogram_width, 600, 'sqlite', 'maintenance', 'time')
+
     # engines
+    engine_metrics.clear()
     for engine_name in engine_names or engines:
-        # search count
-        counter_storage.configure('engine', engine_name, 'search', 'count', 'sent')
-        counter_storage.configure('engine', engine_name, 'search', 'count', 'successful')
-        # global counter of errors
-        counter_storage.configure('engine', engine_name, 'search', 'count', 'error')
-        # score of the engine
-        counter_storage.configure('engine', engine_name, 'score')
-        # result count per requests
-        histogram_storage.configure(1, 100, 'engine', engine_name, 'result', 'count')
-        # time doing HTTP requests
-        histogram_storage.configure(histogram_width, histogram_size, 'engine', engine_name, 'time', 'http')
-        # total time
-        # .time.request and ...response times may overlap .time.http time.
-        histogram_storage.configure(histogram_width, histogram_size, 'engine', engine_name, 'time', 'total')
+        engine_metrics[engine_name] = EngineMetrics(
+            # search count
+            sent=counter_storage.configure('engine', engine_name, 'search', 'count', 'sent'),
+            successful=counter_storage.configure('engine', engine_name, 'search', 'count', 'successful'),
+            # global counter of errors
+            error=counter_storage.configure('engine', engine_name, 'search', 'count', 'error'),
+            # score of the engine
+            score=counter_storage.configure('engine', engine_name, 'score'),
+            # result count per requests
+            result_count=histogram_storage.configure(1, 100, 'engine', engine_name, 'result', 'count'),
+            # time doing HTTP requests
+            time_http=histogram_storage.configure(
+                histogram_width, histogram_size, 'engine', engine_name, 'time', 'http'
+            ),
+            # time waiting in the request queue of the network (searx.network.scheduler)
+            time_queue=histogram_storage.configure(
+                histogram_width, histogram_size, 'engine', engine_name, 'time', 'queue'
+            ),
+            # total time
+            # .time.request and ...response times may overlap .time.http time.
+            time_total=histogram_storage.configure(
+                histogram_width, histogram_size, 'engine', engine_name, 'time', 'total'
+            ),
+        )
+
+    # sum of the metrics of all workers (searx.metrics.aggregation)
+    if enabled:
+        aggregation.initialize(
+            settings['general']['metrics_aggregation'], histogram_storage, counter_storage, errors_per_engines
+        )
 
 
 def get_engine_errors(engline_name_list):
     result = {}
-    engine_names = list(errors_per_engines.keys())
+    errors = _read_storages()[2]
+    engine_names = list(errors.keys())
     engine_names.sort()
     for engine_name in engine_names:
         if engine_name not in engline_name_list:
             continue
 
-        error_stats = errors_per_engines[engine_name]
+        error_stats = errors[engine_name]
         sent_search_count = max(counter('engine', engine_name, 'search', 'count', 'sent'), 1)
         sorted_context_count_list = sorted(error_stats.items(), key=lambda context_count: context_count[1])
         r = []
@@ -0,0 +1,259 @@
+# SPDX-License-Identifier: AGPL-3.0-or-later
+"""Aggregation of the metrics of all worker processes (and nodes) in the Valkey
+DB (see :py:obj:`searx.metrics.cluster_wide`).
+
+The counters and histograms of :py:obj:`searx.metrics` are stored in the memory
+of the process, the ``/stats`` and ``/metrics`` endpoints only report the
+requests of the worker that serves the scrape.  With ``valkey: true`` (and a
+:ref:`settings valkey` DB):
+
+- A background thread of each worker process adds the changes of its counters,
+  histograms and errors since the last flush to the Valkey DB, every
+  ``flush_interval`` seconds.  :py:obj:`searx.metrics.histogram_observe` and
+  :py:obj:`searx.metrics.counter_add` are unchanged, there is no additional
+  lock or network call when a metric is recorded.
+- The ``/stats``, ``/stats/errors`` and ``/metrics`` endpoints report the totals
+  of all workers and of all nodes that share the Valkey DB.  The worker that
+  serves the scrape flushes its own changes first.
+
+.. code:: yaml
+
+   general:
+     enable_metrics: true
+     metrics_aggregation:
+       valkey: true
+       flush_interval: 10
+       ttl: 604800
+
+The totals are kept in the Valkey DB when SearXNG is restarted, a total that
+has not changed for ``ttl`` seconds expires (``0``: the totals never expire).
+The keys of the totals are prefixed by a secret hash of the ``instance_name``
+(:py:obj:`searx.valkeylib.secret_hash`), the nodes of an instance share their
+totals, two instances that share a Valkey DB don't.  All nodes must have the
+same engines and timeouts, the layout of the histograms depends on the timeouts
+of the engines.
+"""
+
+from __future__ import annotations
+
+__all__ = ["initialize", "is_active", "flush", "load"]
+
+import atexit
+import json
+import os
+import threading
+import typing
+
+import valkey
+
+from searx import get_setting, logger
+from searx import valkeydb
+from searx.valkeylib import secret_hash
+from .models import HistogramStorage, CounterStorage
+from .error_recorder import ErrorContext
+
+logger = logger.getChild('searx.metrics.aggregation')
+
+KEY_PREFIX = 'SearXNG_metrics_'
+
+CFG: dict[str, typing.Any] = {'valkey': False, 'flush_interval': 10, 'ttl': 604800}
+
+# the prefix of the keys of this instance (see initialize)
+_NAMESPACE = KEY_PREFIX
+
+# the storages of this process (searx.metrics.initialize)
+_STORAGES: tuple[HistogramStorage, CounterStorage, dict] | None = None
+
+# the values of the last flush: Valkey key --> {field: value}
+_FLUSHED: dict[str, dict[str, float]] = {}
+_FLUSH_LOCK = threading.Lock()
+
+_THREAD: threading.Thread | None = None
+_STOP = threading.Event()
+
+
+def initialize(cfg: dict[str, typing.Any], histogram_storage, counter_storage, errors_per_engines):
+    """Initialize the aggregation from the settings
+    (``general.metrics_aggregation``) and start the flush thread."""
+    global _STORAGES, _NAMESPACE  # pylint: disable=global-statement
+
+    CFG.clear()
+    CFG.update(cfg)
+    with _FLUSH_LOCK:
+        _NAMESPACE = KEY_PREFIX + secret_hash(get_setting('general.instance_name')) + '_'
+        _STORAGES = (histogram_storage, counter_storage, errors_per_engines)
+        _FLUSHED.clear()
+        _FLUSHED.update(_collect())
+    if is_active():
+        _start()
+
+
+def is_active() -> bool:
+    return bool(_STORAGES and CFG['valkey'] and valkeydb.client())
+
+
+def _counters_key() -> str:
+    return _NAMESPACE + 'counters'
+
+
+def _errors_key() -> str:
+    return _NAMESPACE + 'errors'
+
+
+def _histogram_key(args) -> str:
+    return _NAMESPACE + 'histogram|' + '|'.join(args)
+
+
+def _error_field(engine_name: str, context: ErrorContext) -> str:
+    return json.dumps([engine_name] + [getattr(context, name) for name in ErrorContext.__slots__], default=str)
+
+
+def _collect() -> dict[str, dict[str, float]]:
+    """Returns the current values of the metrics of this process: Valkey key
+    --> {field: value}."""
+    if _STORAGES is None:
+        return {}
+    histogram_storage, counter_storage, errors_per_engines = _STORAGES
+
+    with counter_storage.lock:
+        counters = list(counter_storage.counters.items())
+    result = {_counters_key(): {'|'.join(args): counter.value for args, counter in counters}}
+
+    for args, histogram in list(histogram_storage.measures.items()):
+        quartiles, count, sum_value = histogram.snapshot()
+        values = {str(i): q for i, q in enumerate(quartiles) if q}
+        values['count'] = count
+        values['sum'] = sum_value
+        result[_histogram_key(args)] = values
+
+    errors = {}
+    for engine_name, error_stats in list(errors_per_engines.items()):
+        for context, count in list(error_stats.items()):
+            errors[_error_field(engine_name, context)] = count
+    result[_errors_key()] = errors
+    return result
+
+
+def flush():
+    """Add the changes of the metrics since the last flush to the Valkey DB."""
+
+    if not is_active():
+        return
+    with _FLUSH_LOCK:
+        current = _collect()
+        pipe = valkeydb.client().pipeline(transaction=True)  # type: ignore
+        changes = 0
+        for key, values in current.items():
+            flushed = _FLUSHED.get(key, {})
+            key_changes = 0
+            for field, value in values.items():
+                delta = value - flushed.get(field, 0)
+                if delta:
+                    pipe.hincrbyfloat(key, field, delta)
+                    key_changes += 1
+            if key_changes and CFG['ttl']:
+                pipe.expire(key, CFG['ttl'])
+            changes += key_changes
+        if not changes:
+            return
+        try:
+            pipe.execute()
+        except valkey.exceptions.ValkeyError as e:
+            # the changes are added by the next flush
+            logger.error("can't flush the metrics: %s", e)
+            return
+        _FLUSHED.clear()
+        _FLUSHED.update(current)
+        logger.debug("flushed %s changes", changes)
+
+
+def load() -> tuple[HistogramStorage, CounterStorage, dict]:
+    """Returns the storages (histograms, counters, errors per engine) with the
+    totals of all workers.  The changes of this process are flushed first."""
+
+    flush()
+    histogram_storage, counter_storage, _ = _STORAGES  # type: ignore
+    histogram_args = list(histogram_storage.measures.keys())
+
+    pipe = valkeydb.client().pipeline(transaction=False)  # type: ignore
+    pipe.hgetall(_counters_key())
+    pipe.hgetall(_errors_key())
+    for args in histogram_args:
+        pipe.hgetall(_histogram_key(args))
+    counters, errors, *histograms = pipe.execute()
+
+    total_counters = CounterStorage()
+    counters = {k.decode(): _number(v) for k, v in counters.items()}
+    for args in counter_storage.counters:
+        total_counters.configure(*args)
+        total_counters.add(counters.get('|'.join(args), 0), *args)
+
+    total_histograms = HistogramStorage()
+    for args, values in zip(histogram_args, histograms):
+        local = histogram_storage.get(*args)
+        values = {k.decode(): _number(v) for k, v in values.items()}
+        quartiles = [0] * local.size
+        for field, value in values.items():
+            if field.isdigit():
+                # the histogram of another node may be larger
+                quartiles[min(int(field), local.size - 1)] += value
+        total_histograms.configure(local.width, local.size, *args).restore(
+            quartiles, values.get('count', 0), values.get('sum', 0)
+        )
+
+    total_errors: dict[str, dict[ErrorContext, int]] = {}
+    for field, value in errors.items():
+        engine_name, *context = json.loads(field)
+        context = ErrorContext(*context)
+        context.log_parameters = tuple(context.log_parameters)
+        total_errors.setdefault(engine_name, {})[context] = _number(value)
+
+    return total_histograms, total_counters, total_errors
+
+
+def _number(value: bytes) -> int | float:
+    value = float(value)
+    if value.is_integer():
+        return int(value)
+    return value
+
+
+def _run():
+    while not _STOP.wait(CFG['flush_interval']):
+        try:
+            flush()
+        except Exception:  # pylint: disable=broad-except
+            logger.exception("error while flushing the metrics")
+
+
+def _start():
+    global _THREAD  # pylint: disable=global-statement
+
+    if _THREAD is not None and _THREAD.is_alive():
+        return
+    _STOP.clear()
+    _THREAD = threading.Thread(target=_run, name='metrics_aggregation', daemon=True)
+    _THREAD.start()
+
+
+def _after_fork():
+    # the flush thread is not running in the forked process (e.g. uWSGI
+    # workers) and the changes of the parent process are flushed by the parent
+    global _THREAD, _FLUSH_LOCK  # pylint: disable=global-statement
+
+    _THREAD = None
+    _FLUSH_LOCK = threading.Lock()
+    if _STORAGES is not None:
+        # a thread of the parent process may have held a lock of the storages
+        # when the process was forked, the lock would never be released
+        histogram_storage, counter_storage, _ = _STORAGES
+        histogram_storage.reset_locks()
+        counter_storage.reset_locks()
+    _FLUSHED.clear()
+    _FLUSHED.update(_collect())
+    if is_active():
+        _start()
+
+
+os.register_at_fork(after_in_child=_after_fork)
+atexit.register(flush)
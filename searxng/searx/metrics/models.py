@@ -1,20 +1,34 @@
 # SPDX-License-Identifier: AGPL-3.0-or-later
 # pylint: disable=missing-module-docstring
 
+import collections
 import decimal
 import threading
 
 from searx import logger
 
 
-__all__ = ["Histogram", "HistogramStorage", "CounterStorage"]
+__all__ = ["Histogram", "HistogramStorage", "Counter", "CounterStorage"]
 
 logger = logger.getChild('searx.metrics')
 
 
-class Histogram:  # pylint: disable=missing-class-docstring
+MERGE_SIZE = 1024
+"""Number of buffered values of a :py:obj:`Histogram` or a :py:obj:`Counter`
+after which the values are merged (the values are merged anyway when the
+metric is read)."""
 
-    _slots__ = '_lock', '_size', '_sum', '_quartiles', '_count', '_width'
+
+class Histogram:
+    """Histogram of the values in bins of ``width``, the last bin holds all
+    values above.
+
+    :py:obj:`observe` does not take a lock: the value is appended to a buffer
+    (a :py:obj:`collections.deque`, appending is thread-safe).  The buffered
+    values are merged into the bins when the histogram is read or when the
+    buffer holds :py:obj:`MERGE_SIZE` values."""
+
+    __slots__ = '_lock', '_size', '_sum', '_quartiles', '_count', '_width', '_pending'
 
     def __init__(self, width=10, size=200):
         self._lock = threading.Lock()
@@ -23,34 +37,73 @@ class Histogram:  # pylint: disable=missing-class-docstring
         self._quartiles = [0] * size
         self._count = 0
         self._sum = 0
+        self._pending = collections.deque()
 
     def observe(self, value):
-        q = int(value / self._width)
-        if q < 0:  # pylint: disable=consider-using-max-builtin
-            # Value below zero is ignored
-            q = 0
-        if q >= self._size:
-            # Value above the maximum is replaced by the maximum
-            q = self._size - 1
+        self._pending.append(value)
+        if len(self._pending) >= MERGE_SIZE:
+            self._merge()
+
+    def _merge(self):
+        # only one thread pops from the buffer (the one holding the lock)
         with self._lock:
-            self._quartiles[q] += 1
-            self._count += 1
-            self._sum += value
+            pending = self._pending
+            quartiles = self._quartiles
+            width = self._width
+            last = self._size - 1
+            for _ in range(len(pending)):
+                value = pending.popleft()
+                q = int(value / width)
+                if q < 0:  # pylint: disable=consider-using-max-builtin
+                    # Value below zero is ignored
+                    q = 0
+                if q > last:
+                    # Value above the maximum is replaced by the maximum
+                    q = last
+                quartiles[q] += 1
+                self._count += 1
+                self._sum += value
 
     @property
     def quartiles(self):
+        self._merge()
         return list(self._quartiles)
 
+    @property
+    def width(self):
+        return self._width
+
+    @property
+    def size(self):
+        return self._size
+
+    def snapshot(self):
+        '''Returns a copy of the quartiles, the count and the sum'''
+        self._merge()
+        with self._lock:
+            return list(self._quartiles), self._count, self._sum
+
+    def restore(self, quartiles, count, sum_value):
+        '''Replace the quartiles, the count and the sum (see snapshot)'''
+        with self._lock:
+            self._pending.clear()
+            self._quartiles = list(quartiles)
+            self._count = count
+            self._sum = sum_value
+
     @property
     def count(self):
+        self._merge()
         return self._count
 
     @property
     def sum(self):
+        self._merge()
         return self._sum
 
     @property
     def average(self):
+        self._merge()
         with self._lock:
             if self._count != 0:
                 return self._sum / self._count
@@ -59,6 +112,7 @@ class Histogram:  # pylint: disable=missing-class-docstring
     @property
     def quartile_percentage(self):
         '''Quartile in percentage'''
+        self._merge()
         with self._lock:
             if self._count > 0:
                 return [int(q * 100 / self._count) for q in self._quartiles]
@@ -71,6 +125,7 @@ class Histogram:  # pylint: disable=missing-class-docstring
         x = decimal.Decimal(0)
         width = decimal.Decimal(self._width)
         width_exponent = -width.as_tuple().exponent
+        self._merge()
         with self._lock:
             if self._count > 0:
                 for y in self._quartiles:
@@ -81,6 +136,7 @@ class Histogram:  # pylint: disable=missing-class-docstring
         return result
 
     def percentage(self, percentage):
+        self._merge()
         # use Decimal to avoid rounding errors
         x = decimal.Decimal(0)
         width = decimal.Decimal(self._width)
@@ -95,8 +151,13 @@ class Histogram:  # pylint: disable=missing-class-docstring
                     x += width
         return None
 
+    def reset_lock(self):
+        """Re-create the lock (in a forked process, the lock may have been held
+        by a thread of the parent process)."""
+        self._lock = threading.Lock()
+
     def __repr__(self):
-        return "Histogram<avg: " + str(self.average) + ", count: " + str(self._count) + ">"
+        return "Histogram<avg: " + str(self.average) + ", count: " + str(self.count) + ">"
 
 
 class HistogramStorage:  # pylint: disable=missing-class-docstring
@@ -118,6 +179,10 @@ class HistogramStorage:  # pylint: disable=missing-class-docstring
     def get(self, *args):
         return self.measures.get(args, None)
 
+    def reset_locks(self):
+        for measure in list(self.measures.values()):
+            measure.reset_lock()
+
     def dump(self):
         logger.debug("Histograms:")
         ks = sorted(self.measures.keys(), key='/'.join)  # pylint: disable=invalid-name
@@ -125,12 +190,47 @@ class HistogramStorage:  # pylint: disable=missing-class-docstring
             logger.debug("- %-60s %s", '|'.join(k), self.measures[k])
 
 
-class CounterStorage:  # pylint: disable=missing-class-docstring
+class Counter:
+    """Counter, :py:obj:`add` does not take a lock (see :py:obj:`Histogram`)."""
 
-    __slots__ = 'counters', 'lock'
+    __slots__ = '_lock', '_value', '_pending'
 
     def __init__(self):
+        self._lock = threading.Lock()
+        self._value = 0
+        self._pending = collections.deque()
+
+    def add(self, value):
+        self._pending.append(value)
+        if len(self._pending) >= MERGE_SIZE:
+            self._merge()
+
+    def _merge(self):
+        with self._lock:
+            pending = self._pending
+            for _ in range(len(pending)):
+                self._value += pending.popleft()
+
+    @property
+    def value(self):
+        self._merge()
+        return self._value
+
+    def reset_lock(self):
+        """See :py:obj:`Histogram.reset_lock`."""
+        self._lock = threading.Lock()
+
+    def __repr__(self):
+        return "Counter<" + str(self.value) + ">"
+
+
+class CounterStorage:  # pylint: disable=missing-class-docstring
+
+    __slots__ = 'counters', 'lock', 'counter_class'
+
+    def __init__(self, counter_class=Counter):
         self.lock = threading.Lock()
+        self.counter_class = counter_class
         self.clear()
 
     def clear(self):
@@ -138,22 +238,28 @@ class CounterStorage:  # pylint: disable=missing-class-docstring
             self.counters = {}
 
     def configure(self, *args):
+        counter = self.counter_class()
         with self.lock:
-            self.counters[args] = 0
+            self.counters[args] = counter
+        return counter
 
     def get(self, *args):
-        return self.counters[args]
+        return self.counters[args].value
 
     def add(self, value, *args):
-        with self.lock:
-            self.counters[args] += value
+        self.counters[args].add(value)
+
+    def reset_locks(self):
+        self.lock = threading.Lock()
+        for counter in list(self.counters.values()):
+            counter.reset_lock()
 
     def dump(self):
         with self.lock:
             ks = sorted(self.counters.keys(), key='/'.join)  # pylint: disable=invalid-name
         logger.debug("Counters:")
         for k in ks:
-            logger.debug("- %-60s %s", '|'.join(k), self.counters[k])
+            logger.debug("- %-60s %s", '|'.join(k), self.counters[k].value)
 
 
 class VoidHistogram(Histogram):  # pylint: disable=missing-class-docstring
@@ -161,6 +267,14 @@ class VoidHistogram(Histogram):  # pylint: disable=missing-class-docstring
         pass
 
 
+class VoidCounter(Counter):  # pylint: disable=missing-class-docstring
+    def add(self, value):
+        pass
+
+
 class VoidCounterStorage(CounterStorage):  # pylint: disable=missing-class-docstring
+    def __init__(self):
+        super().__init__(counter_class=VoidCounter)
+
     def add(self, value, *args):
         pass
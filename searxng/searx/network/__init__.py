@@ -7,24 +7,43 @@ import concurrent.futures
 from queue import SimpleQueue
 from types import MethodType
 from timeit import default_timer
-from typing import Iterable, NamedTuple, Tuple, List, Dict, Union
+from typing import Iterable, NamedTuple, Tuple, List, Dict, Optional, Union
 from contextlib import contextmanager
 
 import httpx
 import anyio
 
 from searx.extended_types import SXNG_Response
-from .network import get_network, initialize, check_network_configuration  # pylint:disable=cyclic-import
+from .network import get_network, initialize, check_network_configuration, warmup  # pylint:disable=cyclic-import
 from .client import get_loop
+from .scheduler import QueueTicket
 from .raise_for_httperror import raise_for_httperror
 
 
 THREADLOCAL = threading.local()
 """Thread-local data is data for thread specific values."""
 
+STREAM_CHUNK_SIZE = 65536
+"""Size of the first chunk passed from the event loop to the thread that reads
+a :py:obj:`stream`.  The size of the following chunks is doubled up to
+:py:obj:`STREAM_MAX_CHUNK_SIZE`, the fewer chunks the fewer thread hops."""
+
+STREAM_MAX_CHUNK_SIZE = 1024 * 1024
+"""Maximum size of a chunk passed to the thread that reads a :py:obj:`stream`."""
+
+STREAM_MAX_PENDING_CHUNKS = 4
+"""Maximum number of chunks that have not yet been read by the thread that reads
+a :py:obj:`stream` (backpressure: the event loop stops reading the response)."""
+
 
 def reset_time_for_thread():
     THREADLOCAL.total_time = 0
+    THREADLOCAL.queue_time = 0
+
+
+def add_time_for_thread(duration):
+    """add ``duration`` to the thread's total time"""
+    THREADLOCAL.total_time = THREADLOCAL.__dict__.get('total_time', 0) + duration
 
 
 def get_time_for_thread():
@@ -32,6 +51,17 @@ def get_time_for_thread():
     return THREADLOCAL.__dict__.get('total_time')
 
 
+def add_queue_time_for_thread(duration):
+    """add ``duration`` to the thread's time waited in the request queues"""
+    THREADLOCAL.queue_time = THREADLOCAL.__dict__.get('queue_time', 0) + duration
+
+
+def get_queue_time_for_thread():
+    """returns thread's time waited in the request queues (see
+    :py:obj:`searx.network.scheduler`) or None"""
+    return THREADLOCAL.__dict__.get('queue_time')
+
+
 def set_timeout_for_thread(timeout, start_time=None):
     THREADLOCAL.timeout = timeout
     THREADLOCAL.start_time = start_time
@@ -39,6 +69,25 @@ def set_timeout_for_thread(timeout, start_time=None):
 
 def set_context_network_name(network_name):
     THREADLOCAL.network = get_network(network_name)
+    THREADLOCAL.network_name = network_name
+
+
+def new_queue_ticket(flow: str, start_time: Optional[float] = None, timeout: Optional[float] = None) -> QueueTicket:
+    """Returns the ticket of a request of the engine ``flow`` in the request
+    queue of a network, the deadline of the request is given by the
+    ``start_time`` and ``timeout`` of the query."""
+    from searx.engines import engine_weights  # pylint: disable=import-outside-toplevel
+
+    deadline = start_time + timeout if start_time is not None and timeout is not None else None
+    return QueueTicket(flow, engine_weights.get(flow, 1.0), deadline)
+
+
+def _get_queue_ticket() -> QueueTicket:
+    return new_queue_ticket(
+        THREADLOCAL.__dict__.get('network_name') or '',
+        THREADLOCAL.__dict__.get('start_time'),
+        THREADLOCAL.__dict__.get('timeout'),
+    )
 
 
 def get_context_network():
@@ -50,18 +99,21 @@ def get_context_network():
 
 
 @contextmanager
-def _record_http_time():
+def _record_http_time(tickets: List[QueueTicket]):
     # pylint: disable=too-many-branches
     time_before_request = default_timer()
     start_time = getattr(THREADLOCAL, 'start_time', time_before_request)
     try:
         yield start_time
     finally:
-        # update total_time.
-        # See get_time_for_thread() and reset_time_for_thread()
+        # update total_time, the time waited in the request queue is not HTTP
+        # time.  See get_time_for_thread() and reset_time_for_thread()
+        queue_time = max((ticket.wait_time for ticket in tickets), default=0)
         if hasattr(THREADLOCAL, 'total_time'):
             time_after_request = default_timer()
-            THREADLOCAL.total_time += time_after_request - time_before_request
+            THREADLOCAL.total_time += time_after_request - time_before_request - queue_time
+        if hasattr(THREADLOCAL, 'queue_time'):
+            THREADLOCAL.queue_time += queue_time
 
 
 def _get_timeout(start_time, kwargs):
@@ -88,10 +140,11 @@ def _get_timeout(start_time, kwargs):
 
 def request(method, url, **kwargs) -> SXNG_Response:
     """same as requests/requests/api.py request(...)"""
-    with _record_http_time() as start_time:
+    ticket = _get_queue_ticket()
+    with _record_http_time([ticket]) as start_time:
         network = get_context_network()
         timeout = _get_timeout(start_time, kwargs)
-        future = asyncio.run_coroutine_threadsafe(network.request(method, url, **kwargs), get_loop())
+        future = asyncio.run_coroutine_threadsafe(network.request(method, url, ticket, **kwargs), get_loop())
         try:
             return future.result(timeout)
         except concurrent.futures.TimeoutError as e:
@@ -100,15 +153,16 @@ def request(method, url, **kwargs) -> SXNG_Response:
 
 def multi_requests(request_list: List["Request"]) -> List[Union[httpx.Response, Exception]]:
     """send multiple HTTP requests in parallel. Wait for all requests to finish."""
-    with _record_http_time() as start_time:
+    tickets = [_get_queue_ticket() for _ in request_list]
+    with _record_http_time(tickets) as start_time:
         # send the requests
         network = get_context_network()
         loop = get_loop()
         future_list = []
-        for request_desc in request_list:
+        for request_desc, ticket in zip(request_list, tickets):
             timeout = _get_timeout(start_time, request_desc.kwargs)
             future = asyncio.run_coroutine_threadsafe(
-                network.request(request_desc.method, request_desc.url, **request_desc.kwargs), loop
+                network.request(request_desc.method, request_desc.url, ticket, **request_desc.kwargs), loop
             )
             future_list.append((future, timeout))
 
@@ -191,15 +245,30 @@ def delete(url, **kwargs) -> SXNG_Response:
     return request('delete', url, **kwargs)
 
 
-async def stream_chunk_to_queue(network, queue, method, url, **kwargs):
+async def stream_chunk_to_queue(network, queue, window, method, url, **kwargs):
     try:
         async with await network.stream(method, url, **kwargs) as response:
             queue.put(response)
             # aiter_raw: access the raw bytes on the response without applying any HTTP content decoding
             # https://www.python-httpx.org/quickstart/#streaming-responses
-            async for chunk in response.aiter_raw(65536):
-                if len(chunk) > 0:
-                    queue.put(chunk)
+            #
+            # the raw chunks are collected until the chunk size is reached, a
+            # single raw chunk is passed as it is (b"".join does not copy it)
+            chunk_size = STREAM_CHUNK_SIZE
+            chunks = []
+            size = 0
+            async for chunk in response.aiter_raw():
+                chunks.append(chunk)
+                size += len(chunk)
+                if size >= chunk_size:
+                    await window.acquire()
+                    queue.put(b"".join(chunks))
+                    chunks = []
+                    size = 0
+                    chunk_size = min(2 * chunk_size, STREAM_MAX_CHUNK_SIZE)
+            if size > 0:
+                await window.acquire()
+                queue.put(b"".join(chunks))
     except (httpx.StreamClosed, anyio.ClosedResourceError):
         # the response was queued before the exception.
         # the exception was raised on aiter_raw.
@@ -219,17 +288,30 @@ async def stream_chunk_to_queue(network, queue, method, url, **kwargs):
 
 def _stream_generator(method, url, **kwargs):
     queue = SimpleQueue()
+    # number of chunks the event loop can queue before the chunks are read
+    window = asyncio.Semaphore(STREAM_MAX_PENDING_CHUNKS)
     network = get_context_network()
-    future = asyncio.run_coroutine_threadsafe(stream_chunk_to_queue(network, queue, method, url, **kwargs), get_loop())
-
-    # yield chunks
-    obj_or_exception = queue.get()
-    while obj_or_exception is not None:
-        if isinstance(obj_or_exception, Exception):
-            raise obj_or_exception
-        yield obj_or_exception
+    loop = get_loop()
+    future = asyncio.run_coroutine_threadsafe(
+        stream_chunk_to_queue(network, queue, window, method, url, **kwargs), loop
+    )
+
+    try:
+        # yield chunks
         obj_or_exception = queue.get()
-    future.result()
+        while obj_or_exception is not None:
+            if isinstance(obj_or_exception, Exception):
+                raise obj_or_exception
+            if isinstance(obj_or_exception, bytes):
+                loop.call_soon_threadsafe(window.release)
+            yield obj_or_exception
+            obj_or_exception = queue.get()
+        future.result()
+    finally:
+        # the generator is closed before the end of the stream: stop reading
+        # the response in the event loop
+        if not future.done():
+            future.cancel()
 
 
 def _close_response_method(self):
@@ -14,6 +14,7 @@ from python_socks import parse_proxy_url, ProxyConnectionError, ProxyTimeoutErro
 import uvloop
 
 from searx import logger
+from . import dns
 
 
 uvloop.install()
@@ -139,7 +140,7 @@ def get_transport_for_socks_proxy(verify, http2, local_address, proxy_url, limit
 
 def get_transport(verify, http2, local_address, proxy_url, limit, retries):
     verify = get_sslcontexts(None, None, verify, True) if verify is True else verify
-    return httpx.AsyncHTTPTransport(
+    transport = httpx.AsyncHTTPTransport(
         # pylint: disable=protected-access
         verify=verify,
         http2=http2,
@@ -148,6 +149,10 @@ def get_transport(verify, http2, local_address, proxy_url, limit, retries):
         local_address=local_address,
         retries=retries,
     )
+    if dns.CACHE is not None:
+        # pylint: disable=protected-access
+        transport._pool._network_backend = dns.CachedDNSBackend(transport._pool._network_backend, dns.CACHE)
+    return transport
 
 
 def new_client(
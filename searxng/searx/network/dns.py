@@ -0,0 +1,241 @@
+# SPDX-License-Identifier: AGPL-3.0-or-later
+"""In-process DNS cache of the outgoing HTTP connections (see
+:py:obj:`searx.network.client.get_transport`).
+
+Each new connection of a HTTP client resolves the host name.  With several
+source IPs (``source_ips``) and proxies, SearXNG opens many connections to the
+same few hosts.  If the cache is enabled, the addresses of a host are resolved
+once and shared by all transports.
+
+- The addresses are cached for ``ttl`` seconds, a failed lookup for
+  ``negative_ttl`` seconds.
+- A host that is used in the last ``prefetch`` seconds before its entry
+  expires, is resolved again in the background.
+- If a host has several addresses, the connection attempts are started one
+  after the other with a delay of :py:obj:`HAPPY_EYEBALLS_DELAY` (IPv6 and IPv4
+  addresses interleaved), the first established connection wins (`RFC 8305`_).
+- Hits and misses are recorded in the metrics (``network.dns.*``).
+
+.. code:: yaml
+
+   outgoing:
+     dns_cache:
+       enabled: true
+       ttl: 60
+       negative_ttl: 5
+       prefetch: 10
+
+The system resolver (``getaddrinfo``) does not return the TTL of the DNS
+records, the ``ttl`` of the cache is used for all records.
+
+.. _RFC 8305: https://www.rfc-editor.org/rfc/rfc8305
+"""
+
+from __future__ import annotations
+
+__all__ = ["CACHE", "DNSCache", "CachedDNSBackend", "initialize"]
+
+import asyncio
+import ipaddress
+import socket
+import typing
+from timeit import default_timer
+
+import httpcore
+
+from searx import logger
+
+logger = logger.getChild('network.dns')
+
+HAPPY_EYEBALLS_DELAY = 0.25
+"""Delay (in sec.) before the next address of a host is tried."""
+
+MAX_ENTRIES = 10000
+"""Maximum number of hosts in the cache."""
+
+CACHE: DNSCache | None = None
+"""The DNS cache of the HTTP clients, ``None`` if the cache is disabled."""
+
+
+class DNSCache:
+    """Cache of the addresses of the host names.  The cache is used in the
+    event loop of the networks only (:py:obj:`searx.network.client.get_loop`),
+    there is no need for locks."""
+
+    def __init__(self, ttl: float = 60, negative_ttl: float = 5, prefetch: float = 10):
+        self.ttl = ttl
+        self.negative_ttl = negative_ttl
+        self.prefetch = prefetch
+        # host --> (expire time, addresses or None, error message)
+        self._entries: dict[str, tuple[float, list[str] | None, str]] = {}
+        self._lookups: dict[str, asyncio.Future] = {}
+
+    async def resolve(self, host: str) -> list[str]:
+        """Returns the addresses of ``host``, IPv6 and IPv4 addresses
+        interleaved.  Raises :py:obj:`httpcore.ConnectError` if the host can't
+        be resolved."""
+
+        entry = self._entries.get(host)
+        now = default_timer()
+        if entry is not None and entry[0] > now:
+            _counter_inc('network', 'dns', 'hit')
+            expire, addresses, error = entry
+            if addresses is None:
+                raise httpcore.ConnectError(error)
+            if expire - now < self.prefetch and host not in self._lookups:
+                self._start_lookup(host)
+            return addresses
+
+        _counter_inc('network', 'dns', 'miss')
+        lookup = self._lookups.get(host) or self._start_lookup(host)
+        addresses, error = await asyncio.shield(lookup)
+        if addresses is None:
+            raise httpcore.ConnectError(error)
+        return addresses
+
+    def _start_lookup(self, host: str) -> asyncio.Future:
+        # concurrent connections to the same host share one lookup
+        lookup = asyncio.ensure_future(self._lookup(host))
+        self._lookups[host] = lookup
+        lookup.add_done_callback(lambda _: self._lookups.pop(host, None))
+        return lookup
+
+    async def _lookup(self, host: str) -> tuple[list[str] | None, str]:
+        try:
+            infos = await asyncio.get_running_loop().getaddrinfo(host, None, type=socket.SOCK_STREAM)
+        except OSError as e:
+            logger.debug("can't resolve %s: %s", host, e)
+            error = f"DNS lookup of {host} failed: {e}"
+            self._store(host, self.negative_ttl, None, error)
+            return None, error
+
+        ipv6 = list(dict.fromkeys(info[4][0] for info in infos if info[0] == socket.AF_INET6))
+        ipv4 = list(dict.fromkeys(info[4][0] for info in infos if info[0] == socket.AF_INET))
+        addresses = interleave(ipv6, ipv4)
+        self._store(host, self.ttl, addresses, "")
+        return addresses, ""
+
+    def _store(self, host: str, ttl: float, addresses: list[str] | None, error: str):
+        now = default_timer()
+        if len(self._entries) >= MAX_ENTRIES:
+            self._entries = {k: v for k, v in self._entries.items() if v[0] > now}
+            if len(self._entries) >= MAX_ENTRIES:
+                self._entries.clear()
+        self._entries[host] = (now + ttl, addresses, error)
+
+
+def interleave(first: list[str], second: list[str]) -> list[str]:
+    """Interleave the addresses of two address families, starting with
+    ``first``."""
+    result = []
+    for i in range(max(len(first), len(second))):
+        result.extend(first[i : i + 1])
+        result.extend(second[i : i + 1])
+    return result
+
+
+class CachedDNSBackend(httpcore.AsyncNetworkBackend):
+    """Network backend of the httpcore connection pools, resolves the host
+    names by the :py:obj:`DNSCache` and connects to the addresses of a host
+    using *happy eyeballs*."""
+
+    def __init__(self, backend: httpcore.AsyncNetworkBackend, cache: DNSCache):
+        self._backend = backend
+        self._cache = cache
+
+    async def connect_tcp(
+        self,
+        host: str,
+        port: int,
+        timeout: float | None = None,
+        local_address: str | None = None,
+        socket_options: typing.Iterable[typing.Any] | None = None,
+    ) -> httpcore.AsyncNetworkStream:
+        kwargs = {'timeout': timeout, 'local_address': local_address, 'socket_options': socket_options}
+        try:
+            ipaddress.ip_address(host)
+        except ValueError:
+            pass
+        else:
+            return await self._backend.connect_tcp(host, port, **kwargs)
+
+        addresses = await self._cache.resolve(host)
+        if local_address:
+            # the address family is given by the source IP
+            version = ipaddress.ip_address(local_address).version
+            addresses = [a for a in addresses if ipaddress.ip_address(a).version == version]
+        if not addresses:
+            raise httpcore.ConnectError(f"no address of {host} is reachable from {local_address}")
+        if len(addresses) == 1:
+            return await self._backend.connect_tcp(addresses[0], port, **kwargs)
+        return await self._happy_eyeballs(addresses, port, **kwargs)
+
+    async def _happy_eyeballs(self, addresses: list[str], port: int, **kwargs) -> httpcore.AsyncNetworkStream:
+        pending: set[asyncio.Future] = set()
+        error: BaseException | None = None
+        stream = None
+        try:
+            for address in addresses:
+                pending.add(asyncio.ensure_future(self._backend.connect_tcp(address, port, **kwargs)))
+                done, pending = await asyncio.wait(
+                    pending, timeout=HAPPY_EYEBALLS_DELAY, return_when=asyncio.FIRST_COMPLETED
+                )
+                stream, error = await _first_stream(done, error)
+                if stream is not None:
+                    return stream
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                stream, error = await _first_stream(done, error)
+                if stream is not None:
+                    return stream
+            raise error  # type: ignore
+        finally:
+            for task in pending:
+                task.cancel()
+                task.add_done_callback(_close_stream)
+
+    async def connect_unix_socket(
+        self,
+        path: str,
+        timeout: float | None = None,
+        socket_options: typing.Iterable[typing.Any] | None = None,
+    ) -> httpcore.AsyncNetworkStream:  # pragma: nocover
+        return await self._backend.connect_unix_socket(path, timeout=timeout, socket_options=socket_options)
+
+    async def sleep(self, seconds: float) -> None:  # pragma: nocover
+        await self._backend.sleep(seconds)
+
+
+async def _first_stream(done, error):
+    """Returns the first established stream of the ``done`` connection attempts
+    (the other streams are closed) and the last error."""
+    stream = None
+    for task in done:
+        if task.exception() is not None:
+            error = task.exception()
+        elif stream is None:
+            stream = task.result()
+        else:
+            await task.result().aclose()
+    return stream, error
+
+
+def _close_stream(task: asyncio.Future):
+    # a cancelled connection attempt that has been established nevertheless
+    if not task.cancelled() and task.exception() is None:
+        asyncio.ensure_future(task.result().aclose())
+
+
+def _counter_inc(*args):
+    from .network import _counter_inc as counter_inc  # pylint: disable=import-outside-toplevel, cyclic-import
+
+    counter_inc(*args)
+
+
+def initialize(cfg: dict[str, typing.Any]):
+    """Initialize the DNS cache from the settings (``outgoing.dns_cache``)."""
+    global CACHE  # pylint: disable=global-statement
+
+    CACHE = None
+    if cfg['enabled']:
+        CACHE = DNSCache(ttl=cfg['ttl'], negative_ttl=cfg['negative_ttl'], prefetch=cfg['prefetch'])
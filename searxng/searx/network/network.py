@@ -8,13 +8,16 @@ import atexit
 import asyncio
 import ipaddress
 from itertools import cycle
+from timeit import default_timer
 from typing import Dict
 
 import httpx
 
 from searx import logger, sxng_debug
 from searx.extended_types import SXNG_Response
+from . import dns
 from .client import new_client, get_loop, AsyncHTTPTransportNoHttp
+from .scheduler import QueueTicket, RequestQueue
 from .raise_for_httperror import raise_for_httperror
 
 
@@ -53,6 +56,14 @@ class Network:
         'max_redirects',
         'retries',
         'retry_on_http_error',
+        'hedge_delay',
+        'warmup_urls',
+        'warmup_connections',
+        'keepalive_ping',
+        'max_concurrent_requests',
+        '_queue',
+        '_last_request',
+        '_keepalive_task',
         '_local_addresses_cycle',
         '_proxies_cycle',
         '_clients',
@@ -76,6 +87,11 @@ class Network:
         retries=0,
         retry_on_http_error=None,
         max_redirects=30,
+        hedge_delay=None,
+        warmup_urls=None,
+        warmup_connections=1,
+        keepalive_ping=None,
+        max_concurrent_requests=None,
         logger_name=None,
     ):
 
@@ -91,6 +107,14 @@ class Network:
         self.retries = retries
         self.retry_on_http_error = retry_on_http_error
         self.max_redirects = max_redirects
+        self.hedge_delay = hedge_delay
+        self.warmup_urls = warmup_urls or []
+        self.warmup_connections = warmup_connections
+        self.keepalive_ping = keepalive_ping
+        self.max_concurrent_requests = max_concurrent_requests
+        self._queue = RequestQueue(max_concurrent_requests) if max_concurrent_requests else None
+        self._last_request = 0.0
+        self._keepalive_task = None
         self._local_addresses_cycle = self.get_ipaddress_cycle()
         self._proxies_cycle = self.get_proxy_cycles()
         self._clients = {}
@@ -207,7 +231,51 @@ class Network:
             self._clients[key] = client
         return self._clients[key]
 
+    async def warmup(self):
+        """Open :py:obj:`Network.warmup_connections` keep-alive connections to
+        each of the :py:obj:`Network.warmup_urls`.  This resolves the DNS names
+        and does the TLS handshakes before the first request of a search query
+        is sent."""
+
+        async def ping(url):
+            try:
+                client = await self.get_client()
+                await client.head(url, extensions={'trace': trace_connection})
+            except httpx.HTTPError as e:
+                self._logger.debug('warm-up %s: %s', url, e)
+
+        await asyncio.gather(*[ping(url) for url in self.warmup_urls for _ in range(self.warmup_connections)])
+
+    async def keepalive(self):
+        """Warm up the connections again when the network has been idle for
+        :py:obj:`Network.keepalive_ping` seconds.  This prevents the keep-alive
+        connections of the pool from being dropped (``keepalive_expiry``)."""
+        while True:
+            idle = default_timer() - self._last_request
+            if idle < self.keepalive_ping:
+                await asyncio.sleep(self.keepalive_ping - idle)
+                continue
+            await self.warmup()
+            self._last_request = default_timer()
+
+    def start_warmup(self):
+        """Start the warm-up (and the keep-alive pings) of the network in the
+        event loop of the networks."""
+
+        async def run():
+            await self.warmup()
+            self._last_request = default_timer()
+            if self.keepalive_ping:
+                self._keepalive_task = asyncio.ensure_future(self.keepalive())
+
+        if self.warmup_urls:
+            asyncio.run_coroutine_threadsafe(run(), get_loop())
+
     async def aclose(self):
+        if self._keepalive_task is not None:
+            self._keepalive_task.cancel()
+            self._keepalive_task = None
+
         async def close_client(client):
             try:
                 await client.aclose()
@@ -262,11 +330,46 @@ class Network:
             return False
         return True
 
+    async def hedged_request(self, client, kwargs_clients, method, url, **kwargs) -> httpx.Response:
+        """Send the request with ``client``, if there is no response after
+        :py:obj:`Network.hedge_delay` seconds, the same request is sent a second
+        time with the next client (next source IP / proxy).  The first response
+        wins, the other request is cancelled."""
+
+        first = asyncio.ensure_future(client.request(method, url, **kwargs))
+        done, _ = await asyncio.wait({first}, timeout=self.hedge_delay)
+        if done:
+            return first.result()
+
+        hedge_client = await self.get_client(**kwargs_clients)
+        hedge_client.cookies = client.cookies
+        hedge = asyncio.ensure_future(hedge_client.request(method, url, **kwargs))
+        _counter_inc('network', 'hedge', 'sent')
+        self._logger.debug('no response after %s sec., hedge request: %s %s', self.hedge_delay, method, url)
+
+        pending = {first, hedge}
+        error = None
+        try:
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    if task.exception() is None:
+                        if task is hedge:
+                            _counter_inc('network', 'hedge', 'won')
+                        return task.result()
+                    error = task.exception()
+            raise error  # type: ignore
+        finally:
+            for task in pending:
+                task.cancel()
+
     async def call_client(self, stream, method, url, **kwargs) -> SXNG_Response:
         retries = self.retries
         was_disconnected = False
         do_raise_for_httperror = Network.extract_do_raise_for_httperror(kwargs)
         kwargs_clients = Network.extract_kwargs_clients(kwargs)
+        kwargs.setdefault('extensions', {}).setdefault('trace', trace_connection)
+        self._last_request = default_timer()
         while retries >= 0:  # pragma: no cover
             client = await self.get_client(**kwargs_clients)
             cookies = kwargs.pop("cookies", None)
@@ -274,6 +377,8 @@ class Network:
             try:
                 if stream:
                     response = client.stream(method, url, **kwargs)
+                elif self.hedge_delay is not None and method.upper() in ('GET', 'HEAD'):
+                    response = await self.hedged_request(client, kwargs_clients, method, url, **kwargs)
                 else:
                     response = await client.request(method, url, **kwargs)
                 if self.is_valid_response(response) or retries <= 0:
@@ -293,8 +398,20 @@ class Network:
                     raise e
             retries -= 1
 
-    async def request(self, method, url, **kwargs):
-        return await self.call_client(False, method, url, **kwargs)
+    async def request(self, method, url, ticket: QueueTicket | None = None, **kwargs):
+        """Send a HTTP request.  If the number of concurrent requests of the
+        network is limited (:py:obj:`Network.max_concurrent_requests`), the
+        request waits in the :py:obj:`RequestQueue`, the ``ticket`` describes
+        the request in the queue."""
+        if self._queue is None:
+            return await self.call_client(False, method, url, **kwargs)
+
+        await self._queue.acquire(ticket or QueueTicket())
+        start_time = default_timer()
+        try:
+            return await self.call_client(False, method, url, **kwargs)
+        finally:
+            self._queue.release(default_timer() - start_time)
 
     async def stream(self, method, url, **kwargs):
         return await self.call_client(True, method, url, **kwargs)
@@ -304,6 +421,24 @@ class Network:
         await asyncio.gather(*[network.aclose() for network in NETWORKS.values()], return_exceptions=False)
 
 
+def _counter_inc(*args):
+    from searx import metrics  # pylint: disable=import-outside-toplevel, cyclic-import
+
+    # the metrics are not initialized if the network is used outside of a search
+    # (e.g. in the update scripts)
+    if metrics.counter_storage is not None:
+        metrics.counter_inc(*args)
+
+
+async def trace_connection(event_name: str, _info):
+    """httpcore trace extension: counts the requests and the new connections,
+    the ratio of the reused connections is ``1 - new / requests``."""
+    if event_name == 'connection.connect_tcp.complete':
+        _counter_inc('network', 'connection', 'new')
+    elif event_name.endswith('.send_request_headers.started'):
+        _counter_inc('network', 'connection', 'requests')
+
+
 def get_network(name=None):
     return NETWORKS.get(name or DEFAULT_NAME)
 
@@ -335,6 +470,7 @@ def initialize(settings_engines=None, settings_outgoing=None):
 
     settings_engines = settings_engines or settings['engines']
     settings_outgoing = settings_outgoing or settings['outgoing']
+    dns.initialize(settings_outgoing['dns_cache'])
 
     # default parameters for AsyncHTTPTransport
     # see https://github.com/encode/httpx/blob/e05a5372eb6172287458b37447c30f650047e1b8/httpx/_transports/default.py#L108-L121  # pylint: disable=line-too-long
@@ -351,6 +487,11 @@ def initialize(settings_engines=None, settings_outgoing=None):
         'max_redirects': settings_outgoing['max_redirects'],
         'retries': settings_outgoing['retries'],
         'retry_on_http_error': None,
+        'hedge_delay': settings_outgoing['hedge_delay'],
+        'warmup_urls': None,
+        'warmup_connections': settings_outgoing['warmup_connections'],
+        'keepalive_ping': settings_outgoing['keepalive_ping'],
+        'max_concurrent_requests': settings_outgoing['max_concurrent_requests'],
     }
 
     def new_network(params, logger_name=None):
@@ -410,6 +551,15 @@ def initialize(settings_engines=None, settings_outgoing=None):
         NETWORKS['image_proxy'] = new_network(image_proxy_params, logger_name='image_proxy')
 
 
+def warmup():
+    """Start the warm-up of the networks with warm-up URLs (see
+    :py:obj:`Network.warmup`), the function does not wait for the
+    connections."""
+    # a network can be referenced by several engines
+    for network in set(NETWORKS.values()):
+        network.start_warmup()
+
+
 @atexit.register
 def done():
     """Close all HTTP client
@@ -0,0 +1,148 @@
+# SPDX-License-Identifier: AGPL-3.0-or-later
+"""Limit of the concurrent requests of a network (see
+:py:obj:`searx.network.network.Network.request`).
+
+The pool sizes of httpx (``pool_connections``, ``pool_maxsize``) limit the
+connections of a network, but when a burst of queries arrives, all requests
+wait inside httpx and there is no visibility of the waiting time.  If
+``max_concurrent_requests`` is set, the requests of a network exceeding the
+limit are queued:
+
+- The queue is *fair*: the engines sharing a network (``network: <name>``)
+  are served by weighted fair queuing, the weight of an engine is its
+  ``weight`` setting.
+- A request that can no longer finish before the deadline of its query (the
+  average time of the requests of the network is taken into account) is
+  dropped with a :py:obj:`QueueTimeout` (the engine is not suspended).
+- The time a request has waited in the queue is recorded separately from the
+  HTTP time (:py:obj:`searx.network.get_queue_time_for_thread`) and stored in the
+  metrics (``engine.<name>.time.queue``).
+
+.. code:: yaml
+
+   outgoing:
+     max_concurrent_requests: 20
+     networks:
+       google:
+         max_concurrent_requests: 50
+
+Streamed requests (e.g. the image proxy) are not limited.
+"""
+
+from __future__ import annotations
+
+__all__ = ["QueueTicket", "QueueTimeout", "RequestQueue"]
+
+import asyncio
+import heapq
+import itertools
+from timeit import default_timer
+
+import httpx
+
+
+class QueueTimeout(httpx.PoolTimeout):
+    """The request has been dropped from the queue, it can't finish before the
+    deadline of its query."""
+
+
+class QueueTicket:
+    """A request waiting for a free slot in a :py:obj:`RequestQueue`."""
+
+    __slots__ = 'flow', 'weight', 'deadline', 'wait_time', 'future'
+
+    def __init__(self, flow: str = '', weight: float = 1.0, deadline: float | None = None):
+        self.flow = flow
+        """Name of the flow (the engine) the request belongs to."""
+        self.weight = weight
+        """The more weight, the bigger the share of the flow."""
+        self.deadline = deadline
+        """Time (``default_timer``) the request has to be finished."""
+        self.wait_time = 0.0
+        """Time (in sec.) the request has been waiting in the queue."""
+        self.future: asyncio.Future | None = None
+
+
+class RequestQueue:
+    """Limits the number of concurrent requests to ``max_concurrent``, the
+    waiting requests are scheduled by weighted fair queuing.  The queue is used
+    in the event loop of the networks only, there is no need for locks."""
+
+    EWMA_ALPHA = 0.2
+    """Smoothing factor of the average time of the requests."""
+
+    def __init__(self, max_concurrent: int):
+        self.max_concurrent = max_concurrent
+        self.active = 0
+        self.avg_time: float | None = None
+        self._heap: list[tuple[float, int, QueueTicket]] = []
+        self._seq = itertools.count()
+        self._virtual_time = 0.0
+        self._last_finish: dict[str, float] = {}
+
+    @property
+    def queue_depth(self) -> int:
+        return len(self._heap)
+
+    def can_finish(self, ticket: QueueTicket, now: float) -> bool:
+        if ticket.deadline is None:
+            return True
+        return now + (self.avg_time or 0.0) < ticket.deadline
+
+    async def acquire(self, ticket: QueueTicket):
+        """Wait for a free slot.  Raises :py:obj:`QueueTimeout` if the request
+        can't finish before its deadline."""
+
+        start_time = default_timer()
+        if self.active < self.max_concurrent and not self._heap:
+            self.active += 1
+            return
+        if not self.can_finish(ticket, start_time):
+            raise QueueTimeout('request queue: deadline can not be met')
+
+        # virtual finish time of the request (weighted fair queuing)
+        finish = max(self._virtual_time, self._last_finish.get(ticket.flow, 0.0)) + 1.0 / ticket.weight
+        self._last_finish[ticket.flow] = finish
+        ticket.future = asyncio.get_running_loop().create_future()
+        heapq.heappush(self._heap, (finish, next(self._seq), ticket))
+
+        timeout = None if ticket.deadline is None else max(0.0, ticket.deadline - start_time)
+        try:
+            await asyncio.wait_for(ticket.future, timeout)
+        except asyncio.TimeoutError as e:
+            raise QueueTimeout('request queue: timeout') from e
+        except asyncio.CancelledError:
+            if ticket.future.done() and not ticket.future.cancelled() and ticket.future.exception() is None:
+                # the slot has been granted in the meantime
+                self.release(None)
+            raise
+        finally:
+            ticket.wait_time = default_timer() - start_time
+
+    def release(self, duration: float | None):
+        """Release the slot of a request, ``duration`` is the time (in sec.) of
+        the request."""
+
+        if duration is not None:
+            if self.avg_time is None:
+                self.avg_time = duration
+            else:
+                self.avg_time += self.EWMA_ALPHA * (duration - self.avg_time)
+        self.active -= 1
+
+        now = default_timer()
+        while self._heap and self.active < self.max_concurrent:
+            finish, _, ticket = heapq.heappop(self._heap)
+            if ticket.future.done():  # type: ignore
+                # timeout or cancelled
+                continue
+            self._virtual_time = finish
+            if not self.can_finish(ticket, now):
+                ticket.future.set_exception(QueueTimeout('request queue: deadline can not be met'))  # type: ignore
+                continue
+            self.active += 1
+            ticket.future.set_result(None)  # type: ignore
+
+        if not self._heap:
+            self._virtual_time = 0.0
+            self._last_finish.clear()
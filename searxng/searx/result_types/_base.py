@@ -37,6 +37,41 @@ from searx import logger as log
 WHITESPACE_REGEX = re.compile('( |\t|\n)+', re.M | re.U)
 UNKNOWN = object()
 
+TRACKING_PARAMS_REGEX = re.compile(r'^(utm_\w+|fbclid|gclid|dclid|gclsrc|msclkid|yclid|mc_cid|mc_eid|igshid|_ga)$')
+"""Query arguments that are ignored when results are compared (see
+:py:obj:`dedup_key`)."""
+
+DEFAULT_PORTS = {"http": ":80", "https": ":443", "ftp": ":21"}
+
+
+def dedup_key(url: urllib.parse.ParseResult, *fields: str) -> str:
+    """Returns a key of the ``url`` that is equal for URLs pointing to the same
+    resource (the ``fields`` are appended to the key).  The URL is canonicalized
+    in one pass:
+
+    - the scheme is ignored (``http://`` and ``https://`` are equal)
+    - the host name is lower case, without ``www.`` and without the default
+      port of the scheme
+    - a trailing slash in the path is ignored
+    - the :py:obj:`tracking arguments <TRACKING_PARAMS_REGEX>` of the query are
+      ignored
+    """
+
+    netloc = url.netloc.lower()
+    port = DEFAULT_PORTS.get(url.scheme)
+    if port and netloc.endswith(port):
+        netloc = netloc[: -len(port)]
+    if netloc.startswith("www."):
+        netloc = netloc[4:]
+
+    query = url.query
+    if query:
+        query = "&".join(
+            arg for arg in query.split("&") if arg and not TRACKING_PARAMS_REGEX.match(arg.split("=", 1)[0])
+        )
+
+    return "|".join((netloc, url.path.rstrip("/"), url.params, query, url.fragment) + fields)
+
 
 def _normalize_url_fields(result: Result | LegacyResult):
 
@@ -341,7 +376,7 @@ class Result(msgspec.Struct, kw_only=True):
                 setattr(self, field_name, other_val)
 
 
-class MainResult(Result):  # pylint: disable=missing-class-docstring
+class MainResult(Result, dict=True):  # pylint: disable=missing-class-docstring
     """Base class of all result types displayed in :ref:`area main results`."""
 
     title: str = ""
@@ -391,18 +426,25 @@ class MainResult(Result):  # pylint: disable=missing-class-docstring
 
     def __hash__(self) -> int:
         """Ordinary url-results are equal if their values for
-        :py:obj:`Result.template`, :py:obj:`Result.parsed_url` (without scheme)
-        and :py:obj:`MainResult.img_src` are equal.
+        :py:obj:`Result.template`, :py:obj:`Result.parsed_url` (see
+        :py:obj:`dedup_key`) and :py:obj:`MainResult.img_src` are equal.
+
+        The hash value is cached in the (private) attribute ``_hash`` of the
+        result, see :py:obj:`MainResult.update_hash`.
         """
-        if not self.parsed_url:
-            raise ValueError(f"missing a value in field 'parsed_url': {self}")
-
-        url = self.parsed_url
-        return hash(
-            f"{self.template}"
-            + f"|{url.netloc}|{url.path}|{url.params}|{url.query}|{url.fragment}"
-            + f"|{self.img_src}"
-        )
+        _hash = self.__dict__.get("_hash")  # pylint: disable=no-member
+        if _hash is None:
+            if not self.parsed_url:
+                raise ValueError(f"missing a value in field 'parsed_url': {self}")
+            _hash = self._hash = hash(dedup_key(self.parsed_url, self.template, self.img_src))
+        return _hash
+
+    def update_hash(self) -> int:
+        """Computes the hash value from the current fields (a plugin may have
+        changed the URL of the result).  The :py:obj:`searx.results.ResultContainer`
+        calls this method once the plugins have processed the result."""
+        self.__dict__.pop("_hash", None)  # pylint: disable=no-member
+        return hash(self)
 
     def normalize_result_fields(self):
         super().normalize_result_fields()
@@ -410,6 +452,7 @@ class MainResult(Result):  # pylint: disable=missing-class-docstring
         _normalize_date_fields(self)
         if self.engine:
             self.engines.add(self.engine)
+        self.__dict__.pop("_hash", None)  # pylint: disable=no-member
 
 
 class LegacyResult(dict):
@@ -509,6 +552,13 @@ class LegacyResult(dict):
 
     def __hash__(self) -> int:  # type: ignore
 
+        _hash = self.__dict__.get("_hash")
+        if _hash is None:
+            _hash = self._compute_hash()
+        return _hash
+
+    def _compute_hash(self) -> int:
+
         if "answer" in self:
             # deprecated ..
             return hash(self["answer"])
@@ -526,15 +576,17 @@ class LegacyResult(dict):
             if not self.parsed_url:
                 raise ValueError(f"missing a value in field 'parsed_url': {self}")
 
-            url = self.parsed_url
-            return hash(
-                f"{self.template}"
-                + f"|{url.netloc}|{url.path}|{url.params}|{url.query}|{url.fragment}"
-                + f"|{self.img_src}"
-            )
+            _hash = hash(dedup_key(self.parsed_url, self.template, self.img_src))
+            self.__dict__["_hash"] = _hash
+            return _hash
 
         return id(self)
 
+    def update_hash(self) -> int:
+        """See :py:obj:`MainResult.update_hash`"""
+        self.__dict__.pop("_hash", None)
+        return hash(self)
+
     def __eq__(self, other):
 
         return hash(self) == hash(other)
@@ -549,6 +601,7 @@ class LegacyResult(dict):
         _normalize_text_fields(self)
         if self.engine:
             self.engines.add(self.engine)
+        self.__dict__.pop("_hash", None)
 
     def defaults_from(self, other: LegacyResult):
         for k, v in other.items():
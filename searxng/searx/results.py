@@ -2,6 +2,7 @@
 # pylint: disable=missing-module-docstring, missing-class-docstring
 from __future__ import annotations
 
+import pickle
 import warnings
 from collections import defaultdict
 from threading import RLock
@@ -9,17 +10,17 @@ from typing import List, NamedTuple, Set
 
 from searx import logger as log
 import searx.engines
-from searx.metrics import histogram_observe, counter_add
+from searx.metrics import engine_metrics
 from searx.result_types import Result, LegacyResult, MainResult
 from searx.result_types.answer import AnswerSet, BaseAnswer
 
 
 def calculate_score(result, priority) -> float:
     weight = 1.0
+    engine_weights = searx.engines.engine_weights
 
     for result_engine in result['engines']:
-        if hasattr(searx.engines.engines.get(result_engine), 'weight'):
-            weight *= float(searx.engines.engines[result_engine].weight)
+        weight *= engine_weights.get(result_engine, 1.0)
 
     weight *= len(result['positions'])
     score = 0
@@ -74,14 +75,35 @@ class ResultContainer:
         self.timings: List[Timing] = []
         self.redirect_url: str | None = None
         self.on_result = lambda _: True
+        self.on_extend = lambda _: None
+        """Called with the name of the engine each time the results of an engine
+        have been added to the container (used to stream the results)."""
         self._lock = RLock()
         self._main_results_sorted: list[MainResult | LegacyResult] = None  # type: ignore
-
-    def extend(self, engine_name: str | None, results):  # pylint: disable=too-many-branches
+        self.engine_records: list[tuple[str, bytes]] | None = None
+        """If not ``None``, the (pickled) results of the engines are recorded in
+        this list (used by :py:obj:`searx.search.result_cache`)."""
+
+    def extend(self, engine_name: str | None, results, record_metrics: bool = True):
+        """Add the ``results`` of an engine to the container.  If
+        ``record_metrics`` is ``False``, the number of results is not recorded
+        in the metrics of the engine (e.g. the results are replayed from a
+        cache)."""
+        # pylint: disable=too-many-branches
         if self._closed:
             log.debug("container is closed, ignoring results: %s", results)
             return
         main_count = 0
+        main_results: list[MainResult | LegacyResult] = []
+
+        if self.engine_records is not None and engine_name:
+            # record the results before they are normalized and modified by the plugins
+            results = list(results)
+            try:
+                self.engine_records.append((engine_name, pickle.dumps(results)))
+            except Exception:  # pylint: disable=broad-except
+                log.debug("results of engine %s can't be recorded", engine_name)
+                self.engine_records = None
 
         for result in list(results):
 
@@ -95,7 +117,8 @@ class ResultContainer:
                     self.answers.add(result)
                 elif isinstance(result, MainResult):
                     main_count += 1
-                    self._merge_main_result(result, main_count)
+                    result.positions = [main_count]
+                    main_results.append(result)
                 else:
                     # more types need to be implemented in the future ..
                     raise NotImplementedError(f"no handler implemented to process the result of type {result}")
@@ -143,15 +166,22 @@ class ResultContainer:
 
                 if self.on_result(result):
                     main_count += 1
-                    self._merge_main_result(result, main_count)
+                    result.positions = [main_count]
+                    main_results.append(result)
                     continue
 
+        if main_results:
+            self._merge_main_results(main_results)
+
         if engine_name in searx.engines.engines:
             eng = searx.engines.engines[engine_name]
-            histogram_observe(main_count, "engine", eng.name, "result", "count")
+            if record_metrics:
+                engine_metrics[eng.name].result_count.observe(main_count)
             if not self.paging and eng.paging:
                 self.paging = True
 
+        self.on_extend(engine_name)
+
     def _merge_infobox(self, new_infobox: LegacyResult):
         add_infobox = True
 
@@ -165,29 +195,54 @@ class ResultContainer:
         if add_infobox:
             self.infoboxes.append(new_infobox)
 
-    def _merge_main_result(self, result: MainResult | LegacyResult, position):
-        result_hash = hash(result)
+    def _merge_main_results(self, results: list[MainResult | LegacyResult]):
+        """Merges the main results of one engine into :py:obj:`main_results_map`.
+
+        The duplicates of the engine are merged before the lock of the container
+        is acquired, so the engine threads do not wait for each other while the
+        results are compared.  The score of a result is updated each time a
+        result is merged into it."""
+
+        local_map: dict[int, MainResult | LegacyResult] = {}
+        for result in results:
+            # the plugins have run, the URL of the result is final
+            result_hash = result.update_hash()
+            merged = local_map.get(result_hash)
+            if merged is None:
+                local_map[result_hash] = result
+                continue
+            merge_two_main_results(merged, result)
+            merged.positions.extend(result.positions)
 
         with self._lock:
-
-            merged = self.main_results_map.get(result_hash)
-            if not merged:
-                # if there is no duplicate in the merged results, append result
-                result.positions = [position]
-                self.main_results_map[result_hash] = result
+            if self._closed:
+                log.debug("container is closed, ignoring results: %s", results)
                 return
 
-            merge_two_main_results(merged, result)
-            # add the new position
-            merged.positions.append(position)
+            for result_hash, result in local_map.items():
+                merged = self.main_results_map.get(result_hash)
+                if merged is None:
+                    # if there is no duplicate in the merged results, append result
+                    self.main_results_map[result_hash] = result
+                    merged = result
+                else:
+                    merge_two_main_results(merged, result)
+                    merged.positions.extend(result.positions)
+                merged.score = calculate_score(merged, merged.priority)
 
     def close(self):
-        self._closed = True
+        with self._lock:
+            self._closed = True
+            results = list(self.main_results_map.values())
 
-        for result in self.main_results_map.values():
-            result.score = calculate_score(result, result.priority)
+        # the scores are up to date (see _merge_main_results), sum up the scores
+        # per engine for the metrics
+        engine_scores: dict[str, float] = defaultdict(float)
+        for result in results:
             for eng_name in result.engines:
-                counter_add(result.score, 'engine', eng_name, 'score')
+                engine_scores[eng_name] += result.score
+        for eng_name, score in engine_scores.items():
+            engine_metrics[eng_name].score.add(score)
 
     def get_ordered_results(self) -> list[MainResult | LegacyResult]:
         """Returns a sorted list of results to be displayed in the main result
@@ -247,6 +302,24 @@ class ResultContainer:
         self._main_results_sorted = gresults
         return self._main_results_sorted
 
+    def get_new_results(self, seen: set[int]) -> list[dict]:
+        """Returns the fields of the main results that are not in ``seen``
+        (sorted by the current score).  The hashes of the returned results are
+        added to ``seen``.  The fields are copied, the results may still be
+        merged with the results of other engines."""
+
+        with self._lock:
+            new_results = [(h, res) for h, res in self.main_results_map.items() if h not in seen]
+            new_results.sort(key=lambda x: x[1].score, reverse=True)
+            fields = []
+            for result_hash, res in new_results:
+                seen.add(result_hash)
+                row = dict(res.as_dict())
+                row["engines"] = list(res.engines)
+                row["positions"] = list(res.positions)
+                fields.append(row)
+        return fields
+
     @property
     def number_of_results(self) -> int:
         """Returns the average of results number, returns zero if the average
@@ -4,6 +4,8 @@
 # the public namespace has not yet been finally defined ..
 # __all__ = ["EngineRef", "SearchQuery"]
 
+import asyncio
+import concurrent.futures
 import threading
 from timeit import default_timer
 from uuid import uuid4
@@ -17,12 +19,13 @@ import searx.plugins
 from searx.engines import load_engines
 from searx.extended_types import SXNG_Request
 from searx.external_bang import get_bang_url
-from searx.metrics import initialize as initialize_metrics, counter_inc, histogram_observe_time
-from searx.network import initialize as initialize_network, check_network_configuration
+from searx.metrics import initialize as initialize_metrics, engine_metrics, histogram_observe_time
+from searx.network import initialize as initialize_network, check_network_configuration, get_loop, warmup
 from searx.results import ResultContainer
 from searx.search.checker import initialize as initialize_checker
 from searx.search.models import SearchQuery
 from searx.search.processors import PROCESSORS, initialize as initialize_processors
+from searx.search import workers, result_cache, timeouts
 
 from .models import EngineRef, SearchQuery
 
@@ -37,6 +40,13 @@ def initialize(settings_engines=None, enable_checker=False, check_network=False,
         check_network_configuration()
     initialize_metrics([engine['name'] for engine in settings_engines], enable_metrics)
     initialize_processors(settings_engines)
+    workers.initialize(
+        settings['search']['engine_workers']['max_workers'],
+        settings['search']['engine_workers']['max_queue'],
+    )
+    result_cache.initialize(settings['search']['result_cache'])
+    timeouts.initialize(settings['search']['adaptive_timeout'])
+    warmup()
     if enable_checker:
         initialize_checker()
 
@@ -44,7 +54,7 @@ def initialize(settings_engines=None, enable_checker=False, check_network=False,
 class Search:
     """Search information container"""
 
-    __slots__ = "search_query", "result_container", "start_time", "actual_timeout"
+    __slots__ = "search_query", "result_container", "start_time", "actual_timeout", "deadline"
 
     def __init__(self, search_query: SearchQuery):
         """Initialize the Search"""
@@ -54,6 +64,7 @@ class Search:
         self.result_container = ResultContainer()
         self.start_time = None
         self.actual_timeout = None
+        self.deadline = None
 
     def search_external_bang(self):
         """
@@ -96,13 +107,13 @@ class Search:
             if request_params is None:
                 continue
 
-            counter_inc('engine', engineref.name, 'search', 'count', 'sent')
+            engine_metrics[engineref.name].sent.add(1)
 
             # append request to list
             requests.append((engineref.name, self.search_query.query, request_params))
 
             # update default_timeout
-            default_timeout = max(default_timeout, processor.engine.timeout)
+            default_timeout = max(default_timeout, timeouts.engine_timeout(engineref.name, processor.engine.timeout))
 
         # adjust timeout
         max_request_timeout = settings['outgoing']['max_request_timeout']
@@ -131,11 +142,111 @@ class Search:
         return requests, actual_timeout
 
     def search_multiple_requests(self, requests):
+        self.deadline = timeouts.Deadline(self.start_time, self.actual_timeout, [r[0] for r in requests])
+        # an engine has answered when its results have been added to the
+        # container (a failed engine does not count for the good enough policy)
+        on_extend = self.result_container.on_extend
+
+        def _on_extend(engine_name):
+            self.deadline.done(engine_name, answered=True)
+            on_extend(engine_name)
+
+        self.result_container.on_extend = _on_extend
+        async_future = None
+        async_names = []
+        if settings['search']['engine_workers']['asyncio']:
+            # the engine functions are called in the executor of the loop,
+            # they need a copy of the request context (one per engine)
+            # pylint: disable=unnecessary-lambda
+            async_requests = [
+                (*r, copy_current_request_context(lambda func, *args: func(*args)))
+                for r in requests
+                if hasattr(PROCESSORS[r[0]], 'search_async')
+            ]
+            requests = [r for r in requests if not hasattr(PROCESSORS[r[0]], 'search_async')]
+            async_names = [r[0] for r in async_requests]
+            if async_requests:
+                async_future = asyncio.run_coroutine_threadsafe(self._search_asyncio(async_requests), get_loop())
+
+        if workers.WORKERS is None:
+            self._search_multiple_threads(requests)
+        else:
+            self._search_multiple_workers(requests)
+
+        if async_future is not None:
+            # the coroutine returns when the deadline is reached, the extra
+            # second is just a safety margin
+            try:
+                timed_out = async_future.result(self.deadline.remaining() + 1)
+            except concurrent.futures.TimeoutError:
+                # the event loop is late (busy)
+                async_future.cancel()
+                timed_out = self.deadline.expire(async_names)
+            for engine_name in timed_out:
+                self.result_container.add_unresponsive_engine(engine_name, 'timeout')
+                PROCESSORS[engine_name].logger.error('engine timeout')
+
+    async def _search_asyncio(self, requests):
+        """Run the requests of the engines as tasks in the event loop of
+        :py:obj:`searx.network`.  Returns the names of the engines that have
+        not answered in time."""
+
+        tasks = {}
+        for engine_name, query, request_params, call in requests:
+            coro = PROCESSORS[engine_name].search_async(
+                query, request_params, self.result_container, self.start_time, self.actual_timeout, call, self.deadline
+            )
+            task = asyncio.create_task(coro)
+            task.add_done_callback(lambda _, name=engine_name: self.deadline.done(name))
+            tasks[task] = engine_name
+
+        pending = set(tasks)
+        try:
+            while pending:
+                remaining_time = self.deadline.remaining()
+                if remaining_time <= 0:
+                    break
+                _, pending = await asyncio.wait(pending, timeout=remaining_time, return_when=asyncio.FIRST_COMPLETED)
+        finally:
+            # also if this coroutine is cancelled: a cancelled task does not
+            # stop the engine functions that are running in the executor, the
+            # expired engines no longer add their results
+            timed_out = self.deadline.expire(tasks[task] for task in pending)
+            for task in pending:
+                task.cancel()
+        return timed_out
+
+    def _search_multiple_workers(self, requests):
+        deadline = self.start_time + self.actual_timeout
+        tasks = []
+
+        for engine_name, query, request_params in requests:
+            _search = self.deadline.track(engine_name, copy_current_request_context(PROCESSORS[engine_name].search))
+            task = workers.EngineTask(
+                engine_name,
+                _search,
+                (query, request_params, self.result_container, self.start_time, self.actual_timeout),
+                deadline,
+            )
+            if not workers.WORKERS.submit(task):
+                self.deadline.done(engine_name)
+                self.result_container.add_unresponsive_engine(engine_name, 'timeout')
+                PROCESSORS[engine_name].logger.error('engine worker pool is exhausted')
+                continue
+            tasks.append(task)
+
+        self.deadline.wait()
+        for task in tasks:
+            if self.deadline.is_pending(task.engine_name) and task.cancel():
+                self.result_container.add_unresponsive_engine(task.engine_name, 'timeout')
+                PROCESSORS[task.engine_name].logger.error('engine timeout')
+
+    def _search_multiple_threads(self, requests):
         # pylint: disable=protected-access
         search_id = str(uuid4())
 
         for engine_name, query, request_params in requests:
-            _search = copy_current_request_context(PROCESSORS[engine_name].search)
+            _search = self.deadline.track(engine_name, copy_current_request_context(PROCESSORS[engine_name].search))
             th = threading.Thread(  # pylint: disable=invalid-name
                 target=_search,
                 args=(query, request_params, self.result_container, self.start_time, self.actual_timeout),
@@ -145,11 +256,10 @@ class Search:
             th._engine_name = engine_name
             th.start()
 
+        self.deadline.wait()
         for th in threading.enumerate():  # pylint: disable=invalid-name
             if th.name == search_id:
-                remaining_time = max(0.0, self.actual_timeout - (default_timer() - self.start_time))
-                th.join(remaining_time)
-                if th.is_alive():
+                if self.deadline.is_pending(th._engine_name):
                     th._timeout = True
                     self.result_container.add_unresponsive_engine(th._engine_name, 'timeout')
                     PROCESSORS[th._engine_name].logger.error('engine timeout')
@@ -158,6 +268,34 @@ class Search:
         """
         Update self.result_container, self.actual_timeout
         """
+        if result_cache.CACHE is not None:
+            return self._search_standard_cached()
+        return self._search_standard()
+
+    def _search_standard_cached(self):
+        key = result_cache.cache_key(self.search_query)
+        cached = result_cache.get(key)
+
+        if cached is not None:
+            self.actual_timeout = 0
+            result_cache.replay(cached, self.result_container)
+            if cached.is_stale:
+                result_cache.refresh(key, copy_current_request_context(self._refresh_cache))
+            return True
+
+        self.result_container.engine_records = []
+        self._search_standard()
+        result_cache.store(key, self.search_query, self.result_container)
+        return True
+
+    def _refresh_cache(self):
+        search = Search(self.search_query)
+        search.start_time = default_timer()
+        search.result_container.engine_records = []
+        search._search_standard()  # pylint: disable=protected-access
+        result_cache.store(result_cache.cache_key(self.search_query), self.search_query, search.result_container)
+
+    def _search_standard(self):
         requests, self.actual_timeout = self._get_requests()
 
         # send all search-request
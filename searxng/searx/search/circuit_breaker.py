@@ -0,0 +1,260 @@
+# SPDX-License-Identifier: AGPL-3.0-or-later
+"""Circuit breaker of the engines (see
+:py:obj:`searx.search.processors.EngineProcessor`).
+
+There is one breaker per network, engines sharing a network share the breaker.
+The breaker has three states:
+
+``closed``
+  The requests are sent.  The outcome of the requests is recorded in a sliding
+  window of ``window`` seconds.  When there are at least ``min_requests`` in
+  the window and the ratio of the failed requests reaches ``error_rate`` or the
+  ratio of the requests slower than ``slow_time`` reaches ``slow_rate``, the
+  breaker trips (``open``).  An engine that reports it is blocked (CAPTCHA,
+  access denied, too many requests) trips the breaker immediately, for the time
+  given by the engine (``suspended_times``).
+
+``open``
+  The engine is suspended.  The breaker stays open for ``trips *
+  ban_time_on_fail`` seconds (at most ``max_ban_time_on_fail``), ``trips`` is
+  the number of times the breaker has tripped without recovering in between.
+
+``half_open``
+  Only a fraction (``half_open_ratio``) of the queries is sent to the engine.
+  After ``half_open_successes`` successful requests the breaker is ``closed``
+  again, a failed request opens the breaker again.
+
+With ``valkey: true`` (and a :ref:`settings valkey` DB), the state of the
+breakers (state, open time, trips) is shared by all worker processes: an engine
+that is blocked in one worker is suspended in all workers.  To keep the Valkey
+DB off the hot path, a worker reads the shared state of a breaker at most every
+``valkey_cache_ttl`` seconds.  The sliding windows of the requests are not
+shared, each worker decides on its own requests when to trip the breaker.
+
+.. code:: yaml
+
+   search:
+     ban_time_on_fail: 5
+     max_ban_time_on_fail: 120
+     circuit_breaker:
+       window: 60
+       min_requests: 5
+       error_rate: 0.5
+       slow_time: null
+       slow_rate: 0.5
+       half_open_ratio: 0.1
+       half_open_successes: 3
+       valkey: false
+       valkey_cache_ttl: 1.0
+"""
+
+from __future__ import annotations
+
+__all__ = ["CircuitBreaker", "CLOSED", "OPEN", "HALF_OPEN"]
+
+import collections
+import json
+import random
+import threading
+import time
+
+import valkey
+
+from searx import settings, logger
+from searx import valkeydb
+from searx.valkeylib import secret_hash
+
+logger = logger.getChild('search.circuit_breaker')
+
+CLOSED = 'closed'
+OPEN = 'open'
+HALF_OPEN = 'half_open'
+
+
+class CircuitBreaker:
+    """Circuit breaker of an engine (or of the engines sharing a network)."""
+
+    __slots__ = (
+        'name',
+        'state',
+        'open_until',
+        'trips',
+        'suspend_reason',
+        'half_open_successes',
+        'changed',
+        '_window',
+        '_synced',
+        'lock',
+    )
+
+    def __init__(self, name: str = ''):
+        self.name = name
+        """Name of the breaker in the Valkey DB (the name is the same in all
+        worker processes)."""
+        self.lock = threading.Lock()
+        self.state = CLOSED
+        self.open_until = 0.0
+        """Time (unix epoch) until the breaker is open."""
+        self.trips = 0
+        self.suspend_reason = None
+        self.half_open_successes = 0
+        self.changed = 0.0
+        """Time (unix epoch) of the last change of the state."""
+        self._synced = 0.0
+        # buckets of one second: [second, requests, errors, slow requests]
+        self._window: collections.deque[list] = collections.deque()
+
+    @property
+    def cfg(self) -> dict:
+        return settings['search']['circuit_breaker']
+
+    @property
+    def is_suspended(self) -> bool:
+        """``True`` if the breaker is open."""
+        return self._update_state() == OPEN
+
+    def allow_request(self) -> bool:
+        """Returns ``True`` if a request can be sent to the engine.  If the
+        breaker is half-open, only a fraction of the requests is allowed."""
+        state = self._update_state()
+        if state == OPEN:
+            return False
+        if state == HALF_OPEN:
+            return random.random() < self.cfg['half_open_ratio']
+        return True
+
+    def _update_state(self) -> str:
+        if self.shared:
+            self._load_shared()
+        if self.state == OPEN and time.time() >= self.open_until:
+            with self.lock:
+                if self.state == OPEN and time.time() >= self.open_until:
+                    self.state = HALF_OPEN
+                    self.half_open_successes = 0
+                    logger.debug('half-open: %s', self.suspend_reason)
+        return self.state
+
+    @property
+    def shared(self) -> bool:
+        """``True`` if the state is shared by the Valkey DB."""
+        return bool(self.name and self.cfg['valkey'] and valkeydb.client())
+
+    @property
+    def valkey_key(self) -> str:
+        return 'SearXNG_circuit_breaker_' + secret_hash(self.name)
+
+    def _load_shared(self):
+        # the shared state is read at most every valkey_cache_ttl seconds
+        now = time.time()
+        if now - self._synced < self.cfg['valkey_cache_ttl']:
+            return
+        self._synced = now
+        try:
+            value = valkeydb.client().get(self.valkey_key)  # type: ignore
+        except valkey.exceptions.ValkeyError as e:
+            logger.error('%s: can\'t read the shared state: %s', self.name, e)
+            return
+        if value is None:
+            return
+        remote = json.loads(value)
+        with self.lock:
+            if remote['changed'] <= self.changed:
+                return
+            self.state = remote['state']
+            self.open_until = remote['open_until']
+            self.trips = remote['trips']
+            self.suspend_reason = remote['reason']
+            self.changed = remote['changed']
+            self.half_open_successes = 0
+            if self.state != CLOSED:
+                self._window.clear()
+
+    def _store_shared(self):
+        if not self.shared:
+            return
+        value = json.dumps(
+            {
+                'state': self.state,
+                'open_until': self.open_until,
+                'trips': self.trips,
+                'reason': self.suspend_reason,
+                'changed': self.changed,
+            }
+        )
+        # keep the state as long as the breaker is open and as long as the
+        # trips are escalating
+        expire = int(max(self.open_until - time.time(), 0) + settings['search']['max_ban_time_on_fail'] + 1)
+        try:
+            valkeydb.client().set(self.valkey_key, value, ex=expire)  # type: ignore
+        except valkey.exceptions.ValkeyError as e:
+            logger.error('%s: can\'t store the shared state: %s', self.name, e)
+
+    def suspend(self, suspended_time, suspend_reason):
+        """Record a failed request.  If ``suspended_time`` is not ``None``, the
+        breaker is opened for ``suspended_time`` seconds."""
+        with self.lock:
+            self._record(error=True, slow=False)
+            if suspended_time is not None or self.state == HALF_OPEN or self._tripped():
+                self._open(suspended_time, suspend_reason)
+
+    def resume(self, duration: float | None = None):
+        """Record a successful request, ``duration`` is the time (in sec.) of
+        the request."""
+        slow_time = self.cfg['slow_time']
+        slow = slow_time is not None and duration is not None and duration > slow_time
+        with self.lock:
+            self._record(error=False, slow=slow)
+            if self.state == HALF_OPEN:
+                self.half_open_successes += 1
+                if self.half_open_successes >= self.cfg['half_open_successes']:
+                    self._close()
+            elif self.state == CLOSED and slow and self._tripped():
+                self._open(None, 'slow responses')
+
+    def _open(self, suspended_time, suspend_reason):
+        self.trips += 1
+        if suspended_time is None:
+            suspended_time = min(
+                settings['search']['max_ban_time_on_fail'],
+                self.trips * settings['search']['ban_time_on_fail'],
+            )
+        self.state = OPEN
+        self.open_until = time.time() + suspended_time
+        self.suspend_reason = suspend_reason
+        self.changed = time.time()
+        self._window.clear()
+        self._store_shared()
+        logger.debug('open for %i seconds: %s', suspended_time, suspend_reason)
+
+    def _close(self):
+        self.state = CLOSED
+        self.trips = 0
+        self.open_until = 0.0
+        self.suspend_reason = None
+        self.changed = time.time()
+        self._window.clear()
+        self._store_shared()
+        logger.debug('closed')
+
+    def _record(self, error: bool, slow: bool):
+        now = int(time.time())
+        window = self._window
+        while window and window[0][0] <= now - self.cfg['window']:
+            window.popleft()
+        if not window or window[-1][0] != now:
+            window.append([now, 0, 0, 0])
+        bucket = window[-1]
+        bucket[1] += 1
+        bucket[2] += error
+        bucket[3] += slow
+
+    def _tripped(self) -> bool:
+        cfg = self.cfg
+        requests = sum(b[1] for b in self._window)
+        if requests < cfg['min_requests']:
+            return False
+        errors = sum(b[2] for b in self._window)
+        slow = sum(b[3] for b in self._window)
+        return errors >= cfg['error_rate'] * requests or (
+            cfg['slow_time'] is not None and slow >= cfg['slow_rate'] * requests
+        )
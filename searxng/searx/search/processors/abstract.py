@@ -10,49 +10,14 @@ from typing import Dict, Union
 
 from searx import settings, logger
 from searx.engines import engines
-from searx.network import get_time_for_thread, get_network
-from searx.metrics import histogram_observe, counter_inc, count_exception, count_error
+from searx.network import get_time_for_thread, get_queue_time_for_thread, get_network
+from searx.metrics import engine_metrics, count_exception, count_error
 from searx.exceptions import SearxEngineAccessDeniedException, SearxEngineResponseException
 from searx.utils import get_engine_from_settings
+from searx.search.circuit_breaker import CircuitBreaker
 
 logger = logger.getChild('searx.search.processor')
-SUSPENDED_STATUS: Dict[Union[int, str], 'SuspendedStatus'] = {}
-
-
-class SuspendedStatus:
-    """Class to handle suspend state."""
-
-    __slots__ = 'suspend_end_time', 'suspend_reason', 'continuous_errors', 'lock'
-
-    def __init__(self):
-        self.lock = threading.Lock()
-        self.continuous_errors = 0
-        self.suspend_end_time = 0
-        self.suspend_reason = None
-
-    @property
-    def is_suspended(self):
-        return self.suspend_end_time >= default_timer()
-
-    def suspend(self, suspended_time, suspend_reason):
-        with self.lock:
-            # update continuous_errors / suspend_end_time
-            self.continuous_errors += 1
-            if suspended_time is None:
-                suspended_time = min(
-                    settings['search']['max_ban_time_on_fail'],
-                    self.continuous_errors * settings['search']['ban_time_on_fail'],
-                )
-            self.suspend_end_time = default_timer() + suspended_time
-            self.suspend_reason = suspend_reason
-            logger.debug('Suspend for %i seconds', suspended_time)
-
-    def resume(self):
-        with self.lock:
-            # reset the suspend variables
-            self.continuous_errors = 0
-            self.suspend_end_time = 0
-            self.suspend_reason = None
+SUSPENDED_STATUS: Dict[Union[int, str], CircuitBreaker] = {}
 
 
 class EngineProcessor(ABC):
@@ -66,7 +31,11 @@ class EngineProcessor(ABC):
         self.logger = engines[engine_name].logger
         key = get_network(self.engine_name)
         key = id(key) if key else self.engine_name
-        self.suspended_status = SUSPENDED_STATUS.setdefault(key, SuspendedStatus())
+        if key not in SUSPENDED_STATUS:
+            # the name of the breaker is the name of the first engine of the
+            # network, the same in all worker processes
+            SUSPENDED_STATUS[key] = CircuitBreaker(self.engine_name)
+        self.suspended_status = SUSPENDED_STATUS[key]
 
     def initialize(self):
         try:
@@ -93,7 +62,7 @@ class EngineProcessor(ABC):
             error_message = exception_or_message
         result_container.add_unresponsive_engine(self.engine_name, error_message)
         # metrics
-        counter_inc('engine', self.engine_name, 'search', 'count', 'error')
+        engine_metrics[self.engine_name].error.add(1)
         if isinstance(exception_or_message, BaseException):
             count_exception(self.engine_name, exception_or_message)
         else:
@@ -112,10 +81,14 @@ class EngineProcessor(ABC):
         page_load_time = get_time_for_thread()
         result_container.add_timing(self.engine_name, engine_time, page_load_time)
         # metrics
-        counter_inc('engine', self.engine_name, 'search', 'count', 'successful')
-        histogram_observe(engine_time, 'engine', self.engine_name, 'time', 'total')
+        metrics = engine_metrics[self.engine_name]
+        metrics.successful.add(1)
+        metrics.time_total.observe(engine_time)
         if page_load_time is not None:
-            histogram_observe(page_load_time, 'engine', self.engine_name, 'time', 'http')
+            metrics.time_http.observe(page_load_time)
+        queue_time = get_queue_time_for_thread()
+        if queue_time:
+            metrics.time_queue.observe(queue_time)
 
     def extend_container(self, result_container, start_time, search_results):
         if getattr(threading.current_thread(), '_timeout', False):
@@ -125,10 +98,10 @@ class EngineProcessor(ABC):
             # check if the engine accepted the request
             if search_results is not None:
                 self._extend_container_basic(result_container, start_time, search_results)
-            self.suspended_status.resume()
+            self.suspended_status.resume(default_timer() - start_time)
 
     def extend_container_if_suspended(self, result_container):
-        if self.suspended_status.is_suspended:
+        if not self.suspended_status.allow_request():
             result_container.add_unresponsive_engine(
                 self.engine_name, self.suspended_status.suspend_reason, suspended=True
             )
@@ -7,9 +7,12 @@
 from timeit import default_timer
 import asyncio
 import ssl
+import threading
 import httpx
 
 import searx.network
+from searx.network.scheduler import QueueTimeout
+from searx.cache import ExpireCache, ExpireCacheCfg
 from searx.utils import gen_useragent
 from searx.exceptions import (
     SearxEngineAccessDeniedException,
@@ -34,18 +37,47 @@ def default_request_params():
     }
 
 
+RESPONSE_CACHE: ExpireCache = None  # type: ignore
+"""Cache of the parsed responses of the engines, see
+:py:obj:`OnlineProcessor.get_cached_response`."""
+
+
+_RESPONSE_CACHE_LOCK = threading.Lock()
+
+
+def get_RESPONSE_CACHE():
+
+    global RESPONSE_CACHE  # pylint: disable=global-statement
+
+    if RESPONSE_CACHE is None:
+        with _RESPONSE_CACHE_LOCK:
+            if RESPONSE_CACHE is None:
+                cache = ExpireCache.build_cache(
+                    ExpireCacheCfg(
+                        name="ENGINES_RESPONSE_CACHE",
+                        MAX_VALUE_LEN=1024 * 500,  # max. 500kB for the results of one response
+                        MAXHOLD_TIME=60 * 60 * 24,  # 1 day
+                        MAINTENANCE_PERIOD=60 * 10,
+                    )
+                )
+                # the engine threads access the cache concurrently, the DB
+                # schema has to be set up before the cache is published
+                cache.maintenance()
+                RESPONSE_CACHE = cache
+    return RESPONSE_CACHE
+
+
+def _call(func, *args):
+    return func(*args)
+
+
 class OnlineProcessor(EngineProcessor):
     """Processor class for ``online`` engines."""
 
     engine_type = 'online'
 
     def initialize(self):
-        # set timeout for all HTTP requests
-        searx.network.set_timeout_for_thread(self.engine.timeout, start_time=default_timer())
-        # reset the HTTP total time
-        searx.network.reset_time_for_thread()
-        # set the network
-        searx.network.set_context_network_name(self.engine_name)
+        self._set_thread_context(default_timer(), self.engine.timeout)
         super().initialize()
 
     def get_params(self, search_query, engine_category):
@@ -76,7 +108,11 @@ class OnlineProcessor(EngineProcessor):
         self.logger.debug('HTTP Accept-Language: %s', params['headers'].get('Accept-Language', ''))
         return params
 
-    def _send_http_request(self, params):
+    def _get_request_args(self, params):
+        """Returns a tuple ``(request_args, soft_max_redirects)``, the
+        ``request_args`` are the arguments passed to :py:obj:`searx.network`
+        to send the request of the engine."""
+
         # create dictionary which contain all
         # information about the request
         request_args = dict(headers=params['headers'], cookies=params['cookies'], auth=params['auth'])
@@ -104,17 +140,11 @@ class OnlineProcessor(EngineProcessor):
         # raise_for_status
         request_args['raise_for_httperror'] = params.get('raise_for_httperror', True)
 
-        # specific type of request (GET or POST)
-        if params['method'] == 'GET':
-            req = searx.network.get
-        else:
-            req = searx.network.post
-
         request_args['data'] = params['data']
 
-        # send the request
-        response = req(params['url'], **request_args)
+        return request_args, soft_max_redirects
 
+    def _check_redirects(self, response, soft_max_redirects):
         # check soft limit of the redirect count
         if len(response.history) > soft_max_redirects:
             # unexpected redirect : record an error
@@ -129,8 +159,90 @@ class OnlineProcessor(EngineProcessor):
                 secondary=True,
             )
 
+    def _send_http_request(self, params):
+        request_args, soft_max_redirects = self._get_request_args(params)
+
+        # specific type of request (GET or POST)
+        if params['method'] == 'GET':
+            req = searx.network.get
+        else:
+            req = searx.network.post
+
+        # send the request
+        response = req(params['url'], **request_args)
+        self._check_redirects(response, soft_max_redirects)
+        return response
+
+    async def _send_http_request_async(self, params, start_time, timeout_limit, ticket=None):
+        request_args, soft_max_redirects = self._get_request_args(params)
+
+        # specific type of request (GET or POST), see searx.network.get & post
+        if params['method'] == 'GET':
+            method = 'get'
+            request_args.setdefault('allow_redirects', True)
+        else:
+            method = 'post'
+
+        # send the request in the event loop of searx.network
+        request_args['timeout'] = timeout_limit
+        network = searx.network.get_network(self.engine_name) or searx.network.get_network()
+        response = await asyncio.wait_for(
+            network.request(method, params['url'], ticket, **request_args),
+            timeout_limit + 0.2 - (default_timer() - start_time),
+        )
+        self._check_redirects(response, soft_max_redirects)
         return response
 
+    def response_cache_key(self, params) -> str | None:
+        """Returns the key of the request (given by the ``params``) in the
+        response cache or ``None`` if the engine does not cache its responses
+        (engine setting ``response_cache_ttl``).
+
+        Requests with the same method, URL, data, cookies and
+        ``Accept-Language`` header share the same key (the ``User-Agent`` is
+        random and not part of the key).
+        """
+        if not getattr(self.engine, 'response_cache_ttl', 0) or not params['url']:
+            return None
+
+        def _items(value):
+            if isinstance(value, dict):
+                return sorted((str(k), str(v)) for k, v in value.items())
+            return value
+
+        key = repr(
+            (
+                params['method'],
+                params['url'],
+                _items(params['data']),
+                _items(params['cookies']),
+                params['headers'].get('Accept-Language'),
+            )
+        )
+        return get_RESPONSE_CACHE().secret_hash(key)
+
+    def get_cached_response(self, key: str | None):
+        """Returns the cached results of the request ``key`` or ``None``."""
+        if key is None:
+            return None
+        return get_RESPONSE_CACHE().get(key, ctx=self.response_cache_ctx)
+
+    def set_cached_response(self, key: str | None, search_results):
+        """Store the parsed results (``search_results``) of the request
+        ``key``.  Results that can't be serialized are not cached."""
+        if key is None or search_results is None:
+            return
+        try:
+            get_RESPONSE_CACHE().set(
+                key, list(search_results), expire=self.engine.response_cache_ttl, ctx=self.response_cache_ctx
+            )
+        except Exception as e:  # pylint: disable=broad-except
+            self.logger.debug("response can't be cached: %s", e)
+
+    @property
+    def response_cache_ctx(self) -> str:
+        return ExpireCache.normalize_name(self.engine_name.replace(' ', '_'))
+
     def _search_basic(self, query, params):
         # update request parameters dependent on
         # search-engine (contained in engines folder)
@@ -140,14 +252,22 @@ class OnlineProcessor(EngineProcessor):
         if not params['url']:
             return None
 
+        # cached results of an identical request
+        cache_key = self.response_cache_key(params)
+        search_results = self.get_cached_response(cache_key)
+        if search_results is not None:
+            return search_results
+
         # send request
         response = self._send_http_request(params)
 
         # parse the response
         response.search_params = params
-        return self.engine.response(response)
+        search_results = self.engine.response(response)
+        self.set_cached_response(cache_key, search_results)
+        return search_results
 
-    def search(self, query, params, result_container, start_time, timeout_limit):
+    def _set_thread_context(self, start_time, timeout_limit):
         # set timeout for all HTTP requests
         searx.network.set_timeout_for_thread(timeout_limit, start_time=start_time)
         # reset the HTTP total time
@@ -155,15 +275,94 @@ class OnlineProcessor(EngineProcessor):
         # set the network
         searx.network.set_context_network_name(self.engine_name)
 
+    def search(self, query, params, result_container, start_time, timeout_limit):
+        self._set_thread_context(start_time, timeout_limit)
+
         try:
             # send requests and parse the results
             search_results = self._search_basic(query, params)
             self.extend_container(result_container, start_time, search_results)
-        except ssl.SSLError as e:
+        except Exception as e:  # pylint: disable=broad-except
+            self._handle_search_exception(result_container, start_time, timeout_limit, e)
+
+    async def search_async(self, query, params, result_container, start_time, timeout_limit, call=None, deadline=None):
+        """Coroutine counterpart of :py:obj:`OnlineProcessor.search`, to be
+        run in the event loop of :py:obj:`searx.network`.
+
+        Only the HTTP request is sent in the event loop, the (blocking) engine
+        functions ``request`` and ``response`` are called in the default
+        executor of the loop.  The optional ``call`` argument is a function
+        ``call(func, *args)`` that is used to call these functions in the
+        executor (e.g. to wrap them in a Flask request context).  If the
+        :py:obj:`searx.search.timeouts.Deadline` of the query is given, the
+        results are only added to the container while the engine is pending.
+        """
+        # pylint: disable=too-many-arguments
+        loop = asyncio.get_running_loop()
+        call = call or _call
+
+        def _request():
+            self._set_thread_context(start_time, timeout_limit)
+            self.engine.request(query, params)
+            cache_key = self.response_cache_key(params)
+            return searx.network.get_time_for_thread(), cache_key, self.get_cached_response(cache_key)
+
+        def _extend(search_results, http_time, queue_time=0):
+            searx.network.add_time_for_thread(http_time)
+            searx.network.add_queue_time_for_thread(queue_time)
+            # the query is not waiting any longer when the timeout is reached
+            # (or the answers of the other engines are good enough)
+            if deadline is not None:
+                timed_out = not deadline.is_pending(self.engine_name)
+            else:
+                timed_out = default_timer() >= start_time + timeout_limit
+            threading.current_thread()._timeout = timed_out  # pylint: disable=protected-access
+            self.extend_container(result_container, start_time, search_results)
+
+        def _cached_response(search_results, http_time):
+            self._set_thread_context(start_time, timeout_limit)
+            _extend(search_results, http_time)
+
+        def _response(response, http_time, queue_time, cache_key):
+            self._set_thread_context(start_time, timeout_limit)
+            response.search_params = params
+            search_results = self.engine.response(response)
+            self.set_cached_response(cache_key, search_results)
+            _extend(search_results, http_time, queue_time)
+
+        try:
+            http_time, cache_key, search_results = await loop.run_in_executor(None, call, _request)
+
+            # ignoring empty urls
+            if not params['url']:
+                self.extend_container(result_container, start_time, None)
+                return
+
+            # cached results of an identical request
+            if search_results is not None:
+                await loop.run_in_executor(None, call, _cached_response, search_results, http_time)
+                return
+
+            ticket = searx.network.new_queue_ticket(self.engine_name, start_time, timeout_limit)
+            time_before_request = default_timer()
+            response = await self._send_http_request_async(params, start_time, timeout_limit, ticket)
+            http_time += default_timer() - time_before_request - ticket.wait_time
+
+            await loop.run_in_executor(None, call, _response, response, http_time, ticket.wait_time, cache_key)
+        except Exception as e:  # pylint: disable=broad-except
+            self._handle_search_exception(result_container, start_time, timeout_limit, e)
+
+    def _handle_search_exception(self, result_container, start_time, timeout_limit, e):
+        if isinstance(e, ssl.SSLError):
             # requests timeout (connect or read)
             self.handle_exception(result_container, e, suspend=True)
             self.logger.error("SSLError {}, verify={}".format(e, searx.network.get_network(self.engine_name).verify))
-        except (httpx.TimeoutException, asyncio.TimeoutError) as e:
+        elif isinstance(e, QueueTimeout):
+            # dropped from the request queue of the network: SearXNG is
+            # overloaded, not the engine
+            self.handle_exception(result_container, e)
+            self.logger.debug("request dropped from the queue of the network: %s", e)
+        elif isinstance(e, (httpx.TimeoutException, asyncio.TimeoutError)):
             # requests timeout (connect or read)
             self.handle_exception(result_container, e, suspend=True)
             self.logger.error(
@@ -171,7 +370,7 @@ class OnlineProcessor(EngineProcessor):
                     default_timer() - start_time, timeout_limit, e.__class__.__name__
                 )
             )
-        except (httpx.HTTPError, httpx.StreamError) as e:
+        elif isinstance(e, (httpx.HTTPError, httpx.StreamError)):
             # other requests exception
             self.handle_exception(result_container, e, suspend=True)
             self.logger.exception(
@@ -179,16 +378,16 @@ class OnlineProcessor(EngineProcessor):
                     default_timer() - start_time, timeout_limit, e
                 )
             )
-        except SearxEngineCaptchaException as e:
+        elif isinstance(e, SearxEngineCaptchaException):
             self.handle_exception(result_container, e, suspend=True)
             self.logger.exception('CAPTCHA')
-        except SearxEngineTooManyRequestsException as e:
+        elif isinstance(e, SearxEngineTooManyRequestsException):
             self.handle_exception(result_container, e, suspend=True)
             self.logger.exception('Too many requests')
-        except SearxEngineAccessDeniedException as e:
+        elif isinstance(e, SearxEngineAccessDeniedException):
             self.handle_exception(result_container, e, suspend=True)
             self.logger.exception('SearXNG is blocked')
-        except Exception as e:  # pylint: disable=broad-except
+        else:
             self.handle_exception(result_container, e)
             self.logger.exception('exception : {0}'.format(e))
 
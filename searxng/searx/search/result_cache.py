@@ -0,0 +1,186 @@
+# SPDX-License-Identifier: AGPL-3.0-or-later
+"""Cache of the engine results of a search query (see
+:py:obj:`searx.search.Search.search_standard`).
+
+Identical queries (same query term, engines, language, page, ..) are answered
+from the cache instead of sending the requests to the engines again.  The cache
+stores the *raw* results of each engine (as they were passed to
+:py:obj:`ResultContainer.extend <searx.results.ResultContainer.extend>`), on a
+cache hit these results are replayed into the result container of the new
+search.  This way the plugins (``on_result``) of the user are applied to the
+cached results as they are applied to fresh results.
+
+- A query whose results are incomplete (unresponsive engines) is not cached.
+- A value is *fresh* for ``ttl`` seconds, the ``ttl`` can be set per category
+  (the smallest ``ttl`` of the categories of a query is used).
+- Thereafter the value is *stale* for another ``stale_ttl`` seconds: a stale
+  value is returned and the results of the query are refreshed in a background
+  thread (stale-while-revalidate).
+- Hits, misses and stale hits are recorded in the metrics (``search.cache.*``).
+
+.. code:: yaml
+
+   search:
+     result_cache:
+       enabled: true
+       ttl: 300
+       stale_ttl: 600
+       category_ttl:
+         news: 60
+
+The values are stored in an :py:obj:`searx.cache.ExpireCache`, the keys are
+hashed (:py:obj:`searx.cache.ExpireCache.secret_hash`) so the query terms are
+not readable in the DB.
+"""
+
+from __future__ import annotations
+
+__all__ = ["CACHE", "CachedSearch", "initialize", "cache_key", "get", "store", "replay", "refresh"]
+
+import pickle
+import threading
+import time
+import typing
+
+import msgspec
+
+from searx import logger
+from searx.cache import ExpireCache, ExpireCacheCfg
+from searx.metrics import counter_inc
+
+if typing.TYPE_CHECKING:
+    from searx.results import ResultContainer
+    from searx.search.models import SearchQuery
+
+logger = logger.getChild('search.result_cache')
+
+CACHE: ExpireCache | None = None
+"""The cache of the search results, ``None`` if the cache is disabled."""
+
+CFG: dict[str, typing.Any] = {}
+
+_REFRESHING: set[str] = set()
+_REFRESHING_LOCK = threading.Lock()
+
+
+class CachedSearch(msgspec.Struct):
+    """Value stored in the cache for a search query."""
+
+    fresh_until: int
+    """Unix time until the value is fresh."""
+
+    expire_at: int
+    """Unix time until a (stale) value can be used."""
+
+    records: list[tuple[str, bytes]]
+    """The (pickled) results of each engine in the order they were received."""
+
+    @property
+    def is_stale(self) -> bool:
+        return int(time.time()) >= self.fresh_until
+
+
+def initialize(cfg: dict[str, typing.Any]):
+    """Initialize the cache from the settings (``search.result_cache``)."""
+    global CACHE  # pylint: disable=global-statement
+
+    CFG.clear()
+    CFG.update(cfg)
+    CACHE = None
+    if cfg['enabled']:
+        CACHE = ExpireCache.build_cache(
+            ExpireCacheCfg(
+                name="SEARCH_RESULT_CACHE",
+                MAX_VALUE_LEN=1024 * 1024 * 2,  # max. 2MB for the results of one query
+                MAXHOLD_TIME=cfg['ttl'] + cfg['stale_ttl'],
+                MAINTENANCE_PERIOD=60 * 10,
+            )
+        )
+
+
+def cache_key(search_query: SearchQuery) -> str:
+    """Returns the (hashed) key of the ``search_query`` in the cache.  Unlike
+    ``hash(search_query)``, the key is the same in all processes."""
+
+    engines = ",".join(sorted(f"{ref.name}:{ref.category}" for ref in search_query.engineref_list))
+    engine_data = ",".join(
+        f"{name}:{sorted(data.items())}" for name, data in sorted(search_query.engine_data.items())
+    )
+    key = "|".join(
+        [
+            search_query.query,
+            engines,
+            str(search_query.lang),
+            str(search_query.safesearch),
+            str(search_query.pageno),
+            str(search_query.time_range),
+            str(search_query.timeout_limit),
+            engine_data,
+        ]
+    )
+    return CACHE.secret_hash(key)  # type: ignore
+
+
+def get_ttl(search_query: SearchQuery) -> int:
+    """Returns the time (in sec.) the results of ``search_query`` are fresh."""
+    category_ttl = CFG['category_ttl']
+    return min([category_ttl.get(category, CFG['ttl']) for category in search_query.categories] or [CFG['ttl']])
+
+
+def get(key: str) -> CachedSearch | None:
+    """Returns the cached value of ``key`` or ``None``."""
+
+    value: CachedSearch | None = CACHE.get(key)  # type: ignore
+    if value is not None and int(time.time()) >= value.expire_at:
+        value = None
+
+    if value is None:
+        counter_inc('search', 'cache', 'miss')
+    elif value.is_stale:
+        counter_inc('search', 'cache', 'stale')
+    else:
+        counter_inc('search', 'cache', 'hit')
+    return value
+
+
+def store(key: str, search_query: SearchQuery, result_container: ResultContainer) -> bool:
+    """Store the engine results recorded in ``result_container``.  Returns
+    ``False`` if the results are incomplete or can't be cached."""
+
+    records = result_container.engine_records
+    if records is None or result_container.unresponsive_engines:
+        return False
+
+    ttl = get_ttl(search_query)
+    now = int(time.time())
+    value = CachedSearch(fresh_until=now + ttl, expire_at=now + ttl + CFG['stale_ttl'], records=list(records))
+    return CACHE.set(key, value, expire=ttl + CFG['stale_ttl'])  # type: ignore
+
+
+def replay(value: CachedSearch, result_container: ResultContainer):
+    """Replay the engine results of a cached ``value`` into
+    ``result_container``.  The results have been recorded in the metrics of the
+    engines when they were received, they are not recorded again."""
+    for engine_name, results in value.records:
+        result_container.extend(engine_name, pickle.loads(results), record_metrics=False)
+
+
+def refresh(key: str, func: typing.Callable[[], None]):
+    """Call ``func`` in a background thread to refresh the stale value of
+    ``key``.  A value is refreshed only once at a time (per process)."""
+
+    with _REFRESHING_LOCK:
+        if key in _REFRESHING:
+            return
+        _REFRESHING.add(key)
+
+    def _refresh():
+        try:
+            func()
+        except Exception:  # pylint: disable=broad-except
+            logger.exception('refresh of cached search results failed')
+        finally:
+            with _REFRESHING_LOCK:
+                _REFRESHING.discard(key)
+
+    threading.Thread(target=_refresh, name='search_cache_refresh', daemon=True).start()
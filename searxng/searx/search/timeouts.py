@@ -0,0 +1,175 @@
+# SPDX-License-Identifier: AGPL-3.0-or-later
+"""Adaptive timeouts of the engines and the deadline of a search query (see
+:py:obj:`searx.search.Search.search_multiple_requests`).
+
+By default, a query waits for the engine with the highest ``timeout`` setting.
+In the *adaptive* mode the timeout of an engine is derived from the response
+times of the engine (the ``engine.<name>.time.total`` histogram of the
+:py:obj:`searx.metrics`):
+
+- The effective timeout is the ``percentile`` of the response times multiplied
+  by ``factor``, bounded by ``min_timeout`` and by the ``timeout`` of the engine
+  (or ``max_timeout`` if set).
+- As long as there are less than ``min_samples`` response times, the
+  ``timeout`` of the engine is used.
+
+The ``good_enough`` policy stops waiting for the remaining engines once the
+engines that have answered are expected to contribute ``good_enough`` (ratio)
+of the results of the query.  The expected number of results of an engine is
+the average of its ``engine.<name>.result.count`` histogram.
+
+.. code:: yaml
+
+   search:
+     adaptive_timeout:
+       enabled: true
+       percentile: 95
+       factor: 1.2
+       min_timeout: 0.5
+       max_timeout: null
+       min_samples: 20
+       good_enough: 0.9
+
+Set ``good_enough`` to ``0`` to wait for all engines (the default).
+"""
+
+from __future__ import annotations
+
+__all__ = ["initialize", "engine_timeout", "Deadline"]
+
+import threading
+import typing
+from timeit import default_timer
+
+from searx import logger
+from searx.metrics import histogram
+
+logger = logger.getChild('search.timeouts')
+
+CFG: dict[str, typing.Any] = {'enabled': False, 'good_enough': 0}
+
+REFRESH_TIME = 10
+"""Time (in sec.) an adaptive timeout is cached before it is computed again
+from the histogram."""
+
+_TIMEOUTS: dict[str, tuple[float, float]] = {}
+
+
+def initialize(cfg: dict[str, typing.Any]):
+    """Initialize the adaptive timeouts from the settings
+    (``search.adaptive_timeout``)."""
+    CFG.clear()
+    CFG.update(cfg)
+    _TIMEOUTS.clear()
+
+
+def engine_timeout(engine_name: str, timeout: float) -> float:
+    """Returns the effective timeout of the engine, ``timeout`` is the
+    configured timeout of the engine."""
+
+    if not CFG['enabled']:
+        return timeout
+
+    now = default_timer()
+    cached = _TIMEOUTS.get(engine_name)
+    if cached is not None and cached[0] > now:
+        return cached[1]
+
+    effective = timeout
+    hist = histogram('engine', engine_name, 'time', 'total', raise_on_not_found=False)
+    if hist is not None and hist.count >= CFG['min_samples']:
+        percentile = hist.percentage(CFG['percentile'])
+        if percentile is not None:
+            max_timeout = timeout if CFG['max_timeout'] is None else CFG['max_timeout']
+            effective = min(max(float(percentile) * CFG['factor'], CFG['min_timeout']), max_timeout)
+            logger.debug("%s: timeout %s (p%s=%s)", engine_name, effective, CFG['percentile'], percentile)
+
+    _TIMEOUTS[engine_name] = (now + REFRESH_TIME, effective)
+    return effective
+
+
+def expected_results(engine_name: str) -> float:
+    """Returns the average number of results of the engine."""
+    hist = histogram('engine', engine_name, 'result', 'count', raise_on_not_found=False)
+    if hist is None or not hist.count:
+        return 1.0
+    return hist.average
+
+
+class Deadline:
+    """The deadline of a search query.  The engines report by :py:obj:`done`
+    that they have answered (or failed), :py:obj:`wait` returns when all engines have
+    answered, the deadline is reached or the answers are *good enough*."""
+
+    def __init__(self, start_time: float, timeout: float, engine_names: typing.Iterable[str]):
+        self.end_time = start_time + timeout
+        self._cond = threading.Condition()
+        self._pending = set(engine_names)
+        self._expected = {name: expected_results(name) for name in self._pending} if CFG['good_enough'] else {}
+        self._expected_total = sum(self._expected.values())
+        self._answered = 0.0
+
+    @property
+    def good_enough(self) -> bool:
+        """``True`` if the engines that have answered are expected to contribute
+        enough results to the query."""
+        if not self._expected_total:
+            return False
+        return self._answered >= CFG['good_enough'] * self._expected_total
+
+    def remaining(self) -> float:
+        """Time (in sec.) until the deadline, ``0`` if the answers are already
+        good enough."""
+        if self.good_enough:
+            return 0.0
+        return max(0.0, self.end_time - default_timer())
+
+    def done(self, engine_name: str, answered: bool = False):
+        """Report that the engine has finished.  Only an engine that has
+        ``answered`` (its results have been added to the result container)
+        counts for the :py:obj:`good_enough` policy, an engine that has failed
+        does not."""
+        with self._cond:
+            if engine_name in self._pending:
+                self._pending.discard(engine_name)
+                if answered:
+                    self._answered += self._expected.get(engine_name, 0.0)
+            self._cond.notify_all()
+
+    def expire(self, engine_names: typing.Iterable[str]) -> list[str]:
+        """Report that the engines have not answered in time.  Returns the
+        engines that were still pending, the results of these engines are no
+        longer added to the result container."""
+        with self._cond:
+            expired = [name for name in engine_names if name in self._pending]
+            self._pending.difference_update(expired)
+            self._cond.notify_all()
+        return expired
+
+    def is_pending(self, engine_name: str) -> bool:
+        """``True`` if the engine has not answered yet."""
+        with self._cond:
+            return engine_name in self._pending
+
+    def track(self, engine_name: str, func: typing.Callable) -> typing.Callable:
+        """Wraps ``func``, the engine is reported as done when ``func`` returns
+        (the answer is reported by the result container, see
+        :py:obj:`searx.search.Search.search_multiple_requests`)."""
+
+        def _func(*args):
+            try:
+                return func(*args)
+            finally:
+                self.done(engine_name)
+
+        return _func
+
+    def wait(self):
+        """Wait until all engines have answered, the deadline is reached or the
+        answers are good enough."""
+        with self._cond:
+            while self._pending:
+                remaining = self.remaining()
+                if remaining <= 0:
+                    break
+                self._cond.wait(remaining)
@@ -0,0 +1,185 @@
+# SPDX-License-Identifier: AGPL-3.0-or-later
+"""Bounded pool of long-lived worker threads that run the engine requests of a
+search query (see :py:obj:`searx.search.Search.search_multiple_requests`).
+
+Instead of starting a new thread for each engine of each query, the engine
+requests are put into a bounded queue and processed by a fixed number of worker
+threads (per process).  The worker threads are started on demand, so a process
+that has been forked after :py:obj:`initialize` does not inherit dead threads.
+
+- If the queue is full, the request is rejected (*back-pressure*) and the engine
+  is reported as unresponsive.
+- A request that is still queued when the deadline of its query is reached is
+  dropped without being sent.
+- The depth of the queue and the time a request has been waiting in the queue
+  are recorded in the metrics (``search.workers.*``).
+
+.. code:: yaml
+
+   search:
+     engine_workers:
+       max_workers: 64
+       max_queue: 512
+
+Set ``max_workers`` to ``0`` to start a dedicated thread per engine request (the
+behavior of SearXNG before the worker pool was implemented).
+"""
+
+from __future__ import annotations
+
+__all__ = ["EngineTask", "EngineWorkerPool", "WORKERS", "initialize"]
+
+import queue
+import threading
+import typing
+from timeit import default_timer
+
+from searx import logger
+from searx.metrics import histogram_observe, counter_inc
+
+logger = logger.getChild('search.workers')
+
+WORKERS: EngineWorkerPool | None = None
+"""The worker pool of this process, ``None`` if the pool is disabled."""
+
+
+class EngineTask:
+    """The request of one engine of a search query, processed by a worker of
+    the :py:obj:`EngineWorkerPool`.
+
+    The timeout flag of the worker thread (``threading.current_thread()._timeout``)
+    is set by :py:obj:`EngineTask.cancel` as long as the task is running, this
+    flag is evaluated in :py:obj:`searx.search.processors.EngineProcessor.extend_container`.
+    """
+
+    __slots__ = 'engine_name', 'func', 'args', 'deadline', 'submit_time', 'timeout', '_thread', '_done', '_lock'
+
+    def __init__(self, engine_name: str, func: typing.Callable, args: tuple, deadline: float):
+        self.engine_name = engine_name
+        self.func = func
+        self.args = args
+        self.deadline = deadline
+        self.submit_time = default_timer()
+        self.timeout = False
+        self._thread: threading.Thread | None = None
+        self._done = threading.Event()
+        self._lock = threading.Lock()
+
+    def run(self):
+        # pylint: disable=protected-access
+        histogram_observe(default_timer() - self.submit_time, 'search', 'workers', 'wait')
+
+        try:
+            with self._lock:
+                if self.timeout or default_timer() >= self.deadline:
+                    # the query is not waiting any longer for this engine: the
+                    # engine is reported as unresponsive by EngineTask.cancel()
+                    self.timeout = True
+                    return
+                self._thread = threading.current_thread()
+                self._thread._timeout = False
+
+            try:
+                self.func(*self.args)
+            except Exception:  # pylint: disable=broad-except
+                logger.exception('engine %s: unhandled exception in worker', self.engine_name)
+        finally:
+            with self._lock:
+                if self._thread is not None:
+                    self._thread._timeout = False
+                    self._thread = None
+                self._done.set()
+
+    def cancel(self) -> bool:
+        """Mark the task as timed out.  Returns ``False`` if the task was
+        already done (no timeout), a task that has been skipped because the
+        deadline was reached is timed out."""
+        # pylint: disable=protected-access
+        with self._lock:
+            if self._done.is_set():
+                return self.timeout
+            self.timeout = True
+            if self._thread is not None:
+                self._thread._timeout = True
+            return True
+
+
+class EngineWorkerPool:
+    """A bounded pool of worker threads processing :py:obj:`EngineTask`
+    objects."""
+
+    def __init__(self, max_workers: int, max_queue: int = 0):
+        if max_workers <= 0:
+            raise ValueError("max_workers must be greater than 0")
+        self.max_workers = max_workers
+        self.max_queue = max_queue
+        self._queue: queue.Queue[EngineTask | None] = queue.Queue(max_queue)
+        self._workers: list[threading.Thread] = []
+        self._idle_semaphore = threading.Semaphore(0)
+        self._lock = threading.Lock()
+
+    @property
+    def queue_depth(self) -> int:
+        """Number of tasks waiting for a free worker."""
+        return self._queue.qsize()
+
+    @property
+    def worker_count(self) -> int:
+        """Number of worker threads started."""
+        return len(self._workers)
+
+    def submit(self, task: EngineTask) -> bool:
+        """Put ``task`` into the queue.  Returns ``False`` if the queue is full
+        and the task has been rejected."""
+
+        histogram_observe(self._queue.qsize(), 'search', 'workers', 'queue')
+        try:
+            self._queue.put_nowait(task)
+        except queue.Full:
+            counter_inc('search', 'workers', 'rejected')
+            return False
+        self._adjust_workers()
+        return True
+
+    def _adjust_workers(self):
+        # if there is an idle worker, there is no need to start a new one
+        if self._idle_semaphore.acquire(timeout=0):
+            return
+        with self._lock:
+            if len(self._workers) < self.max_workers:
+                th = threading.Thread(  # pylint: disable=invalid-name
+                    target=self._worker,
+                    name=f'engine_worker_{len(self._workers)}',
+                    daemon=True,
+                )
+                th.start()
+                self._workers.append(th)
+
+    def _worker(self):
+        while True:
+            task = self._queue.get()
+            if task is None:
+                return
+            task.run()
+            self._idle_semaphore.release()
+
+    def shutdown(self):
+        """Stop all worker threads once the queued tasks are processed."""
+        with self._lock:
+            for _ in self._workers:
+                self._queue.put(None)
+            self._workers = []
+
+
+def initialize(max_workers: int, max_queue: int = 0):
+    """Initialize the worker pool of this process (:py:obj:`WORKERS`).  If
+    ``max_workers`` is ``0``, the pool is disabled."""
+
+    global WORKERS  # pylint: disable=global-statement
+
+    if WORKERS is not None:
+        WORKERS.shutdown()
+        WORKERS = None
+    if max_workers > 0:
+        WORKERS = EngineWorkerPool(max_workers, max_queue)
+        logger.debug("engine worker pool: max_workers=%s, max_queue=%s", max_workers, max_queue)
@@ -16,7 +16,9 @@ from .sxng_locales import sxng_locales
 searx_dir = abspath(dirname(__file__))
 
 logger = logging.getLogger('searx')
-OUTPUT_FORMATS = ['html', 'csv', 'json', 'rss']
+OUTPUT_FORMATS = ['html', 'csv', 'json', 'rss', 'stream']
+# the 'stream' format is opt-in (search.formats)
+DEFAULT_OUTPUT_FORMATS = ['html', 'csv', 'json', 'rss']
 SXNG_LOCALE_TAGS = ['all', 'auto'] + list(l[0] for l in sxng_locales)
 SIMPLE_STYLE = ('auto', 'light', 'dark', 'black')
 CATEGORIES_AS_TABS = {
@@ -144,6 +146,11 @@ SCHEMA = {
         'donation_url': SettingsValue((bool, str), "https://docs.searxng.org/donate.html"),
         'enable_metrics': SettingsValue(bool, True),
         'open_metrics': SettingsValue(str, ''),
+        'metrics_aggregation': {
+            'valkey': SettingsValue(bool, False),
+            'flush_interval': SettingsValue((int, float), 10),
+            'ttl': SettingsValue(int, 60 * 60 * 24 * 7),
+        },
     },
     'brand': {
         'issue_url': SettingsValue(str, 'https://github.com/searxng/searxng/issues'),
@@ -162,6 +169,17 @@ SCHEMA = {
         'languages': SettingSublistValue(SXNG_LOCALE_TAGS, SXNG_LOCALE_TAGS),
         'ban_time_on_fail': SettingsValue(numbers.Real, 5),
         'max_ban_time_on_fail': SettingsValue(numbers.Real, 120),
+        'circuit_breaker': {
+            'window': SettingsValue(int, 60),
+            'min_requests': SettingsValue(int, 5),
+            'error_rate': SettingsValue(numbers.Real, 0.5),
+            'slow_time': SettingsValue((None, numbers.Real), None),
+            'slow_rate': SettingsValue(numbers.Real, 0.5),
+            'half_open_ratio': SettingsValue(numbers.Real, 0.1),
+            'half_open_successes': SettingsValue(int, 3),
+            'valkey': SettingsValue(bool, False),
+            'valkey_cache_ttl': SettingsValue(numbers.Real, 1.0),
+        },
         'suspended_times': {
             'SearxEngineAccessDenied': SettingsValue(numbers.Real, 86400),
             'SearxEngineCaptcha': SettingsValue(numbers.Real, 86400),
@@ -170,8 +188,28 @@ SCHEMA = {
             'cf_SearxEngineAccessDenied': SettingsValue(numbers.Real, 86400),
             'recaptcha_SearxEngineCaptcha': SettingsValue(numbers.Real, 604800),
         },
-        'formats': SettingsValue(list, OUTPUT_FORMATS),
+        'formats': SettingsValue(list, DEFAULT_OUTPUT_FORMATS),
         'max_page': SettingsValue(int, 0),
+        'engine_workers': {
+            'max_workers': SettingsValue(int, 64),
+            'max_queue': SettingsValue(int, 512),
+            'asyncio': SettingsValue(bool, False),
+        },
+        'result_cache': {
+            'enabled': SettingsValue(bool, False),
+            'ttl': SettingsValue(int, 300),
+            'stale_ttl': SettingsValue(int, 600),
+            'category_ttl': SettingsValue(dict, {}),
+        },
+        'adaptive_timeout': {
+            'enabled': SettingsValue(bool, False),
+            'percentile': SettingsValue(numbers.Real, 95),
+            'factor': SettingsValue(numbers.Real, 1.2),
+            'min_timeout': SettingsValue(numbers.Real, 0.5),
+            'max_timeout': SettingsValue((None, numbers.Real), None),
+            'min_samples': SettingsValue(int, 20),
+            'good_enough': SettingsValue(numbers.Real, 0),
+        },
     },
     'server': {
         'port': SettingsValue((int, str), 8888, 'SEARXNG_PORT'),
@@ -181,6 +219,22 @@ SCHEMA = {
         'secret_key': SettingsValue(str, environ_name='SEARXNG_SECRET'),
         'base_url': SettingsValue((False, str), False, 'SEARXNG_BASE_URL'),
         'image_proxy': SettingsValue(bool, False, 'SEARXNG_IMAGE_PROXY'),
+        'image_proxy_cache': {
+            'enabled': SettingsValue(bool, False),
+            'path': SettingsValue(str, ''),
+            'max_bytes': SettingsValue(int, 256 * 1024 * 1024),
+            'eviction': SettingsValue(('lru', 'lfu'), 'lru'),
+            'hold_time': SettingsValue(int, 60 * 60 * 24 * 7),
+            'maintenance_period': SettingsValue(int, 60 * 60),
+        },
+        'image_proxy_thumbnails': {
+            'enabled': SettingsValue(bool, False),
+            'width': SettingsValue(int, 640),
+            'format': SettingsValue(('webp', 'avif', 'jpeg'), 'webp'),
+            'quality': SettingsValue(int, 75),
+            'workers': SettingsValue(int, 2),
+            'timeout': SettingsValue(numbers.Real, 5.0),
+        },
         'http_protocol_version': SettingsValue(('1.0', '1.1'), '1.0'),
         'method': SettingsValue(('POST', 'GET'), 'POST', 'SEARXNG_METHOD'),
         'default_http_headers': SettingsValue(dict, {}),
@@ -222,10 +276,20 @@ SCHEMA = {
         'pool_connections': SettingsValue(int, 100),
         'pool_maxsize': SettingsValue(int, 10),
         'keepalive_expiry': SettingsValue(numbers.Real, 5.0),
+        'warmup_connections': SettingsValue(int, 1),
+        'keepalive_ping': SettingsValue((None, numbers.Real), None),
+        'max_concurrent_requests': SettingsValue((None, int), None),
+        'dns_cache': {
+            'enabled': SettingsValue(bool, False),
+            'ttl': SettingsValue(numbers.Real, 60),
+            'negative_ttl': SettingsValue(numbers.Real, 5),
+            'prefetch': SettingsValue(numbers.Real, 10),
+        },
         # default maximum redirect
         # from https://github.com/psf/requests/blob/8c211a96cdbe9fe320d63d9e1ae15c5c07e179f8/requests/models.py#L55
         'max_redirects': SettingsValue(int, 30),
         'retries': SettingsValue(int, 0),
+        'hedge_delay': SettingsValue((None, numbers.Real), None),
         'proxies': SettingsValue((None, str, dict), None),
         'source_ips': SettingsValue((None, str, list), None),
         # Tor configuration
@@ -7,6 +7,12 @@
 :py:obj:`SQLiteProperties`:
   Class to manage properties stored in a database.
 
+:py:obj:`ConnectionPool`:
+  Pool of the DB connections of a DB file.
+
+:py:obj:`MaintenanceScheduler`:
+  Runs the maintenance of the SQLite applications in a background thread.
+
 Examplarical implementations based on :py:obj:`SQLiteAppl`:
 
 :py:obj:`searx.cache.ExpireCacheSQLite` :
@@ -22,12 +28,18 @@ Examplarical implementations based on :py:obj:`SQLiteAppl`:
 from __future__ import annotations
 
 import abc
+import collections
+import contextlib
 import datetime
+import fcntl
+import os
 import re
 import sqlite3
 import sys
 import threading
+import time
 import uuid
+from timeit import default_timer
 
 from searx import logger
 
@@ -35,6 +47,95 @@ logger = logger.getChild("sqlitedb")
 
 THREAD_LOCAL = threading.local()
 
+POOLS: dict[SQLiteAppl, ConnectionPool] = {}
+"""The connection pools by application (:py:obj:`SQLiteAppl`)."""
+_POOLS_LOCK = threading.Lock()
+
+
+@contextlib.contextmanager
+def transaction(conn: sqlite3.Connection, mode: str = "IMMEDIATE"):
+    """Context manager for an explicit transaction.  The connections of a
+    :py:obj:`SQLiteAppl` are in *autocommit* mode (``isolation_level=None``),
+    without a transaction each statement (e.g. each row of an ``executemany``)
+    is committed on its own.
+
+    .. code:: python
+
+       with transaction(conn):
+           conn.executemany("INSERT INTO foo (key, value) VALUES (?, ?)", rows)
+    """
+    conn.execute(f"BEGIN {mode}")
+    try:
+        yield conn
+    except BaseException:
+        conn.execute("ROLLBACK")
+        raise
+    conn.execute("COMMIT")
+
+
+class ConnectionPool:
+    """Pool of the DB connections of an application.  The connection of a
+    :py:obj:`DBSession` is taken from the pool and given back when the thread
+    ends, a new thread (e.g. the thread of an engine request) reuses the
+    connection (and its cached statements) instead of opening the DB again.
+
+    Each application has its own pool (also when applications share a DB file,
+    e.g. the :py:obj:`SQLiteProperties` of an application), the connections
+    are set up by the application (PRAGMAs, cached statements, ..).  A DB in
+    memory (``:memory:``) is private to its connection, such connections are
+    not pooled.
+
+    The pool is bounded by :py:obj:`SQLiteAppl.SQLITE_POOL_SIZE`: a thread
+    never waits for a connection, but no more than ``SQLITE_POOL_SIZE`` idle
+    connections are kept open.
+    """
+
+    def __init__(self, app: SQLiteAppl):
+        self.app = app
+        self.size = app.SQLITE_POOL_SIZE
+        self._idle: collections.deque[sqlite3.Connection] = collections.deque()
+
+    @classmethod
+    def get(cls, app: SQLiteAppl) -> ConnectionPool:
+        """Returns the pool of ``app``."""
+        pool = POOLS.get(app)
+        if pool is None:
+            with _POOLS_LOCK:
+                pool = POOLS.setdefault(app, cls(app))
+        return pool
+
+    def acquire(self) -> sqlite3.Connection:
+        try:
+            return self._idle.pop()
+        except IndexError:
+            return self.app.pool_connect()
+
+    def release(self, conn: sqlite3.Connection):
+        # HINT: is called from DBSession.__del__, no logging and no locks here
+        try:
+            if conn.in_transaction:
+                conn.rollback()
+            if len(self._idle) < self.size:
+                self._idle.append(conn)
+                return
+            conn.close()
+        except Exception:  # pylint: disable=broad-exception-caught
+            pass
+
+
+# the connections of the parent process are not used in a forked process (and
+# not closed)
+_FORK_LEFTOVERS: list = []
+
+
+def _after_fork():
+    _FORK_LEFTOVERS.append((dict(POOLS), getattr(THREAD_LOCAL, "DBSession_map", None)))
+    POOLS.clear()
+    THREAD_LOCAL.DBSession_map = {}
+
+
+os.register_at_fork(after_in_child=_after_fork)
+
 
 class DBSession:
     """A *thead-local* DB session"""
@@ -47,7 +148,7 @@ class DBSession:
         if getattr(THREAD_LOCAL, "DBSession_map", None) is None:
             THREAD_LOCAL.DBSession_map = {}
 
-        session = THREAD_LOCAL.DBSession_map.get(app.db_url)
+        session = THREAD_LOCAL.DBSession_map.get(app)
         if session is None:
             session = cls(app)
         return session.conn
@@ -55,18 +156,22 @@ class DBSession:
     def __init__(self, app: SQLiteAppl):
         self.uuid = uuid.uuid4()
         self.app = app
+        self.pool = None if app.db_url == ":memory:" else ConnectionPool.get(app)
         self._conn = None
         # self.__del__ will be called, when thread ends
         if getattr(THREAD_LOCAL, "DBSession_map", None) is None:
             THREAD_LOCAL.DBSession_map = {}
-        THREAD_LOCAL.DBSession_map[self.app.db_url] = self
+        THREAD_LOCAL.DBSession_map[self.app] = self
 
     @property
     def conn(self) -> sqlite3.Connection:
         msg = f"[{threading.current_thread().ident}] DBSession: " f"{self.app.__class__.__name__}({self.app.db_url})"
-        if self._conn is None:
+        if self._conn is None and self.pool is None:
             self._conn = self.app.connect()
             logger.debug("%s --> created new connection", msg)
+        elif self._conn is None:
+            self._conn = self.pool.acquire()
+            logger.debug("%s --> connection from pool", msg)
         # else:
         #     logger.debug("%s --> already connected", msg)
 
@@ -81,7 +186,10 @@ class DBSession:
                 # needs, do not exist anymore.
                 # msg = f"DBSession: close [{self.uuid}] {self.app.__class__.__name__}({self.app.db_url})"
                 # logger.debug(msg)
-                self._conn.close()
+                if self.pool is None:
+                    self._conn.close()
+                else:
+                    self.pool.release(self._conn)
         except Exception:  # pylint: disable=broad-exception-caught
             pass
 
@@ -119,6 +227,54 @@ class SQLiteAppl(abc.ABC):
 
     .. _WAL: https://sqlite.org/wal.html
     """
+    SQLITE_AUTO_VACUUM = "INCREMENTAL"
+    """The pages of deleted rows are freed by :py:obj:`SQLiteAppl.vacuum`
+    (``PRAGMA incremental_vacuum``), a full ``VACUUM`` of the DB is not needed.
+
+    The auto-vacuum mode can only be set before the first table is created, in a
+    DB that has been created without, :py:obj:`SQLiteAppl.vacuum` only truncates
+    the WAL (a one-time ``VACUUM`` of the DB switches the mode).
+    """
+
+    SQLITE_PRAGMAS: dict[str, str | int] = {
+        "synchronous": "NORMAL",
+        "cache_size": -2000,
+        "mmap_size": 0,
+    }
+    """PRAGMAs_ set on each connection of the application, e.g.:
+
+    ``synchronous``:
+      In WAL mode, ``NORMAL`` does not sync the WAL on each commit, the DB
+      stays consistent, but a power loss may undo the last transactions (all
+      applications are caches).
+
+    ``cache_size``:
+      Size of the page cache of a connection (negative value: in KiB).
+
+    ``mmap_size``:
+      Maximum number of bytes of the DB file read by memory-mapped I/O (``0``
+      disables memory-mapped I/O).
+
+    .. _PRAGMAs: https://sqlite.org/pragma.html
+    """
+
+    SQLITE_POOL_SIZE = 8
+    """Maximum number of idle connections kept open (:py:obj:`ConnectionPool`)."""
+
+    SQLITE_CACHED_STATEMENTS = 32
+    """Size of the statement cache of the connections from the
+    :py:obj:`ConnectionPool` (see ``cached_statements`` in
+    :py:obj:`SQLITE_CONNECT_ARGS`).  The cache should hold the statements of
+    the application, statements are cached by their SQL string."""
+
+    MAINTENANCE_BATCH_SIZE = 1000
+    """Maximum number of rows deleted in one transaction
+    (:py:obj:`SQLiteAppl.delete_batched`).  A bounded transaction holds the write
+    lock of the DB only for a short time."""
+
+    INCREMENTAL_VACUUM_PAGES = 1000
+    """Maximum number of pages freed in one transaction (:py:obj:`SQLiteAppl.vacuum`)."""
+
     SQLITE_CONNECT_ARGS = {
         # "timeout": 5.0,
         # "detect_types": 0,
@@ -146,7 +302,9 @@ class SQLiteAppl(abc.ABC):
       - https://github.com/python/cpython/issues/123873
 
       The workaround for SQLite3 multithreading cache inconsistency is to set
-      option ``cached_statements`` to ``0`` by default.
+      option ``cached_statements`` to ``0`` by default.  A connection of the
+      :py:obj:`ConnectionPool` is used by one thread at a time, its statement
+      cache is enabled (:py:obj:`SQLITE_CACHED_STATEMENTS`).
     """
 
     def __init__(self, db_url):
@@ -185,9 +343,13 @@ class SQLiteAppl(abc.ABC):
                 "SQLite runtime library version %s is not supported (require >= 3.35)", sqlite3.sqlite_version
             )
 
-    def _connect(self) -> sqlite3.Connection:
-        conn = sqlite3.Connection(self.db_url, **self.SQLITE_CONNECT_ARGS)  # type: ignore
+    def _connect(self, **kwargs) -> sqlite3.Connection:
+        conn = sqlite3.Connection(self.db_url, **{**self.SQLITE_CONNECT_ARGS, **kwargs})  # type: ignore
+        # has no effect once a table exists in the DB
+        conn.execute(f"PRAGMA auto_vacuum={self.SQLITE_AUTO_VACUUM}")
         conn.execute(f"PRAGMA journal_mode={self.SQLITE_JOURNAL_MODE}")
+        for name, value in self.SQLITE_PRAGMAS.items():
+            conn.execute(f"PRAGMA {name}={value}")
         self.register_functions(conn)
         return conn
 
@@ -195,8 +357,8 @@ class SQLiteAppl(abc.ABC):
         """Creates a new DB connection (:py:obj:`SQLITE_CONNECT_ARGS`).  If not
         already done, the DB schema is set up.  The caller must take care of
         closing the resource.  Alternatively, :py:obj:`SQLiteAppl.DB` can also
-        be used (the resource behind `self.DB` is automatically closed when the
-        process or thread is terminated).
+        be used (the resource behind `self.DB` is given back to the
+        :py:obj:`ConnectionPool` when the thread is terminated).
         """
         if sys.version_info < (3, 12):
             # Prior Python 3.12 there is no "autocommit" option
@@ -212,6 +374,14 @@ class SQLiteAppl(abc.ABC):
             self.init(conn)
         return conn
 
+    def pool_connect(self) -> sqlite3.Connection:
+        """Creates a new DB connection for the :py:obj:`ConnectionPool`, the
+        connection is used by one thread at a time (but not always by the same
+        thread)."""
+        with self._connect(check_same_thread=False, cached_statements=self.SQLITE_CACHED_STATEMENTS) as conn:
+            self.init(conn)
+        return conn
+
     def register_functions(self, conn):
         """Create user-defined_ SQL functions.
 
@@ -236,6 +406,37 @@ class SQLiteAppl(abc.ABC):
 
         conn.create_function("regexp", 2, lambda x, y: 1 if re.search(x, y) else 0, deterministic=True)
 
+    def delete_batched(self, conn: sqlite3.Connection, table: str, sql_rowids: str, params=()) -> int:
+        """Deletes the rows of ``table`` selected by the query ``sql_rowids``
+        (``SELECT rowid FROM ..``) in batches of
+        :py:obj:`MAINTENANCE_BATCH_SIZE` rows, each batch in its own
+        transaction.  Returns the number of deleted rows."""
+
+        sql = f"DELETE FROM {table} WHERE rowid IN ({sql_rowids} LIMIT {self.MAINTENANCE_BATCH_SIZE})"
+        count = 0
+        while True:
+            res = conn.execute(sql, params)
+            count += res.rowcount
+            if res.rowcount < self.MAINTENANCE_BATCH_SIZE:
+                return count
+
+    def vacuum(self, conn: sqlite3.Connection):
+        """Frees the unused pages of the DB in batches of
+        :py:obj:`INCREMENTAL_VACUUM_PAGES` pages (see
+        :py:obj:`SQLITE_AUTO_VACUUM`) and truncates the WAL.
+
+        - https://sqlite.org/pragma.html#pragma_incremental_vacuum
+        - https://www.theunterminatedstring.com/sqlite-vacuuming/
+        """
+        if conn.execute("PRAGMA auto_vacuum").fetchone()[0] == 2:  # 2: INCREMENTAL
+            free = conn.execute("PRAGMA freelist_count").fetchone()[0]
+            while free:
+                conn.execute(f"PRAGMA incremental_vacuum({self.INCREMENTAL_VACUUM_PAGES})").fetchall()
+                last, free = free, conn.execute("PRAGMA freelist_count").fetchone()[0]
+                if free >= last:
+                    break
+        conn.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+
     @property
     def DB(self) -> sqlite3.Connection:
         """Provides a DB connection.  The connection is a *singleton* and
@@ -424,3 +625,126 @@ CREATE TABLE IF NOT EXISTS properties (
             m_time = datetime.datetime.fromtimestamp(m_time).strftime("%Y-%m-%d %H:%M:%S")
             lines.append(f"[last modified: {m_time}] {name:20s}: {value}")
         return "\n".join(lines)
+
+
+class MaintenanceScheduler:
+    """Runs the maintenance of the SQLite applications
+    (:py:obj:`SQLiteAppl`) in a background thread, the requests no longer wait
+    for a maintenance cycle.  A registered application implements
+    ``maintenance(force)`` and the property ``next_maintenance_time``.
+
+    - The maintenance of a DB file is run by one of the processes that use the
+      DB: the process that holds the lock on the file ``<db_url>.maintenance.lock``
+      (:py:obj:`fcntl.flock`).  The election is held for each registered
+      application, a process that has not (yet) created a cache does not block
+      its maintenance.  When the process terminates, the lock is taken over by
+      another process that uses the DB.
+    - Every :py:obj:`INTERVAL` seconds, the applications whose
+      ``next_maintenance_time`` has been reached are maintained.
+    - The time of each maintenance is logged and recorded in the metrics
+      (``sqlite.maintenance.time``).
+    """
+
+    INTERVAL = 30
+    """Interval (in sec.) in which the maintenance times are checked."""
+
+    LOCK_SUFFIX = ".maintenance.lock"
+    """Suffix of the lock file of a DB file (:py:obj:`SQLiteAppl.db_url`)."""
+
+    def __init__(self):
+        self.appls: list[SQLiteAppl] = []
+        self._lock = threading.Lock()
+        self._lock_fds: dict[str, int] = {}
+        self._thread: threading.Thread | None = None
+        self._stop = threading.Event()
+
+    def register(self, appl: SQLiteAppl):
+        """Adds ``appl`` to the maintained applications and starts the
+        background thread (if not already running)."""
+        with self._lock:
+            if appl not in self.appls:
+                self.appls.append(appl)
+            if self._thread is None or not self._thread.is_alive():
+                self._stop.clear()
+                self._thread = threading.Thread(target=self._run, name="sqlite_maintenance", daemon=True)
+                self._thread.start()
+
+    def lock_file(self, appl: SQLiteAppl) -> str | None:
+        """Returns the name of the lock file of the DB of ``appl`` (``None``
+        for a DB in memory, the DB is private to this process)."""
+        if appl.db_url == ":memory:":
+            return None
+        return appl.db_url + self.LOCK_SUFFIX
+
+    def elected(self, appl: SQLiteAppl) -> bool:
+        """``True`` if this process holds the lock of the DB of ``appl`` (the
+        lock is taken if it is free)."""
+        lock_file = self.lock_file(appl)
+        if lock_file is None or lock_file in self._lock_fds:
+            return True
+        try:
+            fd = os.open(lock_file, os.O_RDWR | os.O_CREAT, 0o600)
+        except OSError as e:
+            # e.g. the lock file is owned by another user
+            logger.debug("can't open lock file %s: %s", lock_file, e)
+            return False
+        try:
+            fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except OSError:
+            os.close(fd)
+            return False
+        self._lock_fds[lock_file] = fd
+        logger.debug("process %s runs the maintenance of %s", os.getpid(), appl.db_url)
+        return True
+
+    def run_pending(self, force: bool = False):
+        """Runs the maintenance of the applications whose maintenance time has
+        been reached (``force``: of all applications) and whose DB is
+        maintained by this process."""
+        for appl in list(self.appls):
+            if not self.elected(appl):
+                continue
+            if not force and int(time.time()) < appl.next_maintenance_time:  # type: ignore
+                continue
+            start = default_timer()
+            try:
+                appl.maintenance(force=True)  # type: ignore
+            except Exception:  # pylint: disable=broad-except
+                logger.exception("maintenance of %s failed", appl.db_url)
+                continue
+            duration = default_timer() - start
+            logger.info("maintenance of %s (%s): %.3f sec", appl.__class__.__name__, appl.db_url, duration)
+            _observe_maintenance(duration)
+
+    def _run(self):
+        while not self._stop.wait(self.INTERVAL):
+            try:
+                self.run_pending()
+            except Exception:  # pylint: disable=broad-except
+                logger.exception("error in the maintenance thread")
+
+    def _after_fork(self):
+        # the thread is not running in the forked process, the locks (if any)
+        # are held by the parent process
+        for fd in self._lock_fds.values():
+            os.close(fd)
+        self._lock_fds = {}
+        self._lock = threading.Lock()
+        self._thread = None
+        if self.appls:
+            self.register(self.appls[0])
+
+
+def _observe_maintenance(duration: float):
+    from searx import metrics  # pylint: disable=import-outside-toplevel, cyclic-import
+
+    if metrics.histogram_storage is None:
+        return
+    metrics.histogram_observe(duration, 'sqlite', 'maintenance', 'time')
+    metrics.counter_inc('sqlite', 'maintenance', 'count')
+
+
+MAINTENANCE = MaintenanceScheduler()
+"""The scheduler of the maintenance of the SQLite applications."""
+
+os.register_at_fork(after_in_child=MAINTENANCE._after_fork)  # pylint: disable=protected-access
@@ -8,6 +8,9 @@ import json
 import os
 import sys
 import base64
+import hashlib
+import queue
+import threading
 
 from timeit import default_timer
 from html import escape
@@ -36,6 +39,7 @@ from flask import (
     url_for,
     make_response,
     redirect,
+    send_file,
     send_from_directory,
 )
 from flask.wrappers import Response
@@ -99,7 +103,15 @@ import searx.answerers
 import searx.plugins
 
 
-from searx.metrics import get_engines_stats, get_engine_errors, get_reliabilities, histogram, counter, openmetrics
+from searx.metrics import (
+    get_engines_stats,
+    get_engine_errors,
+    get_reliabilities,
+    histogram,
+    counter,
+    openmetrics,
+    cluster_wide,
+)
 from searx.flaskfix import patch_application
 
 from searx.locales import (
@@ -114,6 +126,8 @@ from searx.locales import (
 # renaming names from searx imports ...
 from searx.autocomplete import search_autocomplete, backends as autocomplete_backends
 from searx import favicons
+from searx import image_cache
+from searx import image_transcode
 
 from searx.valkeydb import initialize as valkey_initialize
 from searx.sxng_locales import sxng_locales
@@ -312,7 +326,7 @@ def custom_url_for(endpoint: str, **values):
     return url_for(endpoint, **values)
 
 
-def image_proxify(url: str):
+def image_proxify(url: str, thumbnail: bool = False):
     if not url:
         return url
 
@@ -333,9 +347,14 @@ def image_proxify(url: str):
             return url
         return None
 
-    h = new_hmac(settings['server']['secret_key'], url.encode())
+    # the width of a thumbnail is covered by the HMAC
+    width = image_transcode.thumbnail_width() if thumbnail else None
+    if width is None:
+        h = new_hmac(settings['server']['secret_key'], url.encode())
+        return '{0}?{1}'.format(url_for('image_proxy'), urlencode(dict(url=url.encode(), h=h)))
 
-    return '{0}?{1}'.format(url_for('image_proxy'), urlencode(dict(url=url.encode(), h=h)))
+    h = new_hmac(settings['server']['secret_key'], f'{url}|w={width}'.encode())
+    return '{0}?{1}'.format(url_for('image_proxy'), urlencode(dict(url=url.encode(), h=h, w=width)))
 
 
 def get_translations():
@@ -631,7 +650,8 @@ def rss_xsl():
 def search():
     """Search query in q and return results.
 
-    Supported outputs: html, json, csv, rss.
+    Supported outputs: html, json, csv, rss, stream (see
+    :py:obj:`stream_search_response`).
     """
     # pylint: disable=too-many-locals, too-many-return-statements, too-many-branches
     # pylint: disable=too-many-statements
@@ -664,6 +684,8 @@ def search():
             sxng_request.preferences, sxng_request.form
         )
         search_obj = searx.search.SearchWithPlugins(search_query, sxng_request, sxng_request.user_plugins)
+        if output_format == 'stream':
+            return stream_search_response(search_query, search_obj)
         result_container = search_obj.search()
 
     except SearxParameterException as e:
@@ -796,6 +818,63 @@ def search():
     )
 
 
+_STREAM_END = object()
+
+
+def stream_search_response(search_query, search_obj: searx.search.SearchWithPlugins) -> Response:
+    """Stream the results of a query as NDJSON (``application/x-ndjson``), one
+    JSON object per line:
+
+    - ``{"type": "results", "engine": .., "results": [..]}`` is sent each time
+      an engine has added its results, ``results`` contains the results that
+      have not been sent before.
+    - ``{"type": "final", ..}`` is the last frame, it contains the merged and
+      ordered results (the same fields as the ``json`` format).
+    - ``{"type": "error", "error": ..}`` is the last frame if the search fails.
+
+    The search is run in a thread, the time to the first results is the response
+    time of the fastest engine.
+    """
+    events: queue.SimpleQueue = queue.SimpleQueue()
+    result_container = search_obj.result_container
+    result_container.on_extend = events.put
+
+    @flask.copy_current_request_context
+    def _search():
+        try:
+            search_obj.search()
+            events.put(_STREAM_END)
+        except Exception as e:  # pylint: disable=broad-except
+            logger.exception(e, exc_info=True)
+            events.put(e)
+
+    threading.Thread(target=_search, name='search_stream', daemon=True).start()
+
+    def _frames():
+        seen: set[int] = set()
+        while True:
+            event = events.get()
+            if event is _STREAM_END:
+                break
+            if isinstance(event, Exception):
+                yield webutils.get_stream_frame({'type': 'error', 'error': gettext('search error')})
+                return
+            results = result_container.get_new_results(seen)
+            if results:
+                yield webutils.get_stream_frame({'type': 'results', 'engine': event, 'results': results})
+
+        data = webutils.get_json_data(search_query, result_container)
+        if result_container.redirect_url:
+            data['redirect_url'] = result_container.redirect_url
+        yield webutils.get_stream_frame({'type': 'final', **data})
+
+    return Response(
+        flask.stream_with_context(_frames()),
+        mimetype='application/x-ndjson',
+        headers={'Cache-Control': 'no-store', 'X-Accel-Buffering': 'no'},
+    )
+
+
 @app.route('/about', methods=['GET'])
 def about():
     """Redirect to about page"""
@@ -1037,10 +1116,26 @@ def image_proxy():
     if not url:
         return '', 400
 
-    if not is_hmac_of(settings['server']['secret_key'], url.encode(), sxng_request.args.get('h', '')):
+    h = sxng_request.args.get('h', '')
+    width = sxng_request.args.get('w', '')
+    msg = f'{url}|w={width}' if width else url
+    if not is_hmac_of(settings['server']['secret_key'], msg.encode(), h) or (width and not width.isdigit()):
         return '', 400
 
-    maximum_size = 5 * 1024 * 1024
+    if image_cache.CACHE is not None:
+        cached = image_cache.CACHE.get(h)
+        if cached is not None:
+            # conditional: handles If-None-Match, If-Modified-Since & Range
+            return send_file(
+                cached.path,
+                mimetype=cached.mime,
+                etag=cached.sha256,
+                last_modified=cached.c_time,
+                conditional=True,
+                max_age=60 * 60 * 24,
+            )
+
+    maximum_size = image_cache.MAX_OBJECT_BYTES
     forward_resp = False
     resp = None
     try:
@@ -1082,6 +1177,9 @@ def image_proxy():
             except httpx.HTTPError:
                 logger.exception('HTTP error on closing')
 
+    if width and image_transcode.is_active() and resp.headers.get('Content-Encoding', 'identity') == 'identity':
+        return _transcoded_image_response(h, int(width), resp, stream)
+
     def close_stream():
         nonlocal resp, stream
         try:
@@ -1094,6 +1192,8 @@ def image_proxy():
 
     try:
         headers = dict_subset(resp.headers, {'Content-Type', 'Content-Encoding', 'Content-Length', 'Length'})
+        if image_cache.CACHE is not None and resp.headers.get('Content-Encoding', 'identity') == 'identity':
+            stream = _cache_image_stream(h, resp.headers['Content-Type'], stream)
         response = Response(stream, mimetype=resp.headers['Content-Type'], headers=headers, direct_passthrough=True)
         response.call_on_close(close_stream)
         return response
@@ -1102,6 +1202,57 @@ def image_proxy():
         return '', 400
 
 
+def _transcoded_image_response(key: str, width: int, resp, stream):
+    """Reads the image from ``stream`` and downscales it to ``width`` (see
+    :py:obj:`searx.image_transcode`).  The original image is sent (and not
+    cached) if it can't be transcoded."""
+    chunks = []
+    size = 0
+    try:
+        for chunk in stream:
+            size += len(chunk)
+            if size > image_cache.MAX_OBJECT_BYTES:
+                return 'Max size', 400
+            chunks.append(chunk)
+    except httpx.HTTPError:
+        logger.exception('HTTP error')
+        return '', 400
+    finally:
+        stream.close()
+        resp.close()
+
+    data = b''.join(chunks)
+    mime = resp.headers['Content-Type']
+    result = image_transcode.transcode(data, width, mime)
+    if result is not None:
+        data, mime = result
+        if image_cache.CACHE is not None:
+            image_cache.CACHE.set(key, mime, data)
+
+    response = Response(data, mimetype=mime)
+    response.set_etag(hashlib.sha256(data).hexdigest())
+    return response.make_conditional(sxng_request)
+
+
+def _cache_image_stream(key: str, mime: str, stream):
+    """Forwards the chunks of ``stream`` and stores the image in the
+    :py:obj:`searx.image_cache` once the stream has been sent completely."""
+    chunks = []
+    size = 0
+    try:
+        for chunk in stream:
+            size += len(chunk)
+            if size > image_cache.MAX_OBJECT_BYTES:
+                chunks = None
+            if chunks is not None:
+                chunks.append(chunk)
+            yield chunk
+    finally:
+        stream.close()
+    if chunks is not None:
+        image_cache.CACHE.set(key, mime, b''.join(chunks))  # type: ignore
+
+
 @app.route('/engine_descriptions.json', methods=['GET'])
 def engine_descriptions():
     sxng_ui_lang_tag = get_locale().replace("_", "-")
@@ -1146,8 +1297,9 @@ def stats():
         checker_results['engines'] if checker_results['status'] == 'ok' and 'engines' in checker_results else {}
     )
 
-    engine_stats = get_engines_stats(filtered_engines)
-    engine_reliabilities = get_reliabilities(filtered_engines, checker_results)
+    with cluster_wide():
+        engine_stats = get_engines_stats(filtered_engines)
+        engine_reliabilities = get_reliabilities(filtered_engines, checker_results)
 
     if sort_order not in STATS_SORT_PARAMETERS:
         sort_order = 'name'
@@ -1198,7 +1350,8 @@ def stats():
 @app.route('/stats/errors', methods=['GET'])
 def stats_errors():
     filtered_engines = dict(filter(lambda kv: sxng_request.preferences.validate_token(kv[1]), engines.items()))
-    result = get_engine_errors(filtered_engines)
+    with cluster_wide():
+        result = get_engine_errors(filtered_engines)
     return jsonify(result)
 
 
@@ -1225,8 +1378,9 @@ def stats_open_metrics():
         checker_results['engines'] if checker_results['status'] == 'ok' and 'engines' in checker_results else {}
     )
 
-    engine_stats = get_engines_stats(filtered_engines)
-    engine_reliabilities = get_reliabilities(filtered_engines, checker_results)
+    with cluster_wide():
+        engine_stats = get_engines_stats(filtered_engines)
+        engine_reliabilities = get_reliabilities(filtered_engines, checker_results)
     metrics_text = openmetrics(engine_stats, engine_reliabilities)
 
     return Response(metrics_text, mimetype='text/plain')
@@ -1406,6 +1560,8 @@ def init():
 
     limiter.initialize(app, settings)
     favicons.init()
+    image_cache.initialize(settings['server']['image_proxy_cache'])
+    image_transcode.initialize(settings['server']['image_proxy_thumbnails'])
 
 
 def static_headers(headers: Headers, _path: str, _url: str) -> None:
@@ -157,9 +157,10 @@ class JSONEncoder(json.JSONEncoder):  # pylint: disable=missing-class-docstring
         return super().default(o)
 
 
-def get_json_response(sq: SearchQuery, rc: ResultContainer) -> str:
-    """Returns the JSON string of the results to a query (``application/json``)"""
-    data = {
+def get_json_data(sq: SearchQuery, rc: ResultContainer) -> dict:
+    """Returns the data of the JSON response to a query (see
+    :py:obj:`get_json_response`)."""
+    return {
         'query': sq.query,
         'number_of_results': rc.number_of_results,
         'results': [_.as_dict() for _ in rc.get_ordered_results()],
@@ -169,10 +170,20 @@ def get_json_response(sq: SearchQuery, rc: ResultContainer) -> str:
         'suggestions': list(rc.suggestions),
         'unresponsive_engines': get_translated_errors(rc.unresponsive_engines),
     }
-    response = json.dumps(data, cls=JSONEncoder)
+
+
+def get_json_response(sq: SearchQuery, rc: ResultContainer) -> str:
+    """Returns the JSON string of the results to a query (``application/json``)"""
+    response = json.dumps(get_json_data(sq, rc), cls=JSONEncoder)
     return response
 
 
+def get_stream_frame(data: dict) -> str:
+    """Returns one frame (a line) of the streamed results to a query
+    (``application/x-ndjson``)."""
+    return json.dumps(data, cls=JSONEncoder) + '\n'
+
+
 def get_themes(templates_path):
     """Returns available themes list."""
     return os.listdir(templates_path)
@@ -0,0 +1,89 @@
+#!/usr/bin/env python
+# SPDX-License-Identifier: AGPL-3.0-or-later
+"""Benchmark of the streamed HTTP responses (:py:obj:`searx.network.stream`) as
+they are used by the ``/image_proxy`` endpoint.
+
+A local HTTP server sends images of a given size, the responses are read
+through the ``image_proxy`` network.  The script prints the throughput (MB/s)
+and the CPU time per image (main thread and event loop).
+
+.. code:: bash
+
+    $ python searxng_extra/benchmarks/image_proxy.py
+    $ python searxng_extra/benchmarks/image_proxy.py --size 2000000 --count 200
+    $ python searxng_extra/benchmarks/image_proxy.py --chunk-size 65536  # fixed size chunks
+"""
+
+import argparse
+import os
+import threading
+import time
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+
+import searx.network
+from searx.network.network import Network, NETWORKS
+
+
+def start_server(size: int) -> int:
+    """Start a HTTP server sending ``size`` bytes, returns the port."""
+    body = os.urandom(size)
+
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def do_GET(self):  # pylint: disable=invalid-name
+            self.send_response(200)
+            self.send_header("Content-Type", "image/jpeg")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, *args):  # pylint: disable=arguments-differ
+            pass
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server.server_address[1]
+
+
+def proxy_image(url: str) -> int:
+    """Read the image from ``url`` like the ``/image_proxy`` endpoint does,
+    returns the number of bytes."""
+    resp, stream = searx.network.stream(method="GET", url=url, allow_redirects=True)
+    size = 0
+    try:
+        for chunk in stream:
+            size += len(chunk)
+    finally:
+        resp.close()
+    return size
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n", 1)[0])
+    parser.add_argument("--size", type=int, default=500 * 1024, help="size of an image in bytes")
+    parser.add_argument("--count", type=int, default=500, help="number of images")
+    parser.add_argument("--chunk-size", type=int, default=0, help="use chunks of a fixed size")
+    args = parser.parse_args()
+
+    if args.chunk_size:
+        searx.network.STREAM_CHUNK_SIZE = searx.network.STREAM_MAX_CHUNK_SIZE = args.chunk_size
+
+    NETWORKS["image_proxy"] = Network(enable_http=True, enable_http2=False)
+    searx.network.set_context_network_name("image_proxy")
+    url = f"http://127.0.0.1:{start_server(args.size)}/image.jpg"
+    proxy_image(url)  # warm up (connection pool)
+
+    cpu_start = time.process_time()
+    wall_start = time.perf_counter()
+    total = sum(proxy_image(url) for _ in range(args.count))
+    wall = time.perf_counter() - wall_start
+    cpu = time.process_time() - cpu_start
+
+    print(f"images: {args.count} x {args.size} bytes")
+    print(f"throughput: {total / wall / 1e6:.1f} MB/s")
+    print(f"CPU per image: {cpu / args.count * 1000:.3f} ms (includes the local HTTP server)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,127 @@
+#!/usr/bin/env python
+# SPDX-License-Identifier: AGPL-3.0-or-later
+"""Micro-benchmark of the metrics primitives (:py:obj:`searx.metrics`).
+
+The cost of one observation (one increment of a counter) is measured for:
+
+- the former implementation, which took a lock for each observation (reference),
+- :py:obj:`searx.metrics.histogram_observe` / :py:obj:`searx.metrics.counter_inc`
+  (lookup of the metric by its name),
+- the handles of :py:obj:`searx.metrics.engine_metrics`.
+
+With ``--threads``, the observations are made by concurrent threads.  The script
+checks that no observation is lost.
+
+.. code:: bash
+
+    $ python searxng_extra/benchmarks/metrics.py
+    $ python searxng_extra/benchmarks/metrics.py --count 1000000 --threads 8
+"""
+
+import argparse
+import threading
+import time
+
+from searx import metrics
+
+
+class LockedHistogram:
+    """The former implementation of :py:obj:`searx.metrics.models.Histogram.observe`
+    (reference)."""
+
+    def __init__(self, width=10, size=200):
+        self._lock = threading.Lock()
+        self._width = width
+        self._size = size
+        self._quartiles = [0] * size
+        self._count = 0
+        self._sum = 0
+
+    def observe(self, value):
+        q = int(value / self._width)
+        if q < 0:  # pylint: disable=consider-using-max-builtin
+            q = 0
+        if q >= self._size:
+            q = self._size - 1
+        with self._lock:
+            self._quartiles[q] += 1
+            self._count += 1
+            self._sum += value
+
+
+class LockedCounterStorage:
+    """The former implementation of :py:obj:`searx.metrics.models.CounterStorage`
+    (reference)."""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.counters = {}
+
+    def configure(self, *args):
+        self.counters[args] = 0
+
+    def add(self, value, *args):
+        with self.lock:
+            self.counters[args] += value
+
+
+def run(func, count: int, threads: int) -> float:
+    """Calls ``func(i)`` ``count`` times in each of the ``threads`` threads,
+    returns the time (ns) per call."""
+
+    def _loop():
+        for i in range(count):
+            func(i)
+
+    workers = [threading.Thread(target=_loop) for _ in range(threads)]
+    start = time.perf_counter()
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join()
+    return (time.perf_counter() - start) * 1e9 / (count * threads)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n", 1)[0])
+    parser.add_argument("--count", type=int, default=200000)
+    parser.add_argument("--threads", type=int, default=1)
+    args = parser.parse_args()
+
+    metrics.initialize(['example'])
+    handles = metrics.engine_metrics['example']
+    locked_histogram = LockedHistogram(0.1, 45)
+    locked_counters = LockedCounterStorage()
+    locked_counters.configure('engine', 'example', 'search', 'count', 'sent')
+
+    names = ('engine', 'example')
+    benchmarks = [
+        ("histogram (former, locked)", lambda i: locked_histogram.observe(i % 50 / 10)),
+        ("histogram_observe(*names)", lambda i: metrics.histogram_observe(i % 50 / 10, *names, 'time', 'total')),
+        ("EngineMetrics.time_http", lambda i: handles.time_http.observe(i % 50 / 10)),
+        ("counter (former, locked)", lambda i: locked_counters.add(1, *names, 'search', 'count', 'sent')),
+        ("counter_inc(*names)", lambda i: metrics.counter_inc(*names, 'search', 'count', 'error')),
+        ("EngineMetrics.sent", lambda i: handles.sent.add(1)),
+    ]
+
+    # the time of the loop and of the lambda is not part of the observation
+    overhead = run(lambda i: i % 50 / 10, args.count, args.threads)
+    print(f"{'primitive':<28} {'ns / observation':>17}")
+    for name, func in benchmarks:
+        print(f"{name:<28} {run(func, args.count, args.threads) - overhead:>17.1f}")
+
+    expected = args.count * args.threads
+    results = [
+        locked_histogram._count,  # pylint: disable=protected-access
+        handles.time_total.count,
+        handles.time_http.count,
+        locked_counters.counters[('engine', 'example', 'search', 'count', 'sent')],
+        handles.error.value,
+        handles.sent.value,
+    ]
+    if any(result != expected for result in results):
+        raise SystemExit(f"ERROR: lost observations, expected {expected}: {results}")
+
+
+if __name__ == "__main__":
+    main()
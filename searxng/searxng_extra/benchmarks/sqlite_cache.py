@@ -0,0 +1,105 @@
+#!/usr/bin/env python
+# SPDX-License-Identifier: AGPL-3.0-or-later
+"""Benchmark of the get/set throughput of :py:obj:`searx.cache.ExpireCacheSQLite`.
+
+The engines access the cache from short-lived threads (one thread per engine
+and query).  For each number of threads, ``--rounds`` times a batch of threads
+is started, each thread calls ``--ops`` times get (and set, see ``--set-ratio``)
+in a table of the cache.  The throughput (operations per second) is measured
+for:
+
+- the former implementation: a new DB connection per thread, no statement
+  cache, the default PRAGMAs of SQLite and a lookup of the tables in each call
+  (reference),
+- the connections of the :py:obj:`searx.sqlitedb.ConnectionPool`.
+
+The script checks that each thread reads the values it has written.
+
+.. code:: bash
+
+    $ python searxng_extra/benchmarks/sqlite_cache.py
+    $ python searxng_extra/benchmarks/sqlite_cache.py --threads 1 8 64 --ops 500
+"""
+
+import argparse
+import os
+import tempfile
+import threading
+import time
+
+from searx.cache import ExpireCacheCfg, ExpireCacheSQLite
+
+
+class FormerExpireCache(ExpireCacheSQLite):
+    """The former setup of the connections (reference)."""
+
+    SQLITE_PRAGMAS = {}
+    SQLITE_POOL_SIZE = 0
+    SQLITE_CACHED_STATEMENTS = 0
+
+    def table_exists(self, table: str) -> bool:
+        return table in self.table_names
+
+
+def run(cache: ExpireCacheSQLite, threads: int, ops: int, rounds: int, set_ratio: float) -> float:
+    """Returns the operations per second, raises an exception if a thread
+    reads a wrong value."""
+
+    set_every = max(1, round(1 / set_ratio)) if set_ratio else 0
+    errors = []
+
+    def _worker(name: str):
+        try:
+            for i in range(ops):
+                key = f"{name}-{i % 50}"
+                if set_every and i % set_every == 0:
+                    cache.set(key, (name, i), expire=60, ctx="bench")
+                    expected = (name, i)
+                value = cache.get(key, ctx="bench")
+                if set_every and i % set_every == 0 and value != expected:
+                    raise ValueError(f"{key}: expected {expected}, got {value}")
+        except Exception as e:  # pylint: disable=broad-except
+            errors.append(e)
+
+    start = time.perf_counter()
+    for r in range(rounds):
+        workers = [threading.Thread(target=_worker, args=(f"{r}.{t}",)) for t in range(threads)]
+        for worker in workers:
+            worker.start()
+        for worker in workers:
+            worker.join()
+    duration = time.perf_counter() - start
+    if errors:
+        raise SystemExit(f"ERROR: {errors[0]}")
+    return threads * ops * rounds / duration
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n", 1)[0])
+    parser.add_argument("--threads", type=int, nargs="+", default=[1, 2, 4, 8, 16, 32, 64])
+    parser.add_argument("--ops", type=int, default=200, help="operations per thread")
+    parser.add_argument("--rounds", type=int, default=5, help="batches of threads")
+    parser.add_argument("--set-ratio", type=float, default=0.1, help="ratio of the set operations")
+    args = parser.parse_args()
+
+    folder = tempfile.mkdtemp(prefix="sxng_bench_")
+    caches = []
+    for name, cls in (("former", FormerExpireCache), ("pool", ExpireCacheSQLite)):
+        cfg = ExpireCacheCfg(
+            name=f"BENCH_{name}",
+            db_url=os.path.join(folder, f"{name}.db"),
+            password=b"bench",
+            MAINTENANCE_MODE="off",  # the maintenance is not part of the benchmark
+        )
+        cache = cls(cfg)
+        cache.set("warm-up", True, expire=60, ctx="bench")
+        caches.append(cache)
+
+    print(f"{'threads':>7} {'former ops/s':>13} {'pool ops/s':>11} {'speedup':>8}")
+    for threads in args.threads:
+        former, pool = (run(cache, threads, args.ops, args.rounds, args.set_ratio) for cache in caches)
+        print(f"{threads:>7} {former:>13.0f} {pool:>11.0f} {pool / former:>7.2f}x")
+
+
+if __name__ == "__main__":
+    main()